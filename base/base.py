@@ -1,12 +1,19 @@
 import datetime as dt
+import io
 
+import discord
 from discord.ext import commands
 from discord.ext.commands import Context
 
-from utils.utils import display_notification
+from utils import profiling
+from utils.utils import display_error, display_notification
 import global_const
 
 
+# Longer profile summaries are sent as files.
+EMBED_SUMMARY_MAX_LENGTH = 4000
+
+
 @commands.command(
     aliases=global_const.COMMANDS_ALIASES["shutdown"],
     description="Shuts the bot down.",
@@ -14,7 +21,42 @@ import global_const
 @commands.is_owner()
 async def shutdown(ctx: Context) -> None:
     await display_notification(ctx, "Goodbye.")
-    exit()
+    await ctx.bot.close()
+
+
+@commands.command(
+    name="profiling",
+    aliases=global_const.COMMANDS_ALIASES["profiling"],
+    description="Turns profiling on or off, resets it or shows the profile "
+    "(summary or flamegraph, i.e. folded stacks).",
+)
+@commands.is_owner()
+async def manage_profiling(ctx: Context, action: str = "summary") -> None:
+    if action == "on":
+        profiling.enable()
+        await display_notification(ctx, "Profiling is on.")
+    elif action == "off":
+        profiling.disable()
+        await display_notification(ctx, "Profiling is off.")
+    elif action == "reset":
+        profiling.reset()
+        await display_notification(ctx, "The profile was reset.")
+    elif action == "summary":
+        summary = f"```\n{profiling.summary()}\n```"
+        if len(summary) <= EMBED_SUMMARY_MAX_LENGTH:
+            await display_notification(ctx, summary)
+        else:
+            await send_text_file(ctx, profiling.summary(), "profile.txt")
+    elif action == "flamegraph":
+        await send_text_file(ctx, profiling.folded_stacks(), "profile.folded")
+    else:
+        await display_error(
+            ctx, "Use one of: on, off, reset, summary, flamegraph (e.g. !profiling on)."
+        )
+
+
+async def send_text_file(ctx: Context, text: str, filename: str) -> None:
+    await ctx.send(file=discord.File(io.BytesIO(text.encode()), filename=filename))
 
 
 @commands.command(
@@ -30,4 +72,5 @@ async def say_datetime(ctx: Context) -> None:
 
 async def setup(bot):
     bot.add_command(shutdown)
+    bot.add_command(manage_profiling)
     bot.add_command(say_datetime)
@@ -0,0 +1,251 @@
+"""
+Fakes and helpers shared by the benchmarks which run the commands and the reminder
+loop: the bot's environment variables, fake Discord objects, the benchmark's database
+(mongomock or a local mongod) with counting of its operations, and seeding it with
+reminders.
+"""
+
+import asyncio
+import collections
+import datetime as dt
+import os
+import pathlib
+import statistics
+import subprocess
+import threading
+
+from pymongo import monitoring
+
+from reminders.claims import PENDING
+import reminders.const as const
+import utils.db
+
+
+RESULTS_DIRECTORY = pathlib.Path(__file__).parent / "results"
+# Databases which the benchmarks and tests may drop. The bot's database never has
+# these prefixes, see set_default_environment().
+SCRATCH_DATABASES_PREFIXES = ("reminderbot_benchmark", "reminderbot_tests")
+# The bot's environment variables, set by set_default_environment().
+ENVIRONMENT_DEFAULTS = {
+    "DATABASE_NAME": "reminderbot_benchmark",
+    "MONGODB_LINK": "mongodb://localhost:27017/{}",
+    "PW": "",
+    "TOKEN": "",
+    "CHANNEL_ID": "1",
+    "LOCAL_TIMEZONE": "UTC",
+    "PAST_REMINDERS_COLLECTION_NAME": "PAST_REMINDERS",
+    "FUTURE_REMINDERS_COLLECTION_NAME": "FUTURE_REMINDERS",
+    "REMINDERBOT_USERS_PROFILES_COLLECTION_NAME": "USERS_PROFILES",
+}
+SEED_BATCH_SIZE = 10000
+# Seeded reminders' authors don't overlap the benchmarks' authors.
+SEEDED_AUTHORS_OFFSET = 10**9
+SEEDED_AUTHORS = 1000
+# mongomock's collection methods counted as operations, see MongomockOpsCounter.
+MONGOMOCK_OPERATIONS = (
+    "aggregate",
+    "bulk_write",
+    "count_documents",
+    "create_index",
+    "create_indexes",
+    "delete_many",
+    "delete_one",
+    "distinct",
+    "find",
+    "find_one",
+    "find_one_and_delete",
+    "find_one_and_update",
+    "insert_many",
+    "insert_one",
+    "replace_one",
+    "update_many",
+    "update_one",
+)
+
+
+class CommandsCounter(monitoring.CommandListener):
+    """Counts the commands sent to mongod, by command's name."""
+
+    def __init__(self) -> None:
+        self.counts = collections.Counter()
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self.counts[event.command_name] += 1
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+
+class MongomockOpsCounter:
+    """
+    Counts calls of mongomock's collection methods, by method's name. Calls made by
+    the methods themselves aren't counted.
+    """
+
+    def __init__(self) -> None:
+        import mongomock
+
+        self.counts = collections.Counter()
+        self._calls = threading.local()
+        for name in MONGOMOCK_OPERATIONS:
+            method = getattr(mongomock.collection.Collection, name)
+            setattr(mongomock.collection.Collection, name, self._counted(name, method))
+
+    def _counted(self, name: str, method):
+        def counted_method(*args, **kwargs):
+            depth = getattr(self._calls, "depth", 0)
+            if depth == 0:
+                self.counts[name] += 1
+            self._calls.depth = depth + 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._calls.depth = depth
+
+        return counted_method
+
+
+class FakeAuthor:
+    def __init__(self, author_id: int) -> None:
+        self.id = author_id
+        self.name = f"user{author_id}"
+        self.nick = None
+
+
+class FakeGuild:
+    id = 1
+    name = "benchmark"
+
+
+class FakeChannel:
+    """Stands in for the channel reminders are sent to, sending takes `send_delay`."""
+
+    id = 1
+
+    def __init__(self, send_delay: float = 0) -> None:
+        self.send_delay = send_delay
+
+    async def send(self, content: str | None = None, **kwargs) -> None:
+        await asyncio.sleep(self.send_delay)
+
+
+class FakeContext:
+    """Keeps the embeds the command responded with."""
+
+    def __init__(self, author_id: int, channel: FakeChannel) -> None:
+        self.author = FakeAuthor(author_id)
+        self.guild = FakeGuild()
+        self.channel = channel
+        self.embeds = []
+
+    async def send(self, content: str | None = None, **kwargs) -> None:
+        if embed := kwargs.get("embed"):
+            self.embeds.append(embed)
+
+
+class FakeBot:
+    def __init__(self, channel: FakeChannel) -> None:
+        self.channel = channel
+
+    async def wait_until_ready(self) -> None:
+        pass
+
+    def is_closed(self) -> bool:
+        return False
+
+    def get_channel(self, channel_id: int) -> FakeChannel:
+        return self.channel
+
+
+def set_default_environment(**environment: str) -> None:
+    """
+    Sets the bot's environment variables which aren't set yet, to the values given as
+    keyword arguments or ENVIRONMENT_DEFAULTS. The modules read them on first use.
+    DATABASE_NAME is always set though, so the bot's database is never dropped.
+    """
+    environment = ENVIRONMENT_DEFAULTS | environment
+    check_scratch_database(environment["DATABASE_NAME"])
+    for env_var, value in environment.items():
+        os.environ.setdefault(env_var, value)
+    os.environ["DATABASE_NAME"] = environment["DATABASE_NAME"]
+
+
+def check_scratch_database(database_name: str) -> None:
+    """Refuses to go on with a database which isn't the benchmarks' or tests' own."""
+    if not database_name.startswith(SCRATCH_DATABASES_PREFIXES):
+        raise SystemExit(
+            f"Refusing to use the {database_name!r} database: its name doesn't start"
+            f" with any of {', '.join(SCRATCH_DATABASES_PREFIXES)}."
+        )
+
+
+def connect(mongo_uri: str | None):
+    """Points the bot at the benchmark's database. Returns the operations counter."""
+    if mongo_uri is None:
+        import mongomock
+
+        utils.db.MongoClient = mongomock.MongoClient
+        # mongomock doesn't implement the hello command, nor transactions.
+        utils.db._transactions_supported = False
+        ops_counter = MongomockOpsCounter()
+    else:
+        os.environ["MONGODB_LINK"] = mongo_uri
+        ops_counter = CommandsCounter()
+        monitoring.register(ops_counter)
+    check_scratch_database(os.environ["DATABASE_NAME"])
+    utils.db.get_client().drop_database(os.environ["DATABASE_NAME"])
+    return ops_counter
+
+
+def seed_reminders(count: int) -> None:
+    """Inserts reminders due after a year, shaped like the created ones."""
+    now = dt.datetime.now(dt.timezone.utc)
+    for batch_start in range(0, count, SEED_BATCH_SIZE):
+        const.FUTURE_REMINDERS.insert_many(
+            [
+                {
+                    "friendly_id": f"seed{i}",
+                    "author_id": SEEDED_AUTHORS_OFFSET + i % SEEDED_AUTHORS,
+                    "author_name": f"user{i % SEEDED_AUTHORS}",
+                    "author_nick": None,
+                    "guild": FakeGuild.name,
+                    "guild_id": FakeGuild.id,
+                    "channel_id": FakeChannel.id,
+                    "reminder_name_full": f"seeded reminder {i}",
+                    "reminder_name_short": f"seeded reminder {i}",
+                    "date_created": now,
+                    "reminder_date": now + dt.timedelta(days=365, seconds=i),
+                    "done": False,
+                    "state": PENDING,
+                    "original_message": f"me of seeded reminder {i} in 1 year",
+                }
+                for i in range(batch_start, min(batch_start + SEED_BATCH_SIZE, count))
+            ]
+        )
+
+
+def summary(samples: list[float]) -> dict[str, float | None]:
+    """Returns median, 99th percentile and max of the samples in milliseconds."""
+    if len(samples) < 2:
+        return {"p50_ms": None, "p99_ms": None, "max_ms": None}
+    percentiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
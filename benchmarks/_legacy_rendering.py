@@ -0,0 +1,117 @@
+"""
+Frozen copy of the reminders' rendering which reminders/rendering.py replaced, kept
+only as the baseline of the rendering benchmark. Don't use it in the bot.
+"""
+
+import datetime as dt
+
+import discord
+from discord.utils import escape_mentions
+
+import reminders.const as const
+from reminders.reminding import create_mentions
+from utils.utils import utc_to_local
+
+
+def create_reminder_message(reminder: dict, msg: str) -> tuple[str, discord.Embed]:
+    """Creates a message reminding of one reminder."""
+    reminder_description = "```{}```\n`{}`  created on  `{}`".format(
+        reminder["reminder_name_full"] or "- ",
+        reminder["friendly_id"],
+        utc_to_local(reminder["date_created"]).strftime("%d.%m.%Y %H:%M:%S"),
+    )
+    embed = discord.Embed(
+        title=msg.format(
+            utc_to_local(reminder["reminder_date"]).strftime("%d.%m.%Y %H:%M:%S"),
+        ),
+        description=reminder_description,
+        color=0xFFA500,
+    )
+    author_tagging_msg = f"<@{reminder['author_id']}>"
+    return author_tagging_msg, embed
+
+
+def create_coalesced_reminder_messages(
+    reminders: list[dict], msg: str
+) -> list[tuple[list[dict], str, discord.Embed]]:
+    """
+    Packs the reminders into combined messages. Each reminder is an embed field,
+    the message's text mentions every author of the message's reminders once.
+    """
+    messages = []
+    packed_reminders, embed = [], discord.Embed(color=0xFFA500)
+    authors_mentions, mentions_length = set(), 0
+    for reminder in reminders:
+        field_name, field_value = create_reminder_field(reminder, msg)
+        author_mention = f"<@{reminder['author_id']}>"
+        new_mention_length = (
+            len(author_mention) + 1 if author_mention not in authors_mentions else 0
+        )
+        if packed_reminders and (
+            len(embed.fields) == const.EMBED_MAX_FIELDS
+            or len(embed) + len(field_name) + len(field_value) > const.EMBED_MAX_LENGTH
+            or mentions_length + new_mention_length > const.MESSAGE_MAX_LENGTH
+        ):
+            messages.append(
+                (packed_reminders, create_mentions(packed_reminders), embed)
+            )
+            packed_reminders, embed = [], discord.Embed(color=0xFFA500)
+            authors_mentions, mentions_length = set(), 0
+            new_mention_length = len(author_mention) + 1
+
+        packed_reminders.append(reminder)
+        embed.add_field(name=field_name, value=field_value, inline=False)
+        authors_mentions.add(author_mention)
+        mentions_length += new_mention_length
+
+    if packed_reminders:
+        messages.append((packed_reminders, create_mentions(packed_reminders), embed))
+    return messages
+
+
+def create_reminder_field(reminder: dict, msg: str) -> tuple[str, str]:
+    """
+    Creates an embed field (name and value) describing a reminder in a combined
+    message. Long reminder names are cut to fit in the field.
+    """
+    field_name = msg.format(
+        utc_to_local(reminder["reminder_date"]).strftime("%d.%m.%Y %H:%M:%S"),
+    )
+    field_value = "<@{}> ```{{}}```\n`{}`  created on  `{}`".format(
+        reminder["author_id"],
+        reminder["friendly_id"],
+        utc_to_local(reminder["date_created"]).strftime("%d.%m.%Y %H:%M:%S"),
+    )
+    reminder_name = reminder["reminder_name_full"] or "- "
+    max_name_length = const.EMBED_FIELD_VALUE_MAX_LENGTH - len(field_value) + 2
+    if len(reminder_name) > max_name_length:
+        reminder_name = f"{reminder_name[:max_name_length - 6]} [...]"
+    return field_name, field_value.format(reminder_name)
+
+
+def create_listing_embed(reminders: list[dict]) -> tuple[str, discord.Embed]:
+    """The embed of list_reminders(), with its message's current date."""
+    embed = discord.Embed(
+        title=":date: Upcoming reminders:",
+        color=0x0000FF,
+    )
+    for reminder in reminders:
+        remind_in = str(
+            utc_to_local(reminder["reminder_date"])
+            - dt.datetime.now(const.LOCAL_TIMEZONE)
+        ).split(".")[0]
+        embed_field_name = ":hourglass: Left: {}  |  {}:".format(
+            remind_in if remind_in[0] != "-" else "0:00:00",
+            utc_to_local(reminder["reminder_date"]).strftime("%d.%m.%Y %H:%M:%S"),
+        )
+        reminder_description = "Reminder `{}` by <@{}>: ```{}```\n".format(
+            reminder["friendly_id"],
+            reminder["author_id"],
+            escape_mentions(reminder["reminder_name_short"]) or "-",
+        )
+        embed.add_field(name=embed_field_name, value=reminder_description, inline=False)
+
+    current_datetime = dt.datetime.now(const.LOCAL_TIMEZONE).strftime(
+        "%d.%m.%Y %H:%M:%S"
+    )
+    return current_datetime, embed
@@ -0,0 +1,104 @@
+"""
+Measures how responsive the event loop stays while MongoDB is artificially slow.
+
+A ticker coroutine measures how late it wakes up (event loop lag) while a burst of
+validate_user_profile() calls runs against a profiles collection whose every call
+sleeps for --mongo-delay seconds. The users' limits states cached by the throttle are
+dropped before each call, so every call reads the profile. The same burst is then repeated with the old,
+synchronous access pattern for comparison.
+
+Usage: python -m benchmarks.event_loop_latency [--calls 20] [--mongo-delay 0.2]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks._harness import set_default_environment
+import reminders.const as const
+from reminders import throttle
+from reminders.validate import validate_user_profile
+
+
+set_default_environment()
+
+
+TICK = 0.01
+
+
+class SlowProfilesCollection:
+    """Stands in for REMINDERBOT_USERS_PROFILES, every call blocks for `delay`."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def find_one(self, query: dict, *args, **kwargs) -> dict:
+        time.sleep(self.delay)
+        return {
+            "_id": query["_id"],
+            "user_recent_reminders": [],
+            "user_future_reminders": [],
+        }
+
+
+class FakeAuthor:
+    def __init__(self, author_id: int) -> None:
+        self.id = author_id
+
+
+class FakeContext:
+    def __init__(self, author_id: int) -> None:
+        self.author = FakeAuthor(author_id)
+
+
+async def measure_lag(stop: asyncio.Event) -> float:
+    """Returns the worst event loop lag observed until `stop` is set."""
+    worst_lag = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        worst_lag = max(worst_lag, time.perf_counter() - started - TICK)
+    return worst_lag
+
+
+async def uncached_validate_user_profile(ctx: FakeContext) -> str:
+    """validate_user_profile() reading the user's profile, as on a cache miss."""
+    throttle._users_states.pop(ctx.author.id, None)
+    return await validate_user_profile(ctx)
+
+
+async def blocking_validate_user_profile(ctx: FakeContext) -> None:
+    """The pre-executor access pattern: a synchronous call inside a coroutine."""
+    const.REMINDERBOT_USERS_PROFILES.find_one({"_id": ctx.author.id})
+
+
+async def run_burst(validate, calls: int) -> tuple[float, float]:
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop))
+    await asyncio.sleep(TICK)
+    started = time.perf_counter()
+    await asyncio.gather(*(validate(FakeContext(i)) for i in range(calls)))
+    duration = time.perf_counter() - started
+    stop.set()
+    return await lag_task, duration
+
+
+async def main(calls: int, mongo_delay: float) -> None:
+    const.REMINDERBOT_USERS_PROFILES = SlowProfilesCollection(mongo_delay)
+    for name, validate in (
+        ("executor", uncached_validate_user_profile),
+        ("blocking", blocking_validate_user_profile),
+    ):
+        worst_lag, duration = await run_burst(validate, calls)
+        print(
+            f"{name:>8}: {calls} calls in {duration:.2f}s, "
+            f"worst event loop lag {worst_lag * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--mongo-delay", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.mongo_delay))
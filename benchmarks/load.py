@@ -0,0 +1,338 @@
+"""
+Replays a realistic mix of the reminder commands to find where the bot saturates.
+
+The commands (creating reminders in their "in" and "on" forms, list, my, show and
+delete) are called with fake Discord contexts of --authors simulated authors, a few
+of whom are much more active than the others (Zipf distribution). Commands arrive
+at random intervals without waiting for the previous ones, at each of the --rates
+(commands per second) for --step seconds. Meanwhile the reminder loop sends the
+reminders which become due to a fake channel, every send takes --send-delay seconds.
+
+For every rate it reports the completed commands per second, commands' latency and
+the saturation signals: event loop lag, database calls waiting for a database thread
+(and their wait), and reminder messages waiting to be sent. Past the saturation
+point the completed rate falls behind the offered one and the latency grows, the
+signal growing first points at the bottleneck. The results are saved as JSON.
+
+Runs against mongomock by default, which saturates much sooner than MongoDB does,
+so use --mongo-uri (e.g. docker run -p 27017:27017 mongo) to size production.
+Usage: python -m benchmarks.load [--rates 5,10,20,50] [--step 10] [--authors 2000]
+    [--mix create_in=30,create_on=15,list=15,my=20,show=10,delete=10]
+    [--seed 1000] [--send-delay 0.05] [--mongo-uri URI] [--output PATH]
+"""
+
+import argparse
+import asyncio
+import bisect
+import collections
+import datetime as dt
+import itertools
+import json
+import pathlib
+import random
+import re
+import time
+
+from benchmarks._harness import (
+    RESULTS_DIRECTORY,
+    FakeBot,
+    FakeChannel,
+    FakeContext,
+    connect,
+    git_commit,
+    seed_reminders,
+    set_default_environment,
+    summary,
+)
+import reminders.const as const
+from reminders.core import (
+    create_reminder,
+    delete_reminder,
+    list_reminders,
+    my_reminders,
+    show_reminder,
+)
+from reminders.indexes import ensure_indexes
+from reminders.scheduler import ReminderScheduler
+import utils.db
+
+
+set_default_environment(DATABASE_NAME="reminderbot_benchmark_load")
+
+
+DEFAULT_MIX = "create_in=30,create_on=15,list=15,my=20,show=10,delete=10"
+SAMPLE_INTERVAL = 0.05
+# Commands still running this long after the last step are abandoned.
+DRAIN_TIMEOUT = 30
+# Completing fewer commands than this part of the offered ones means saturation.
+SATURATION_THRESHOLD = 0.9
+CREATED_ID_PATTERN = re.compile(r"Reminder's ID: `(\S+)`")
+
+
+class Traffic:
+    """Picks the commands, their authors and arguments."""
+
+    def __init__(self, mix: dict[str, float], authors: int, seeded: int) -> None:
+        self.commands = list(mix)
+        self.commands_weights = list(itertools.accumulate(mix.values()))
+        self.authors_weights = list(
+            itertools.accumulate(1 / rank for rank in range(1, authors + 1))
+        )
+        self.seeded = seeded
+        # Friendly IDs of the reminders created by each author.
+        self.created = collections.defaultdict(list)
+        self.created_count = 0
+
+    def next_command(self) -> tuple[str, int]:
+        command = random.choices(self.commands, cum_weights=self.commands_weights)[0]
+        # Authors are numbered by their activity, the first one is the most active.
+        author_id = bisect.bisect_left(
+            self.authors_weights, random.random() * self.authors_weights[-1]
+        )
+        return command, author_id
+
+    def create_in_msg(self, run_duration: float) -> str:
+        # Half of the reminders are due while the load is being replayed.
+        if random.random() < 0.5:
+            return f"me of a soon reminder in {random.uniform(1, run_duration):.0f}s"
+        return "me of a later reminder in {} {}".format(
+            random.randint(1, 30), random.choice(("minutes", "hours", "days"))
+        )
+
+    def create_on_msg(self) -> str:
+        date = dt.datetime.now(const.LOCAL_TIMEZONE) + dt.timedelta(
+            minutes=random.randint(2, 60 * 24 * 30)
+        )
+        return "me of a dated reminder on {}".format(date.strftime("%d.%m.%y %H:%M"))
+
+    def any_friendly_id(self, author_id: int) -> str:
+        if self.created[author_id] and random.random() < 0.5:
+            return random.choice(self.created[author_id])
+        return f"seed{random.randrange(max(self.seeded, 1))}"
+
+    def own_friendly_id(self, author_id: int) -> str:
+        if self.created[author_id]:
+            return self.created[author_id].pop(
+                random.randrange(len(self.created[author_id]))
+            )
+        return "missing"  # Deleting a reminder which doesn't exist is common too.
+
+    def record_created(self, author_id: int, ctx: FakeContext) -> None:
+        for embed in ctx.embeds:
+            if match := CREATED_ID_PATTERN.search(embed.description or ""):
+                self.created[author_id].append(match.group(1))
+                self.created_count += 1
+
+
+class Step:
+    """Measurements of replaying the load at one rate."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.offered = 0
+        self.completed = 0
+        self.rejected = 0
+        self.crashed = 0
+        self.latencies = []
+        self.latencies_by_command = collections.defaultdict(list)
+        self.loop_lags = []
+        self.db_calls_in_progress = []
+        self.send_queue = []
+
+    def report(self, duration: float, db_thread_wait: dict) -> dict:
+        completed_rate = self.completed / duration
+        return {
+            "rate": self.rate,
+            "offered": self.offered,
+            "completed_per_second": completed_rate,
+            "saturated": completed_rate < self.rate * SATURATION_THRESHOLD,
+            "rejected": self.rejected,
+            "crashed": self.crashed,
+            "latency": summary(self.latencies),
+            "latency_by_command": {
+                command: summary(latencies)
+                for command, latencies in sorted(self.latencies_by_command.items())
+            },
+            "loop_lag": summary(self.loop_lags),
+            "db_calls_in_progress_max": max(self.db_calls_in_progress, default=0),
+            "db_thread_wait": db_thread_wait,
+            "send_queue_max": max(self.send_queue, default=0),
+        }
+
+
+async def run_command(
+    command: str, author_id: int, traffic: Traffic, step: Step, run_duration: float
+) -> None:
+    ctx = FakeContext(author_id, FakeChannel())
+    started = time.perf_counter()
+    try:
+        if command == "create_in":
+            await create_reminder(ctx, msg=traffic.create_in_msg(run_duration))
+        elif command == "create_on":
+            await create_reminder(ctx, msg=traffic.create_on_msg())
+        elif command == "list":
+            await list_reminders(ctx)
+        elif command == "my":
+            await my_reminders(ctx)
+        elif command == "show":
+            await show_reminder(
+                ctx, reminder_friendly_id=traffic.any_friendly_id(author_id)
+            )
+        elif command == "delete":
+            await delete_reminder(
+                ctx, reminder_friendly_id=traffic.own_friendly_id(author_id)
+            )
+    except Exception as e:
+        step.crashed += 1
+        print(f"{command} crashed: {e!r}")
+        return
+    latency = time.perf_counter() - started
+    step.completed += 1
+    step.latencies.append(latency)
+    step.latencies_by_command[command].append(latency)
+    if any(embed.title == "Error" for embed in ctx.embeds):
+        step.rejected += 1
+    elif command.startswith("create"):
+        traffic.record_created(author_id, ctx)
+
+
+async def sample(step: Step, scheduler: ReminderScheduler, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(SAMPLE_INTERVAL)
+        step.loop_lags.append(time.perf_counter() - started - SAMPLE_INTERVAL)
+        step.db_calls_in_progress.append(utils.db.DB_CALLS_IN_PROGRESS.value)
+        step.send_queue.append(scheduler.delivery.pending())
+
+
+async def replay_step(
+    step: Step,
+    duration: float,
+    traffic: Traffic,
+    scheduler: ReminderScheduler,
+    running: set[asyncio.Task],
+    run_duration: float,
+) -> dict:
+    """Starts the commands at Poisson distributed moments, for `duration` seconds."""
+    wait_sum = utils.db.DB_THREAD_WAIT_SECONDS.sum
+    wait_count = utils.db.DB_THREAD_WAIT_SECONDS.count
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample(step, scheduler, stop))
+    started = time.perf_counter()
+    next_arrival = started
+    while True:
+        next_arrival += random.expovariate(step.rate)
+        if next_arrival - started >= duration:
+            break
+        await asyncio.sleep(max(next_arrival - time.perf_counter(), 0))
+        command, author_id = traffic.next_command()
+        task = asyncio.create_task(
+            run_command(command, author_id, traffic, step, run_duration)
+        )
+        running.add(task)
+        task.add_done_callback(running.discard)
+        step.offered += 1
+    await asyncio.sleep(max(started + duration - time.perf_counter(), 0))
+    stop.set()
+    await sampler
+
+    waits = utils.db.DB_THREAD_WAIT_SECONDS.count - wait_count
+    db_thread_wait = {
+        "calls": waits,
+        "mean_ms": (
+            (utils.db.DB_THREAD_WAIT_SECONDS.sum - wait_sum) / waits * 1000
+            if waits
+            else None
+        ),
+    }
+    return step.report(duration, db_thread_wait)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    connect(args.mongo_uri)
+    await utils.db.run_db(seed_reminders, args.seed)
+    await ensure_indexes()
+    traffic = Traffic(args.mix, args.authors, args.seed)
+    scheduler = ReminderScheduler(FakeBot(FakeChannel(args.send_delay)))
+    scheduler.start()
+
+    running = set()
+    run_duration = args.step * len(args.rates)
+    steps = []
+    for rate in args.rates:
+        step = await replay_step(
+            Step(rate), args.step, traffic, scheduler, running, run_duration
+        )
+        print_step(step, header=not steps)
+        steps.append(step)
+    if running:
+        await asyncio.wait(running, timeout=DRAIN_TIMEOUT)
+    await scheduler.stop()
+    await utils.db.close_db()
+
+    return {
+        "commit": git_commit(),
+        "date": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "database": "mongod" if args.mongo_uri else "mongomock",
+        "seeded": args.seed,
+        "authors": args.authors,
+        "mix": args.mix,
+        "step_s": args.step,
+        "send_delay_s": args.send_delay,
+        "created": traffic.created_count,
+        "steps": steps,
+    }
+
+
+def print_step(step: dict, header: bool) -> None:
+    if header:
+        print(
+            f"{'rate':>6} {'done/s':>7} {'p50 ms':>8} {'p99 ms':>8} {'rejected':>8} "
+            f"{'lag p99 ms':>10} {'db calls':>8} {'db wait ms':>10} {'send queue':>10}"
+        )
+    print(
+        f"{step['rate']:>6g} {step['completed_per_second']:>7.1f} "
+        f"{step['latency']['p50_ms'] or 0:>8.1f} {step['latency']['p99_ms'] or 0:>8.1f} "
+        f"{step['rejected']:>8} {step['loop_lag']['p99_ms'] or 0:>10.1f} "
+        f"{step['db_calls_in_progress_max']:>8} "
+        f"{step['db_thread_wait']['mean_ms'] or 0:>10.1f} {step['send_queue_max']:>10}"
+        + ("  saturated" if step["saturated"] else "")
+    )
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    commands = {"create_in", "create_on", "list", "my", "show", "delete"}
+    weights = {}
+    for part in mix.split(","):
+        command, _, weight = part.partition("=")
+        if command not in commands:
+            raise argparse.ArgumentTypeError(f"unknown command {command!r}")
+        weights[command] = float(weight)
+    return weights
+
+
+def main(args: argparse.Namespace) -> None:
+    results = asyncio.run(run(args))
+    output = args.output or RESULTS_DIRECTORY / (
+        f"load-{results['commit'] or 'unknown'}-{results['database']}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Created {results['created']} reminders. Saved the results to {output}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--rates",
+        type=lambda rates: [float(rate) for rate in rates.split(",")],
+        default=[5, 10, 20, 50],
+    )
+    parser.add_argument("--step", type=float, default=10)
+    parser.add_argument("--authors", type=int, default=2000)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--seed", type=int, default=1000)
+    parser.add_argument("--send-delay", type=float, default=0.05)
+    parser.add_argument("--mongo-uri")
+    parser.add_argument("--output", type=pathlib.Path)
+    main(parser.parse_args())
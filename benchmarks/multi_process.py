@@ -0,0 +1,184 @@
+"""
+Checks that several bot processes sharing one database send every reminder once.
+
+--reminders reminders due within the next --spread seconds are inserted into a fresh
+database, then --workers processes run the reminder loop on it with a fake Discord
+client which records every sent reminder in a SENT collection. With --kill-after the
+first worker is killed (SIGKILL, possibly mid-tick) after that many seconds, so the
+others have to take over its claimed reminders once their lease expires. Reminders
+which weren't sent, or were sent more than once, are counted at the end.
+
+Needs a running mongod, e.g. docker run -p 27017:27017 mongo.
+Usage: python -m benchmarks.multi_process [--workers 3] [--reminders 2000]
+    [--spread 20] [--kill-after SECONDS] [--mongo-uri mongodb://localhost:27017]
+"""
+
+import argparse
+import asyncio
+import collections
+import datetime as dt
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+
+import bson
+import pymongo
+
+from benchmarks._harness import (
+    FakeBot,
+    FakeChannel,
+    check_scratch_database,
+    set_default_environment,
+)
+import reminders.const as const
+from reminders.scheduler import ReminderScheduler
+from utils.db import get_db
+
+
+set_default_environment(DATABASE_NAME="reminderbot_benchmark_multi_process")
+
+
+DATABASE_NAME = os.environ["DATABASE_NAME"]
+SENT_COLLECTION_NAME = "SENT"
+AUTHORS = 50
+
+
+class RecordingChannel(FakeChannel):
+    """Records names of the sent reminders (the names are the friendly IDs)."""
+
+    def __init__(self, sent: pymongo.collection.Collection, send_delay: float) -> None:
+        super().__init__(send_delay)
+        self.sent = sent
+
+    async def send(self, content: str | None = None, **kwargs) -> None:
+        await super().send(content, **kwargs)
+        embed = kwargs["embed"]
+        texts = [embed.description or ""] + [field.value for field in embed.fields]
+        self.sent.insert_many(
+            [
+                {"friendly_id": friendly_id, "worker": os.getpid()}
+                for text in texts
+                for friendly_id in re.findall(r"```(.+?)```", text)
+            ]
+        )
+
+
+async def run_worker(lease: float, check_interval: float, send_delay: float) -> None:
+    const.CLAIM_LEASE = dt.timedelta(seconds=lease)
+    const.TIME_BETWEEN_REMINDER_CHECKS = check_interval
+    sent = get_db()[SENT_COLLECTION_NAME]
+    scheduler = ReminderScheduler(FakeBot(RecordingChannel(sent, send_delay)))
+    scheduler.start()
+    # Terminated workers finish their tick in progress, like a closed bot does.
+    terminated = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, terminated.set)
+    await terminated.wait()
+    await scheduler.stop()
+
+
+def insert_reminders(db: pymongo.database.Database, count: int, spread: float) -> None:
+    now = dt.datetime.now(dt.timezone.utc)
+    db[os.environ["FUTURE_REMINDERS_COLLECTION_NAME"]].insert_many(
+        [
+            {
+                "_id": bson.ObjectId(),
+                "friendly_id": f"r{i}",
+                "author_id": i % AUTHORS,
+                "author_name": f"user{i % AUTHORS}",
+                "author_nick": None,
+                "reminder_name_full": f"r{i}",
+                "reminder_name_short": f"r{i}",
+                "date_created": now,
+                "reminder_date": now + dt.timedelta(seconds=spread * i / count),
+                "channel_id": 1,
+            }
+            for i in range(count)
+        ]
+    )
+
+
+def main(args: argparse.Namespace) -> None:
+    client = pymongo.MongoClient(args.mongo_uri)
+    check_scratch_database(DATABASE_NAME)
+    client.drop_database(DATABASE_NAME)
+    db = client[DATABASE_NAME]
+    future_reminders = db[os.environ["FUTURE_REMINDERS_COLLECTION_NAME"]]
+    insert_reminders(db, args.reminders, args.spread)
+
+    worker_command = [
+        *(sys.executable, "-m", "benchmarks.multi_process", "--worker"),
+        *("--lease", str(args.lease)),
+        *("--check-interval", str(args.check_interval)),
+        *("--send-delay", str(args.send_delay)),
+    ]
+    env = os.environ | {
+        "DATABASE_NAME": DATABASE_NAME,
+        "MONGODB_LINK": args.mongo_uri,
+        # The workers share the database like shards do.
+        "SHARD_COUNT": str(args.workers),
+    }
+    workers = [subprocess.Popen(worker_command, env=env) for _ in range(args.workers)]
+    started = time.monotonic()
+    deadline = started + args.spread + args.lease + args.check_interval + 30
+    killed_worker = None
+    try:
+        while future_reminders.count_documents({}) and time.monotonic() < deadline:
+            if (
+                args.kill_after is not None
+                and killed_worker is None
+                and time.monotonic() - started > args.kill_after
+            ):
+                killed_worker = workers[0].pid
+                workers[0].send_signal(signal.SIGKILL)
+                print(f"Killed worker {killed_worker}.")
+            time.sleep(0.1)
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.wait()
+
+    senders = collections.defaultdict(list)
+    for sent in db[SENT_COLLECTION_NAME].find():
+        senders[sent["friendly_id"]].append(sent["worker"])
+    sends_by_worker = collections.Counter(
+        worker for workers_pids in senders.values() for worker in workers_pids
+    )
+    missing = args.reminders - len(senders)
+    duplicated = sum(len(workers_pids) > 1 for workers_pids in senders.values())
+    # A killed worker may have sent reminders whose claims expired before it could
+    # delete them, the others send them again. Any other duplicate is a bug.
+    unexpected_duplicated = sum(
+        len(workers_pids) > 1 and killed_worker not in workers_pids
+        for workers_pids in senders.values()
+    )
+    print(f"Finished in {time.monotonic() - started:.1f}s.")
+    for worker in workers:
+        suffix = " (killed)" if worker.pid == killed_worker else ""
+        print(f"  worker {worker.pid}: {sends_by_worker[worker.pid]} sent{suffix}")
+    print(
+        f"{args.reminders} reminders, {missing} not sent, {duplicated} sent more "
+        f"than once ({unexpected_duplicated} not by the killed worker), "
+        f"{future_reminders.count_documents({})} left in the database"
+    )
+    sys.exit(1 if missing or unexpected_duplicated else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--reminders", type=int, default=2000)
+    parser.add_argument("--spread", type=float, default=20)
+    parser.add_argument("--kill-after", type=float)
+    parser.add_argument("--lease", type=float, default=5)
+    parser.add_argument("--check-interval", type=float, default=1)
+    parser.add_argument("--send-delay", type=float, default=0.01)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        asyncio.run(run_worker(args.lease, args.check_interval, args.send_delay))
+    else:
+        main(args)
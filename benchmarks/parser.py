@@ -0,0 +1,87 @@
+"""
+Compares parse_reminder_msg() with the message parsing functions it replaced.
+
+Every message of the corpus (one "!remind" command's message per line, without the
+command itself) is parsed --rounds times by both parsers. Messages which the old
+parser accepted, or rejected for a different reason, but the new one doesn't are
+listed at the end.
+
+Usage: python -m benchmarks.parser [--rounds 2000] [--corpus PATH]
+"""
+
+import argparse
+import datetime as dt
+import pathlib
+import time
+
+from benchmarks import _legacy_parsing
+from benchmarks._harness import set_default_environment
+from reminders.parsing import parse_reminder_msg
+
+
+set_default_environment()
+
+
+CORPUS = pathlib.Path(__file__).parent / "data" / "remind_messages.txt"
+DATES_TOLERANCE = dt.timedelta(seconds=1)
+
+
+def legacy_parse_reminder_msg(msg: str) -> tuple[str | None, dt.datetime | None, str]:
+    """The pre-parser pipeline of create_reminder()."""
+    if err := _legacy_parsing.validate_msg(msg):
+        return None, None, err
+    try:
+        return _legacy_parsing.extract_info_from_msg(msg.split())
+    except (OverflowError, ValueError) as e:  # Used to crash the command.
+        return None, None, repr(e)
+
+
+def parse(msg: str) -> tuple[str | None, dt.datetime | None, str]:
+    reminder_name, reminder_date, _, err = parse_reminder_msg(msg)
+    return reminder_name, reminder_date, err.value if err else ""
+
+
+def measure(parse_msg, msgs: list[str], rounds: int) -> list[float]:
+    """Returns mean time of parsing each of the messages in microseconds."""
+    durations = []
+    for msg in msgs:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            parse_msg(msg)
+        durations.append((time.perf_counter() - started) / rounds * 1e6)
+    return durations
+
+
+def is_regression(legacy_result: tuple, result: tuple) -> bool:
+    legacy_name, legacy_date, legacy_err = legacy_result
+    name, date, err = result
+    if legacy_err:
+        return bool(err) and err != legacy_err
+    return bool(err) or name != legacy_name or abs(date - legacy_date) > DATES_TOLERANCE
+
+
+def main(rounds: int, corpus: pathlib.Path) -> None:
+    msgs = [line.strip() for line in corpus.read_text().splitlines() if line.strip()]
+    print(f"{len(msgs)} messages, {rounds} rounds")
+    for name, parse_msg in (("legacy", legacy_parse_reminder_msg), ("parser", parse)):
+        durations = measure(parse_msg, msgs, rounds)
+        print(
+            f"{name:>8}: {sum(durations) / len(durations):.2f}us per message, "
+            f"slowest message {max(durations):.2f}us"
+        )
+
+    newly_accepted = 0
+    for msg in msgs:
+        legacy_result, result = legacy_parse_reminder_msg(msg), parse(msg)
+        newly_accepted += bool(legacy_result[2] and not result[2])
+        if is_regression(legacy_result, result):
+            print(f"\n{msg!r}\n  legacy: {legacy_result!r}\n  parser: {result!r}")
+    print(f"{newly_accepted} messages are accepted only by the new parser")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--corpus", type=pathlib.Path, default=CORPUS)
+    args = parser.parse_args()
+    main(args.rounds, args.corpus)
@@ -0,0 +1,165 @@
+"""
+Fuzzes parse_reminder_msg() with random messages built from the grammar's words, valid
+and broken dates, times, numbers and recurrences, and random junk.
+
+Half of the messages end with a date expression shaped after the grammar. For every
+message it checks that the parser doesn't raise, that it returns either an error or
+a name and a timezone aware date which isn't in the past, and that the name is the
+beginning of the message. The slowest message is reported at the end.
+
+Usage: python -m benchmarks.parser_fuzz [--messages 200000] [--seed 0]
+"""
+
+import argparse
+import datetime as dt
+import random
+import sys
+import time
+
+from benchmarks._harness import set_default_environment
+import reminders.const as const
+from reminders.parsing import (
+    DAY_OFFSETS,
+    MSG_MAX_LENGTH,
+    TIME_UNITS,
+    WEEKDAYS,
+    ParseError,
+    parse_reminder_msg,
+)
+
+
+set_default_environment(LOCAL_TIMEZONE="Europe/Warsaw")
+
+
+SLOWEST_MSG_ROUNDS = 1000
+WORDS = (
+    *("me", "of", "to", "the", "and", "call", "mom", "ON", "In", "AT", "am", "pm"),
+    *("on", "in", "at", "on", "in", "at", "every"),
+    *DAY_OFFSETS,
+    *WEEKDAYS,
+    *TIME_UNITS,
+)
+
+
+def random_word(rng: random.Random) -> str:
+    kind = rng.randrange(10)
+    if kind < 4:
+        return rng.choice(WORDS)
+    if kind == 4:
+        return str(rng.choice((0, 1, 2, 5, 12, 30, 99, 500000000, 500000001, 10**12)))
+    if kind == 5:
+        return f"{rng.randrange(40)}.{rng.randrange(15)}" + rng.choice(
+            ("", f".{rng.randrange(100):02}", f".{rng.randrange(1900, 2200)}", ".")
+        )
+    if kind == 6:
+        return f"{rng.randrange(30)}:{rng.randrange(70):02}" + rng.choice(
+            ("", "", "am", "pm", "PM")
+        )
+    if kind == 7:
+        return "".join(
+            f"{rng.randrange(100)}{rng.choice(tuple(TIME_UNITS))}"
+            for _ in range(rng.randint(1, 3))
+        )
+    if kind == 8:
+        return f"{rng.randrange(13)}{rng.choice(('am', 'pm', 'xm', ''))}"
+    return "".join(rng.choice("٣0:.ahmsx-") for _ in range(rng.randint(1, 5)))
+
+
+def random_date_expression(rng: random.Random) -> list[str]:
+    """Returns words of a date expression which is likely (but not always) correct."""
+    if rng.randrange(3) == 0:
+        return ["in", *(random_word(rng) for _ in range(rng.randint(1, 4)))]
+    if rng.randrange(4) == 0:
+        return ["every", *(random_word(rng) for _ in range(rng.randint(1, 3)))]
+    date_parts = []
+    if rng.randrange(2):
+        date_parts.append("on")
+    if rng.randrange(3):
+        date_parts.append(
+            rng.choice(
+                (
+                    *DAY_OFFSETS,
+                    *WEEKDAYS,
+                    f"{rng.randint(1, 31)}.{rng.randint(1, 12)}",
+                    random_word(rng),
+                )
+            )
+        )
+    if rng.randrange(2) or not date_parts:
+        date_parts.append("at")
+    if rng.randrange(3):
+        date_parts.append(f"{rng.randrange(24)}:{rng.randrange(60):02}")
+    else:
+        date_parts.append(random_word(rng))
+    if rng.randrange(4) == 0:
+        date_parts.append(rng.choice(("am", "pm")))
+    return date_parts
+
+
+def check(msg: str, now: dt.datetime) -> str:
+    """Returns description of the problem or empty string if the result is correct."""
+    try:
+        reminder_name, reminder_date, recurrence, err = parse_reminder_msg(msg, now)
+    except Exception as e:
+        return f"raised {e!r}"
+    if err:
+        if not isinstance(err, ParseError) or reminder_name or reminder_date:
+            return f"returned {reminder_name!r}, {reminder_date!r}, {err!r}"
+        return ""
+    if reminder_date.tzinfo is None or reminder_date < now:
+        return f"returned date {reminder_date!r}"
+    if recurrence is not None and (
+        len(recurrence) != 1
+        or not set(recurrence) <= set(TIME_UNITS.values())
+        or not all(
+            isinstance(number, int) and number > 0 for number in recurrence.values()
+        )
+    ):
+        return f"returned recurrence {recurrence!r}"
+    if not " ".join(msg.split()).startswith(reminder_name):
+        return f"returned name {reminder_name!r}"
+    return ""
+
+
+def main(messages: int, seed: int) -> None:
+    rng = random.Random(seed)
+    failures = 0
+    slowest, slowest_msg, slowest_now = 0.0, "", None
+    for _ in range(messages):
+        msg_parts = [random_word(rng) for _ in range(rng.randint(0, 8))]
+        if rng.randrange(2):
+            msg_parts.extend(random_date_expression(rng))
+        msg = " ".join(msg_parts)
+        if rng.randrange(1000) == 0:
+            msg = (msg + " ") * (MSG_MAX_LENGTH // max(len(msg), 1))
+        now = (
+            dt.datetime(2020, 1, 1) + dt.timedelta(minutes=rng.randrange(20 * 525600))
+        ).replace(tzinfo=const.LOCAL_TIMEZONE)
+        started = time.perf_counter()
+        problem = check(msg, now)
+        duration = time.perf_counter() - started
+        if duration > slowest:
+            slowest, slowest_msg, slowest_now = duration, msg, now
+        if problem:
+            failures += 1
+            print(f"{msg!r} (now {now}): {problem}")
+
+    # A single measurement may include e.g. garbage collection, measure it again.
+    started = time.perf_counter()
+    for _ in range(SLOWEST_MSG_ROUNDS):
+        parse_reminder_msg(slowest_msg, slowest_now)
+    slowest_mean = (time.perf_counter() - started) / SLOWEST_MSG_ROUNDS
+    print(
+        f"{messages} messages, {failures} failures, slowest message "
+        f"{slowest * 1e6:.0f}us ({slowest_mean * 1e6:.1f}us in {SLOWEST_MSG_ROUNDS} "
+        f"rounds): {slowest_msg[:80]!r}"
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.messages, args.seed)
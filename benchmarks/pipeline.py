@@ -0,0 +1,253 @@
+"""
+Measures the create -> fire pipeline: the !remind command and the reminder loop.
+
+--seed reminders due in the far future are inserted first, so the queries run against
+a realistically sized collection. Then --creates reminders are created by calling the
+create_reminder command with fake Discord contexts, --concurrency at a time. The
+created reminders are then moved to the next --spread seconds and fired by the
+reminder loop (ReminderScheduler) with a fake Discord client.
+
+Reported: creates per second and the command's latency, the reminder loop's tick
+duration, firing lateness (p50/p99) and MongoDB operations per created and per fired
+reminder. The results are saved as JSON, --compare prints the changes against a
+previous run's results, e.g. of another commit.
+
+Runs against mongomock by default, which scans the collections instead of using
+their indexes, so use --mongo-uri (e.g. docker run -p 27017:27017 mongo) for
+absolute numbers. The benchmark's database is dropped before every run.
+Usage: python -m benchmarks.pipeline [--seed 10000] [--creates 1000]
+    [--concurrency 20] [--spread 10] [--mongo-uri URI] [--output PATH]
+    [--compare PATH]
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import pathlib
+import time
+
+import bson
+import pymongo
+
+from benchmarks._harness import (
+    RESULTS_DIRECTORY,
+    SEEDED_AUTHORS_OFFSET,
+    FakeBot,
+    FakeChannel,
+    FakeContext,
+    connect,
+    git_commit,
+    seed_reminders,
+    set_default_environment,
+    summary,
+)
+import reminders.const as const
+import reminders.scheduler
+from reminders.core import create_reminder, process_due_reminders
+from reminders.delivery import REMINDERS_SENT
+from reminders.indexes import ensure_indexes
+from reminders.scheduling import schedule_reminder
+import utils.db
+
+
+set_default_environment(DATABASE_NAME="reminderbot_benchmark_pipeline")
+
+
+CREATING_AUTHORS = 100
+FIRE_LEAD = 1
+FIRE_TIMEOUT = 60
+
+
+async def run_creates(
+    count: int, concurrency: int, channel: FakeChannel
+) -> tuple[float, list[float]]:
+    """Returns the creating time and each create's latency."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def create(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await create_reminder(
+                FakeContext(i % CREATING_AUTHORS, channel),
+                msg=f"me of benchmark reminder {i} in 1 hour",
+            )
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(create(i) for i in range(count)))
+    return time.perf_counter() - started, latencies
+
+
+async def fire_reminders(
+    reminders_ids: list[bson.ObjectId], spread: float, channel: FakeChannel, ops_counter
+) -> dict:
+    """
+    Moves the reminders to the next `spread` seconds and runs the reminder loop until
+    all of them are sent (at most FIRE_TIMEOUT seconds after the last is due).
+    """
+    ticks = []
+    first_tick = asyncio.Event()
+
+    async def timed_process_due_reminders(*args) -> bool:
+        first_tick.set()
+        started = time.perf_counter()
+        try:
+            return await process_due_reminders(*args)
+        finally:
+            ticks.append(time.perf_counter() - started)
+
+    reminders.scheduler.process_due_reminders = timed_process_due_reminders
+    const.DELIVERY_LATENESS_SAMPLES = max(len(reminders_ids), 2)
+    scheduler = reminders.scheduler.ReminderScheduler(FakeBot(channel))
+    loading_started = time.perf_counter()
+    scheduler.start()
+    # The first tick follows loading the due-time queue, which has nothing due yet.
+    await first_tick.wait()
+    loading_duration = time.perf_counter() - loading_started
+
+    first_due = time.time() + FIRE_LEAD
+    reminders_dates = {
+        reminder_id: first_due + spread * i / max(len(reminders_ids), 1)
+        for i, reminder_id in enumerate(reminders_ids)
+    }
+    if reminders_dates:
+        await utils.db.run_db(
+            const.FUTURE_REMINDERS.bulk_write,
+            [
+                pymongo.UpdateOne(
+                    {"_id": reminder_id},
+                    {
+                        "$set": {
+                            "reminder_date": dt.datetime.fromtimestamp(
+                                due, dt.timezone.utc
+                            )
+                        }
+                    },
+                )
+                for reminder_id, due in reminders_dates.items()
+            ],
+        )
+    for reminder_id, due in reminders_dates.items():
+        schedule_reminder(reminder_id, due)
+
+    ticks.clear()
+    ops_counter.counts.clear()
+    sent_before = REMINDERS_SENT.value
+    deadline = first_due + spread + FIRE_TIMEOUT
+    while REMINDERS_SENT.value - sent_before < len(reminders_ids):
+        if time.time() > deadline:
+            print("Not all reminders were sent in time.")
+            break
+        await asyncio.sleep(0.05)
+    # Stopping lets the tick in progress finish archiving its reminders.
+    await scheduler.stop()
+
+    fired = REMINDERS_SENT.value - sent_before
+    ops = sum(ops_counter.counts.values())
+    return {
+        "fired": fired,
+        "queue_loading_ms": loading_duration * 1000,
+        "ticks": len(ticks),
+        "tick": summary(ticks),
+        "lateness": summary(list(scheduler.delivery.lateness)),
+        "mongo_ops": ops,
+        "mongo_ops_per_reminder": ops / fired if fired else None,
+        "mongo_ops_by_name": dict(ops_counter.counts.most_common()),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    ops_counter = connect(args.mongo_uri)
+    started = time.perf_counter()
+    await utils.db.run_db(seed_reminders, args.seed)
+    # Indexing after the bulk insert is faster than keeping the indexes up to date.
+    await ensure_indexes()
+    print(f"Seeded {args.seed} reminders in {time.perf_counter() - started:.1f}s.")
+
+    channel = FakeChannel()
+    ops_counter.counts.clear()
+    creating_duration, latencies = await run_creates(
+        args.creates, args.concurrency, channel
+    )
+    creating_ops = sum(ops_counter.counts.values())
+    created_ids = await utils.db.run_db(
+        lambda: [
+            reminder["_id"]
+            for reminder in const.FUTURE_REMINDERS.find(
+                {"author_id": {"$lt": SEEDED_AUTHORS_OFFSET}}, {"_id": 1}
+            )
+        ]
+    )
+    created = len(created_ids)
+    print(f"Created {created} of {args.creates} reminders, firing them.")
+    fire = await fire_reminders(created_ids, args.spread, channel, ops_counter)
+    await utils.db.close_db()
+
+    return {
+        "commit": git_commit(),
+        "date": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "database": "mongod" if args.mongo_uri else "mongomock",
+        "seeded": args.seed,
+        "concurrency": args.concurrency,
+        "spread_s": args.spread,
+        "create": {
+            "requested": args.creates,
+            "created": created,
+            "per_second": args.creates / creating_duration,
+            "latency": summary(latencies),
+            "mongo_ops": creating_ops,
+            "mongo_ops_per_reminder": creating_ops / args.creates,
+        },
+        "fire": fire,
+    }
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    """Returns the numeric results keyed by their dotted paths."""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat |= flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def print_results(results: dict, previous: dict | None) -> None:
+    flat = flatten(results)
+    flat_previous = flatten(previous) if previous else {}
+    if previous:
+        print(f"Compared with {previous['commit']} ({previous['date']}):")
+    for key, value in flat.items():
+        line = f"  {key:<40} {value:>12.2f}"
+        if old_value := flat_previous.get(key):
+            line += f"  {(value - old_value) / old_value:+8.1%} (was {old_value:.2f})"
+        print(line)
+
+
+def main(args: argparse.Namespace) -> None:
+    results = asyncio.run(run(args))
+    previous = json.loads(args.compare.read_text()) if args.compare else None
+    print_results(results, previous)
+
+    output = args.output or RESULTS_DIRECTORY / (
+        f"pipeline-{results['commit'] or 'unknown'}-{results['database']}"
+        f"-{args.seed}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Saved the results to {output}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", type=int, default=10000)
+    parser.add_argument("--creates", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--spread", type=float, default=10)
+    parser.add_argument("--mongo-uri")
+    parser.add_argument("--output", type=pathlib.Path)
+    parser.add_argument("--compare", type=pathlib.Path)
+    main(parser.parse_args())
@@ -0,0 +1,148 @@
+"""
+Compares reminders/rendering.py with the rendering it replaced, per embed.
+
+A burst of --reminders reminders due within --spread seconds is rendered the way the
+reminder loop renders it, with 1, COALESCE_REMINDERS_THRESHOLD and EMBED_MAX_FIELDS
+reminders going to each channel: below the threshold every reminder gets its own
+embed, from it they are packed into combined embeds. The dates formatting cache is
+cleared before each of the --rounds rounds, as every burst brings new dates. The
+upcoming reminders listing (one embed of LISTED_REMINDERS_LIMIT reminders) is
+rendered --rounds * 1000 times with the cache kept, like the listings are rendered
+over and over.
+
+Usage: python -m benchmarks.rendering [--reminders 10000] [--spread 10]
+    [--rounds 5]
+"""
+
+import argparse
+import datetime as dt
+import random
+import time
+
+import discord
+from discord.utils import escape_mentions
+
+from benchmarks import _legacy_rendering
+from benchmarks._harness import set_default_environment
+import reminders.const as const
+from reminders import reminding, rendering
+
+
+set_default_environment(LOCAL_TIMEZONE="Europe/Warsaw")
+
+
+MSG = ":exclamation: {}"
+LISTING_RENDERS_PER_ROUND = 1000
+# The functions of create_reminder_messages() which the legacy rendering replaces.
+REMINDING_FUNCTIONS = {
+    name: getattr(reminding, name)
+    for name in ("create_reminder_message", "create_coalesced_reminder_messages")
+}
+
+
+def create_burst(count: int, spread: float) -> list[dict]:
+    """
+    Returns reminders due within the next `spread` seconds, created during the last
+    day, with UTC dates, like MongoDB returns them.
+    """
+    now = dt.datetime.now(dt.timezone.utc)
+    return [
+        {
+            "_id": i,
+            "friendly_id": f"{i:x}",
+            "author_id": 10**17 + i % 1000,
+            "reminder_name_full": "benchmark reminder " * random.randint(1, 20),
+            "reminder_name_short": f"benchmark reminder {i}",
+            "date_created": now - dt.timedelta(seconds=random.uniform(0, 86400)),
+            "reminder_date": now + dt.timedelta(seconds=spread * i / count),
+        }
+        for i in range(count)
+    ]
+
+
+def create_listing_embed(reminders: list[dict]) -> tuple[str, discord.Embed]:
+    """The embed of list_reminders(), with its message's current date."""
+    embed = discord.Embed(
+        title=":date: Upcoming reminders:",
+        color=0x0000FF,
+    )
+    now = rendering.stamp_now()
+    for reminder in reminders:
+        embed_field_name = rendering.create_time_left_field_name(reminder, now)
+        reminder_description = "Reminder `{}` by <@{}>: ```{}```\n".format(
+            reminder["friendly_id"],
+            reminder["author_id"],
+            escape_mentions(reminder["reminder_name_short"]) or "-",
+        )
+        embed.add_field(name=embed_field_name, value=reminder_description, inline=False)
+    return rendering.format_now(now), embed
+
+
+def use_legacy_rendering(legacy: bool) -> None:
+    """Switches create_reminder_messages() to (or back from) the legacy rendering."""
+    for name, function in REMINDING_FUNCTIONS.items():
+        setattr(
+            reminding, name, getattr(_legacy_rendering, name) if legacy else function
+        )
+
+
+def render_burst(burst: list[dict], per_channel: int, rounds: int) -> float:
+    """Returns mean time of rendering an embed of the burst in microseconds."""
+    duration, embeds = 0.0, 0
+    for _ in range(rounds):
+        rendering._format_date.cache_clear()
+        started = time.perf_counter()
+        for i in range(0, len(burst), per_channel):
+            embeds += len(
+                reminding.create_reminder_messages(burst[i : i + per_channel], MSG)
+            )
+        duration += time.perf_counter() - started
+    return duration / embeds * 1e6
+
+
+def render_listing(create_embed, listed: list[dict], rounds: int) -> float:
+    """Returns mean time of rendering the listing's embed in microseconds."""
+    renders = rounds * LISTING_RENDERS_PER_ROUND
+    started = time.perf_counter()
+    for _ in range(renders):
+        create_embed(listed)
+    return (time.perf_counter() - started) / renders * 1e6
+
+
+def main(args: argparse.Namespace) -> None:
+    burst = create_burst(args.reminders, args.spread)
+    print(
+        f"{args.reminders} reminders due within {args.spread:g}s, "
+        f"{args.rounds} rounds, microseconds per embed:"
+    )
+    print(f"{'':<28} {'legacy':>9} {'rendering':>10} {'change':>8}")
+
+    for per_channel in (1, const.COALESCE_REMINDERS_THRESHOLD, const.EMBED_MAX_FIELDS):
+        results = []
+        for legacy in (True, False):
+            use_legacy_rendering(legacy)
+            results.append(render_burst(burst, per_channel, args.rounds))
+        use_legacy_rendering(False)
+        print_row(f"burst, {per_channel} per channel", *results)
+
+    listed = burst[: const.LISTED_REMINDERS_LIMIT]
+    print_row(
+        f"listing of {len(listed)}",
+        render_listing(_legacy_rendering.create_listing_embed, listed, args.rounds),
+        render_listing(create_listing_embed, listed, args.rounds),
+    )
+
+
+def print_row(name: str, legacy_duration: float, duration: float) -> None:
+    print(
+        f"{name:<28} {legacy_duration:>9.1f} {duration:>10.1f} "
+        f"{duration / legacy_duration - 1:>+8.1%}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reminders", type=int, default=10000)
+    parser.add_argument("--spread", type=float, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    main(parser.parse_args())
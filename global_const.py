@@ -1,23 +1,24 @@
 import os
+from zoneinfo import ZoneInfo
 
-from pymongo import MongoClient
 
-import pytz
-
-
-DATABASE_NAME = os.environ["DATABASE_NAME"]
-MONGODB_LINK = os.environ["MONGODB_LINK"]
-PW = os.environ["PW"]
-
-TOKEN = os.environ["TOKEN"]
-CHANNEL_ID = os.environ["CHANNEL_ID"]
-LOCAL_TIMEZONE = pytz.timezone(os.environ["LOCAL_TIMEZONE"])
-
-CLUSTER = MongoClient(MONGODB_LINK.format(PW))
-DB = CLUSTER[DATABASE_NAME]
+# Required settings, {environment variable: its value's type}. They're read on their
+# first use (e.g. global_const.TOKEN, see __getattr__ below), so importing the modules
+# doesn't need them, and checked when the bot starts (see check_settings). The
+# database settings (DATABASE_NAME, MONGODB_LINK, PW) are read when the MongoDB client
+# is created, see utils/db.py.
+REQUIRED_SETTINGS = {
+    "TOKEN": str,
+    "CHANNEL_ID": str,
+    "LOCAL_TIMEZONE": ZoneInfo,
+}
+# Optional. Several bot processes split the servers between them as Discord shards.
+SHARD_ID = os.environ.get("SHARD_ID")
+SHARD_COUNT = os.environ.get("SHARD_COUNT")
 
 COMMANDS_ALIASES = {
     "shutdown": (),
+    "profiling": ("profile",),
     "say_datetime": (
         "datetime",
         "date",
@@ -44,3 +45,16 @@ COMMANDS_ALIASES = {
         "instructions",
     ),
 }
+
+
+def __getattr__(name: str):
+    if name not in REQUIRED_SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = REQUIRED_SETTINGS[name](os.environ[name])
+    return value
+
+
+def check_settings() -> None:
+    """Reads the required settings, so a missing one stops the bot when it starts."""
+    for name in REQUIRED_SETTINGS:
+        __getattr__(name)
@@ -1,25 +1,73 @@
 """
-Allows Uptime Robot to periodically connect to the bot's replit host, which keeps
-the repository awake continuously.
+The bot's website, served from the bot's event loop. Uptime Robot periodically
+connects to it, which keeps the repository awake continuously on replit.
+/ready tells whether the bot is connected to Discord, the database is reachable
+and the reminder loop keeps up, /metrics serves Prometheus metrics.
 """
 
-from threading import Thread
+import asyncio
+import math
 
-from flask import Flask
+from aiohttp import web
+from discord.ext.commands import bot
 
+from utils import metrics
+from utils.db import ping, run_db
 
-app = Flask("")
 
+PORT = 8080
+READINESS_DB_TIMEOUT = 2
+MAX_SCHEDULER_LAG = 60
 
-@app.route("/")
-def home() -> str:
-    return "Hello. I am alive!"
 
+async def home(request: web.Request) -> web.Response:
+    return web.Response(text="Hello. I am alive!")
 
-def run() -> None:
-    app.run(host="0.0.0.0", port=8080)
 
+async def ready(request: web.Request) -> web.Response:
+    """Responds with the readiness checks, with status 503 if any of them failed."""
+    bot = request.app["bot"]
+    scheduler_lag = bot.reminder_scheduler.lag()
+    checks = {
+        "gateway": is_gateway_connected(bot),
+        "database": await is_database_reachable(),
+        "scheduler": scheduler_lag is not None and scheduler_lag < MAX_SCHEDULER_LAG,
+    }
+    status = 200 if all(checks.values()) else 503
+    return web.json_response(checks | {"scheduler_lag": scheduler_lag}, status=status)
 
-def keep_alive() -> None:
-    t = Thread(target=run)
-    t.start()
+
+async def metrics_page(request: web.Request) -> web.Response:
+    return web.Response(
+        text=metrics.render(), content_type="text/plain", charset="utf-8"
+    )
+
+
+def is_gateway_connected(bot: bot.Bot) -> bool:
+    # Latency is infinite until the first heartbeat is acknowledged.
+    return bot.is_ready() and not bot.is_closed() and math.isfinite(bot.latency)
+
+
+async def is_database_reachable() -> bool:
+    try:
+        await asyncio.wait_for(run_db(ping), READINESS_DB_TIMEOUT)
+    except Exception:
+        return False
+    return True
+
+
+async def keep_alive(bot: bot.Bot) -> web.AppRunner:
+    """Starts the website. Returns its runner, await runner.cleanup() stops it."""
+    app = web.Application()
+    app["bot"] = bot
+    app.add_routes(
+        [
+            web.get("/", home),
+            web.get("/ready", ready),
+            web.get("/metrics", metrics_page),
+        ]
+    )
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", PORT).start()
+    return runner
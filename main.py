@@ -1,11 +1,22 @@
 import asyncio
+import time
 
 import discord
 from discord.ext import commands
 
 import global_const
 from keep_alive import keep_alive
-from reminders.core import check_reminders
+from reminders.scheduler import ReminderScheduler
+from utils import profiling, startup
+from utils.db import close_db, connect_db
+from utils.metrics import Histogram
+
+
+COMMAND_SECONDS = Histogram(
+    "reminderbot_command_seconds",
+    "Time of handling commands, including the failed ones.",
+    label="command",
+)
 
 
 class MyHelp(commands.MinimalHelpCommand):
@@ -23,29 +34,69 @@ class Bot(commands.Bot):
         intents.message_content = True
         intents.presences = False
         intents.members = False
-        super().__init__(command_prefix="!", case_insensitive=True, intents=intents)
+        super().__init__(
+            command_prefix="!",
+            case_insensitive=True,
+            intents=intents,
+            shard_id=int(global_const.SHARD_ID) if global_const.SHARD_ID else None,
+            shard_count=(
+                int(global_const.SHARD_COUNT) if global_const.SHARD_COUNT else None
+            ),
+        )
 
         self.help_command = MyHelp()
+        self.reminder_scheduler = ReminderScheduler(self)
+        self.web_runner = None
+        self.profiling_task = None
 
     async def setup_hook(self) -> None:
+        with startup.timed("website"):
+            self.web_runner = await keep_alive(self)
+        with startup.timed("MongoDB connection"):
+            await connect_db()
         await self.load_extension("reminders.core")
         await self.load_extension("base.base")
+        print(startup.report())
+        startup.uninstall()
+        # setup_hook runs once per login, unlike on_ready which runs after reconnects.
+        self.reminder_scheduler.start()
+        if profiling.SUMMARY_INTERVAL and self.profiling_task is None:
+            self.profiling_task = asyncio.create_task(
+                profiling.print_summary_periodically(profiling.SUMMARY_INTERVAL)
+            )
 
     async def on_ready(self) -> None:
-        """on_ready can be run multiple times in some cases, we need to make sure
-        the check_reminders task is only started once."""
         print("Bot is online.")
-        self.loop.create_task(
-            check_reminders(self)
-        )  # FIXME: make sure it's run only once.
+
+    async def invoke(self, ctx: commands.Context) -> None:
+        started = time.perf_counter()
+        try:
+            # The command's stages are profiled under the command's name.
+            with profiling.stage(ctx.command.name if ctx.command else "no_command"):
+                await super().invoke(ctx)
+        finally:
+            if ctx.command is not None:
+                COMMAND_SECONDS.labels(ctx.command.name).observe(
+                    time.perf_counter() - started
+                )
+
+    async def close(self) -> None:
+        """Stops the reminder loop and waits for pending database writes first."""
+        await self.reminder_scheduler.stop()
+        if self.profiling_task is not None:
+            self.profiling_task.cancel()
+        await super().close()
+        if self.web_runner is not None:
+            await self.web_runner.cleanup()
+        await close_db()
 
 
 async def main() -> None:
+    global_const.check_settings()
     async with Bot() as bot:
         await bot.start(global_const.TOKEN)
 
 
-keep_alive()
 asyncio.run(main())
 
 # FIXME: Fix Python warnings in the project.
@@ -0,0 +1,141 @@
+"""
+Claims of due reminders, which let several bot processes share FUTURE_REMINDERS.
+A process claims a batch of due reminders before sending them by stamping them with
+its own token and a lease, and only the reminders stamped with its token are sent by
+it. Claimed reminders are skipped by the other processes until the lease expires, so
+reminders claimed by a process that died mid-tick are taken over by the others.
+
+A reminder goes through the states:
+    pending -> claimed -> delivered (or failed) -> archived
+Pending reminders (including the ones without the state field) wait for their date.
+A claimed reminder is being sent. A delivered reminder was sent and is being moved to
+PAST_REMINDERS, it's never sent again. A reminder claimed more than
+REMINDER_MAX_ATTEMPTS times fails instead of being sent once more. Archived reminders
+are in PAST_REMINDERS only, recurring ones go back to pending at their next occurrence.
+Delivered and failed reminders whose lease expired, e.g. because archiving them
+failed, are picked up by the recovery sweep (see recover_stale_reminders).
+"""
+
+import datetime as dt
+
+import bson
+import pymongo
+
+import reminders.const as const
+from utils.db import run_db
+from utils.metrics import Counter
+
+
+PENDING = "pending"
+CLAIMED = "claimed"
+DELIVERED = "delivered"
+FAILED = "failed"
+ARCHIVED = "archived"
+# Values for $unset, the claim fields are removed when a reminder is released.
+CLAIM_FIELDS = {"claimed_by": "", "claim_expires": ""}
+
+REMINDERS_GIVEN_UP = Counter(
+    "reminderbot_reminders_given_up",
+    "Number of reminders which failed after REMINDER_MAX_ATTEMPTS attempts.",
+)
+
+
+def unclaimed(now: dt.datetime) -> dict:
+    """Returns a filter of reminders which aren't claimed or whose lease expired."""
+    return {"$or": [{"claim_expires": None}, {"claim_expires": {"$lte": now}}]}
+
+
+def claim_reminders(
+    query: dict, update: dict, now: dt.datetime, limit: int
+) -> list[dict]:
+    """
+    Claims at most limit of the earliest reminders matching the query, which has to
+    match claimed reminders only if their lease expired. Returns the claimed
+    reminders sorted by reminder_date. Takes three round trips however many
+    reminders are claimed.
+    Blocking, use it through run_db().
+    """
+    candidates_ids = [
+        reminder["_id"]
+        for reminder in const.FUTURE_REMINDERS.find(query, {"_id": 1})
+        .sort("reminder_date", pymongo.ASCENDING)
+        .limit(limit)
+    ]
+    if not candidates_ids:
+        return []
+
+    # The query is checked again atomically for every document, so reminders claimed
+    # by another process since the query above are left alone.
+    token = bson.ObjectId()
+    update.setdefault("$set", {}).update(
+        {"claimed_by": token, "claim_expires": now + const.CLAIM_LEASE}
+    )
+    const.FUTURE_REMINDERS.update_many(
+        {"_id": {"$in": candidates_ids}, **query}, update
+    )
+    return list(
+        const.FUTURE_REMINDERS.find(
+            {"_id": {"$in": candidates_ids}, "claimed_by": token},
+            {"claim_expires": 0},
+        ).sort("reminder_date", pymongo.ASCENDING)
+    )
+
+
+async def claim_due_reminders(now: dt.datetime, limit: int) -> list[dict]:
+    """
+    Claims at most limit of the earliest due reminders which no other process holds
+    and which weren't delivered. Every claim counts as an attempt of sending them.
+    """
+    return await run_db(
+        claim_reminders,
+        {
+            "reminder_date": {"$lte": now},
+            "state": {"$in": [None, PENDING, CLAIMED]},
+            **unclaimed(now),
+        },
+        {"$set": {"state": CLAIMED}, "$inc": {"attempts": 1}},
+        now,
+        limit,
+    )
+
+
+async def recover_stale_reminders(now: dt.datetime, limit: int) -> list[dict]:
+    """
+    Claims at most limit of delivered or failed reminders whose lease expired before
+    they were archived, so archiving them can be finished without sending them again.
+    """
+    return await run_db(
+        claim_reminders,
+        {"state": {"$in": [DELIVERED, FAILED]}, "claim_expires": {"$lte": now}},
+        {},
+        now,
+        limit,
+    )
+
+
+async def set_reminders_states(reminders_by_state: dict[str, list[dict]]) -> None:
+    """
+    Moves claimed reminders to the states they're keyed by, in a single round trip.
+    Reminders moved back to pending are released, so any process can retry them.
+    Reminders which another process has claimed in the meantime are left alone.
+    """
+    updates = []
+    for state, reminders in reminders_by_state.items():
+        if not reminders:
+            continue
+        update = {"$set": {"state": state}}
+        if state == PENDING:
+            update["$unset"] = CLAIM_FIELDS
+        updates.append(pymongo.UpdateMany(still_claimed(reminders), update))
+        for reminder in reminders:
+            reminder["state"] = state
+    if updates:
+        await run_db(const.FUTURE_REMINDERS.bulk_write, updates, ordered=False)
+
+
+def still_claimed(reminders: list[dict]) -> dict:
+    """Returns a filter of the reminders, if they still hold the claims they got."""
+    return {
+        "_id": {"$in": [reminder["_id"] for reminder in reminders]},
+        "claimed_by": {"$in": list({reminder["claimed_by"] for reminder in reminders})},
+    }
@@ -1,24 +1,86 @@
+import datetime as dt
 import os
 
 from hashids import Hashids
 
-from global_const import (
-    CHANNEL_ID,
-    DB,
-    LOCAL_TIMEZONE,
+import global_const
+from utils.db import get_db
+
+# The collections (e.g. const.FUTURE_REMINDERS) are bound on their first use, see
+# __getattr__ below, so importing the modules doesn't create the MongoDB client nor
+# need the collections' names: (environment variable naming the collection, default
+# name, None if the variable is required).
+COLLECTIONS_NAMES = {
+    "FUTURE_REMINDERS": ("FUTURE_REMINDERS_COLLECTION_NAME", None),
+    "PAST_REMINDERS": ("PAST_REMINDERS_COLLECTION_NAME", None),
+    "REMINDERBOT_USERS_PROFILES": ("REMINDERBOT_USERS_PROFILES_COLLECTION_NAME", None),
+    "GUILDS_SETTINGS": ("GUILDS_SETTINGS_COLLECTION_NAME", "GUILDS_SETTINGS"),
+}
+# The bot's settings used as const.CHANNEL_ID and const.LOCAL_TIMEZONE, read on their
+# first use too (see global_const.py).
+GLOBAL_SETTINGS = ("CHANNEL_ID", "LOCAL_TIMEZONE")
+
+TIME_BETWEEN_REMINDER_CHECKS = 10
+# Time the reminder loop has to finish its tick in progress when the bot is closed.
+SCHEDULER_STOP_TIMEOUT = 60
+# A failed tick of the reminder loop is retried after SCHEDULER_ERROR_BACKOFF seconds,
+# doubled after each consecutive failure, up to SCHEDULER_MAX_ERROR_BACKOFF.
+SCHEDULER_ERROR_BACKOFF = 1
+SCHEDULER_MAX_ERROR_BACKOFF = 60
+
+# (time limit, max reminders created within the time limit) pairs.
+REMINDERS_CREATION_LIMITS = (
+    (dt.timedelta(minutes=20), 30),
+    (dt.timedelta(days=30), 1200),
+)
+# Number of the most recently created reminders kept in user's profile. It has to
+# cover the largest of REMINDERS_CREATION_LIMITS.
+USER_RECENT_REMINDERS_LIMIT = max(
+    max_reminders for _, max_reminders in REMINDERS_CREATION_LIMITS
 )
+MAX_ACTIVE_REMINDERS = 1000
+# Users' limits are cached in memory (see reminders/throttle.py).
+USER_LIMITS_CACHE_SIZE = 10000
+USER_LIMITS_CACHE_TTL = 600
 
-PAST_REMINDERS_COLLECTION_NAME = os.environ["PAST_REMINDERS_COLLECTION_NAME"]
-FUTURE_REMINDERS_COLLECTION_NAME = os.environ["FUTURE_REMINDERS_COLLECTION_NAME"]
-REMINDERBOT_USERS_PROFILES_COLLECTION_NAME = os.environ[
-    "REMINDERBOT_USERS_PROFILES_COLLECTION_NAME"
-]
+LISTED_REMINDERS_LIMIT = 8
+# Upcoming reminders listings are cached in memory (see reminders/listing.py).
+LISTING_CACHE_SIZE = 10000
+LISTING_CACHE_TTL = 60
+# Reminders' formatted dates are cached in memory (see reminders/rendering.py).
+DATES_FORMATTING_CACHE_SIZE = 10000
+DUE_REMINDERS_BATCH_SIZE = 500
+# Due reminders claimed by a bot process are skipped by the other processes for this
+# long (see reminders/claims.py). It has to cover sending a whole batch.
+CLAIM_LEASE = dt.timedelta(minutes=2)
+# A reminder claimed this many times without being sent isn't sent anymore, e.g. a
+# document which crashes the bot process doesn't make it crash over and over again.
+REMINDER_MAX_ATTEMPTS = 5
+# Creating a reminder is retried with a new friendly_id this many times, if another
+# bot process has created a reminder with the same friendly_id.
+FRIENDLY_ID_ATTEMPTS = 3
+# Guilds' reminder channels are cached in memory (see reminders/routing.py).
+ROUTING_CACHE_SIZE = 10000
+ROUTING_CACHE_TTL = 300
 
-FUTURE_REMINDERS = DB[FUTURE_REMINDERS_COLLECTION_NAME]
-PAST_REMINDERS = DB[PAST_REMINDERS_COLLECTION_NAME]
-REMINDERBOT_USERS_PROFILES = DB[REMINDERBOT_USERS_PROFILES_COLLECTION_NAME]
+DELIVERY_WORKERS = 20
+DELIVERY_CONCURRENCY_PER_CHANNEL = 5  # Discord's per channel message bucket size.
+DELIVERY_MAX_ATTEMPTS = 4
+DELIVERY_BACKOFF = 1
+DELIVERY_LATENESS_SAMPLES = 10000
+LATENESS_WARNING_THRESHOLD = 60
 
-TIME_BETWEEN_REMINDER_CHECKS = 10
+# Reminders due at the same time are sent in combined messages if there are at least
+# this many of them.
+COALESCE_REMINDERS_THRESHOLD = 5
+MESSAGE_MAX_LENGTH = 2000
+EMBED_MAX_FIELDS = 25
+EMBED_MAX_LENGTH = 6000
+EMBED_FIELD_VALUE_MAX_LENGTH = 1024
+
+RECURRENCE_MIN_INTERVAL = dt.timedelta(hours=1)
+# Number of the most recent occurrences kept in recurring reminder's PAST_REMINDERS log.
+RECURRENCE_LOG_LIMIT = 100
 
 hashids = Hashids()
 
@@ -70,6 +132,12 @@ COMMANDS_ALIASES = {
         "show-reminder",
         "show_r",
     ),
+    "set_reminder_channel": (
+        "reminder_channel",
+        "set_reminders_channel",
+        "reminders_channel",
+        "set-reminder-channel",
+    ),
     "delete_reminder": (
         "reminder_delete",
         "cancel_reminder",
@@ -80,3 +148,19 @@ COMMANDS_ALIASES = {
         "d_r",
     ),
 }
+
+
+def __getattr__(name: str):
+    if name in GLOBAL_SETTINGS:
+        value = globals()[name] = getattr(global_const, name)
+        return value
+    if name not in COLLECTIONS_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    variable, default_name = COLLECTIONS_NAMES[name]
+    collection_name = (
+        os.environ[variable]
+        if default_name is None
+        else os.environ.get(variable, default_name)
+    )
+    collection = globals()[name] = get_db()[collection_name]
+    return collection
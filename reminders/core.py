@@ -1,39 +1,72 @@
-import asyncio
 import datetime as dt
 
 import discord
 from discord.ext import commands
-from discord.ext.commands import bot, Context
+from discord.ext.commands import Context
 from discord.utils import escape_mentions
-import pymongo
 
 import reminders.const as const
+from reminders.claims import (
+    DELIVERED,
+    FAILED,
+    PENDING,
+    REMINDERS_GIVEN_UP,
+    claim_due_reminders,
+    recover_stale_reminders,
+    set_reminders_states,
+)
 from reminders.creating import (
     confirm_creating_reminder,
     create_reminder_to_insert,
-    extract_info_from_msg,
     insert_reminder_to_database,
 )
+from reminders.deleting import delete_reminder_from_database
+from reminders.delivery import ReminderDelivery
+from reminders.indexes import ensure_indexes
+from reminders.listing import (
+    add_to_listings,
+    get_author_upcoming_reminders,
+    get_upcoming_reminders,
+    remove_from_listings,
+)
+from reminders.migrations import migrate_user_profiles
+from reminders.parsing import parse_reminder_msg
+from reminders.recurrence import describe_recurrence, reschedule_recurring_reminders
 from reminders.reminding import (
-    archive_reminder,
+    archive_reminders,
     delete_done_reminders,
-    remind_user,
+    log_reminders_occurrences,
+    report_failed_reminders,
+)
+from reminders.rendering import (
+    create_time_left_field_name,
+    format_date,
+    format_now,
+    stamp_now,
+)
+from reminders.routing import set_guild_reminder_channel
+from reminders.scheduling import (
+    pop_due_reminders,
+    schedule_reminder,
+    unschedule_reminder,
 )
 from reminders.texts import Help, Error, Info
-from reminders.user_profile import (
-    update_user_after_canceling,
-    update_user_after_reminding,
+from reminders.throttle import (
+    record_created_reminder,
+    record_deleted_reminder,
+    record_reminded_reminders,
 )
+from reminders.user_profile import update_users_after_reminding
 from reminders.validate import (
-    validate_msg,
     validate_reminder_friendly_id,
     validate_user_profile,
 )
+from utils import profiling
+from utils.db import run_db
 from utils.utils import (
     display_error,
     display_error_on_channel,
     display_notification,
-    utc_to_local,
 )
 
 
@@ -46,6 +79,7 @@ async def help_reminders(ctx: Context) -> None:
         my_reminders: Help.MY_REMINDERS_EXAMPLE,
         show_reminder: Help.SHOW_REMINDER_EXAMPLE,
         delete_reminder: Help.DELETE_REMINDER_EXAMPLE,
+        set_reminder_channel: Help.SET_REMINDER_CHANNEL_EXAMPLE,
     }
 
     embed = discord.Embed(
@@ -64,31 +98,38 @@ async def help_reminders(ctx: Context) -> None:
 )
 async def create_reminder(ctx: Context, *, msg: str = None) -> None:
     """Adds a new reminder to the database."""
-    err = validate_user_profile(ctx)
+    with profiling.stage("validate_user_profile"):
+        err = await validate_user_profile(ctx)
     if err:
         await display_error(ctx, err)
         return
 
-    err = validate_msg(msg)
+    with profiling.stage("parse_reminder_msg"):
+        parsed_msg = parse_reminder_msg(msg)
+    reminder_name, reminder_date, recurrence_interval, err = parsed_msg
     if err:
-        await display_error(ctx, err)
+        await display_error(ctx, err.value)
         return
 
-    msg_parts = msg.split()
-    reminder_name, reminder_date, err = extract_info_from_msg(msg_parts)
+    with profiling.stage("create_reminder_to_insert"):
+        reminder_to_insert = create_reminder_to_insert(
+            ctx, reminder_name, reminder_date, msg, recurrence_interval
+        )
+    with profiling.stage("insert"):
+        err = await insert_reminder_to_database(ctx.author.id, reminder_to_insert)
     if err:
-        await display_error(ctx, err)
-        return
-
-    reminder_to_insert = create_reminder_to_insert(
-        ctx, reminder_name, reminder_date, msg
-    )
-    if err := insert_reminder_to_database(ctx.author.id, reminder_to_insert):
         await display_error(ctx, Error.INSERTION)
         return
-    await confirm_creating_reminder(
-        ctx, reminder_date, reminder_to_insert["friendly_id"]
-    )
+    schedule_reminder(reminder_to_insert["_id"], reminder_date)
+    record_created_reminder(ctx.author.id, reminder_to_insert)
+    add_to_listings(reminder_to_insert)
+    with profiling.stage("confirm"):
+        await confirm_creating_reminder(
+            ctx,
+            reminder_date,
+            reminder_to_insert["friendly_id"],
+            reminder_to_insert.get("recurrence"),
+        )
 
 
 @commands.command(
@@ -97,9 +138,7 @@ async def create_reminder(ctx: Context, *, msg: str = None) -> None:
 )
 async def list_reminders(ctx: Context) -> None:
     """Lists maximum of 8 upcoming reminders."""
-    sorted_reminders = list(
-        const.FUTURE_REMINDERS.find().sort("reminder_date", pymongo.ASCENDING).limit(8)
-    )
+    sorted_reminders = await get_upcoming_reminders()
     if not sorted_reminders:
         await display_notification(ctx, Info.EMPTY_LIST_NOTIFICATION)
         return
@@ -108,15 +147,9 @@ async def list_reminders(ctx: Context) -> None:
         title=":date: Upcoming reminders:",
         color=0x0000FF,
     )
+    now = stamp_now()
     for reminder in sorted_reminders:
-        remind_in = str(
-            utc_to_local(reminder["reminder_date"])
-            - dt.datetime.now(const.LOCAL_TIMEZONE)
-        ).split(".")[0]
-        embed_field_name = ":hourglass: Left: {}  |  {}:".format(
-            remind_in if remind_in[0] != "-" else "0:00:00",
-            utc_to_local(reminder["reminder_date"]).strftime("%d.%m.%Y %H:%M:%S"),
-        )
+        embed_field_name = create_time_left_field_name(reminder, now)
         reminder_description = "Reminder `{}` by <@{}>: ```{}```\n".format(
             reminder["friendly_id"],
             reminder["author_id"],
@@ -124,10 +157,7 @@ async def list_reminders(ctx: Context) -> None:
         )
         embed.add_field(name=embed_field_name, value=reminder_description, inline=False)
 
-    current_datetime = dt.datetime.now(const.LOCAL_TIMEZONE).strftime(
-        "%d.%m.%Y %H:%M:%S"
-    )
-    await ctx.send(current_datetime, embed=embed)
+    await ctx.send(format_now(now), embed=embed)
 
 
 @commands.command(
@@ -136,46 +166,33 @@ async def list_reminders(ctx: Context) -> None:
 )
 async def my_reminders(ctx: Context) -> None:
     """Lists maximum of 8 upcoming reminders that belong to the caller."""
-    user_profile = const.REMINDERBOT_USERS_PROFILES.find_one({"_id": ctx.author.id})
-    if not user_profile:
+    user_profile_exists, sorted_user_reminders = await get_author_upcoming_reminders(
+        ctx.author.id
+    )
+    if not user_profile_exists:
         await display_notification(ctx, Info.EMPTY_MY_PROFILE_NOTIFICATION)
         return
 
-    reminder_date_sorted_user_specific_reminders = list(
-        const.FUTURE_REMINDERS.find(
-            {"_id": {"$in": user_profile["user_future_reminders"]}}
-        )
-        .sort("reminder_date", pymongo.ASCENDING)
-        .limit(8)
-    )
-    if not reminder_date_sorted_user_specific_reminders:
+    if not sorted_user_reminders:
         await display_notification(ctx, Info.NO_REMINDERS_NOTIFICATION)
         return
 
     embed = discord.Embed(
-        title=f":date: Upcoming reminders by {ctx.author.nick or ctx.author.name}:",
+        title=":date: Upcoming reminders by {}:".format(
+            getattr(ctx.author, "nick", None) or ctx.author.name
+        ),
         color=0x0000FF,
     )
-
-    for reminder in reminder_date_sorted_user_specific_reminders:
-        remind_in = str(
-            utc_to_local(reminder["reminder_date"])
-            - dt.datetime.now(const.LOCAL_TIMEZONE)
-        ).split(".")[0]
-        embed_field_name = ":hourglass: Left: {}  |  {}:".format(
-            remind_in if remind_in[0] != "-" else "0:00:00",
-            utc_to_local(reminder["reminder_date"]).strftime("%d.%m.%Y %H:%M:%S"),
-        )
+    now = stamp_now()
+    for reminder in sorted_user_reminders:
+        embed_field_name = create_time_left_field_name(reminder, now)
         reminder_description = "Reminder `{}`\n```{}```\n".format(
             reminder["friendly_id"],
             escape_mentions(reminder["reminder_name_short"]) or "-",
         )
         embed.add_field(name=embed_field_name, value=reminder_description, inline=False)
 
-    current_datetime = dt.datetime.now(const.LOCAL_TIMEZONE).strftime(
-        "%d.%m.%Y %H:%M:%S"
-    )
-    await ctx.send(current_datetime, embed=embed)
+    await ctx.send(format_now(now), embed=embed)
 
 
 @commands.command(
@@ -191,36 +208,36 @@ async def show_reminder(ctx: Context, *, reminder_friendly_id: str = None) -> No
         await display_error(ctx, err)
         return
 
-    reminder = const.FUTURE_REMINDERS.find_one({"friendly_id": reminder_friendly_id})
+    reminder = await run_db(
+        const.FUTURE_REMINDERS.find_one, {"friendly_id": reminder_friendly_id}
+    )
     if reminder is None:
         await display_error(ctx, Error.NO_REMINDER_WITH_THIS_ID)
         return
 
     embed = discord.Embed(
-        title="Reminder by {}:".format(ctx.author.nick or ctx.author.name),
+        title="Reminder by {}:".format(
+            getattr(ctx.author, "nick", None) or ctx.author.name
+        ),
         color=0x0000FF,
     )
-    remind_in = str(
-        utc_to_local(reminder["reminder_date"]) - dt.datetime.now(const.LOCAL_TIMEZONE)
-    ).split(".")[0]
-    embed_field_name = ":hourglass: Left: {}  |  {}:".format(
-        remind_in if remind_in[0] != "-" else "0:00:00",
-        utc_to_local(reminder["reminder_date"]).strftime("%d.%m.%Y %H:%M:%S"),
-    )
+    now = stamp_now()
+    embed_field_name = create_time_left_field_name(reminder, now)
     reminder_description = (
         "Reminder `{}` by <@{}> ({}):\n```{}```\n*Created on {}.*".format(
             reminder["friendly_id"],
             reminder["author_id"],
             reminder["author_nick"] or reminder["author_name"],
             escape_mentions(reminder["reminder_name_full"]) or "-",
-            utc_to_local(reminder["date_created"]).strftime("%d.%m.%Y %H:%M:%S"),
+            format_date(reminder["date_created"]),
         )
     )
+    if recurrence := reminder.get("recurrence"):
+        reminder_description += "\n*Repeats every {}.*".format(
+            describe_recurrence(recurrence)
+        )
     embed.add_field(name=embed_field_name, value=reminder_description, inline=False)
-    current_datetime = dt.datetime.now(const.LOCAL_TIMEZONE).strftime(
-        "%d.%m.%Y %H:%M:%S"
-    )
-    await ctx.send(current_datetime, embed=embed)
+    await ctx.send(format_now(now), embed=embed)
 
 
 @commands.command(
@@ -237,32 +254,24 @@ async def delete_reminder(ctx: Context, *, reminder_friendly_id: str = None) ->
         await display_error(ctx, err)
         return
 
-    rmndr_to_delete = const.FUTURE_REMINDERS.find_one(
-        {"friendly_id": reminder_friendly_id, "author_id": ctx.author.id}
+    rmndr_to_delete, err = await delete_reminder_from_database(
+        ctx.author.id, reminder_friendly_id
     )
-    if not rmndr_to_delete:
-        await display_error(ctx, Error.NO_REMINDER_ID_DELETE)
-        return
-
-    if err := update_user_after_canceling(ctx.author.id, rmndr_to_delete["_id"]):
-        await display_error(ctx, Error.TRY_AGAIN)
-        return
-
-    result = const.FUTURE_REMINDERS.delete_one(
-        {"friendly_id": reminder_friendly_id, "author_id": ctx.author.id}
-    )
-    if result.deleted_count == 0:
-        await display_error(ctx, Error.TRY_AGAIN)
+    if err:
+        await display_error(ctx, err)
         return
+    unschedule_reminder(rmndr_to_delete["_id"])
+    record_deleted_reminder(ctx.author.id, rmndr_to_delete["_id"])
+    remove_from_listings([rmndr_to_delete])
 
     reminder_description = "```{}```\n`{}`  created on  `{}`".format(
         rmndr_to_delete["reminder_name_full"] or "- ",
         rmndr_to_delete["friendly_id"],
-        utc_to_local(rmndr_to_delete["date_created"]).strftime("%d.%m.%Y %H:%M:%S"),
+        format_date(rmndr_to_delete["date_created"]),
     )
     embed = discord.Embed(
         title=":x: Deleted reminder set to {}".format(
-            utc_to_local(rmndr_to_delete["reminder_date"]).strftime("%d.%m.%Y %H:%M:%S"),
+            format_date(rmndr_to_delete["reminder_date"]),
         ),
         description=reminder_description,
         color=0xFFA500,
@@ -270,42 +279,186 @@ async def delete_reminder(ctx: Context, *, reminder_friendly_id: str = None) ->
     await ctx.send(embed=embed)
 
 
-async def check_reminders(bot: bot.Bot) -> None:
-    """Periodically checks whether there are any reminders for the current time."""
-    await bot.wait_until_ready()
-    channel = bot.get_channel(int(const.CHANNEL_ID))
-    while not bot.is_closed():
-        reminders_to_delete = []
-        for reminder in const.FUTURE_REMINDERS.find():
-            current_datetime = dt.datetime.now(const.LOCAL_TIMEZONE)
-            reminder_datetime = utc_to_local(reminder["reminder_date"])
-            if reminder_datetime > current_datetime:
-                continue
-            await remind_user(bot, reminder, ":exclamation: {}")
-
-            if err := await archive_reminder(reminder):
-                await display_error_on_channel(channel, err)
-                continue
+@commands.command(
+    aliases=const.COMMANDS_ALIASES["set_reminder_channel"],
+    description=Help.SET_REMINDER_CHANNEL,
+)
+async def set_reminder_channel(
+    ctx: Context, channel: discord.TextChannel = None
+) -> None:
+    """Sets (or without a channel resets) the channel the server's reminders go to."""
+    if ctx.guild is None:
+        await display_error(ctx, Error.ONLY_ON_SERVER)
+        return
 
-            if err := update_user_after_reminding(
-                reminder["author_id"], reminder["_id"]
-            ):
-                await display_error_on_channel(channel, err)
-                continue
+    if not ctx.author.guild_permissions.manage_guild:
+        await display_error(ctx, Error.MANAGE_SERVER_REQUIRED)
+        return
 
-            reminders_to_delete.append(reminder["_id"])
+    if channel is not None and not channel.permissions_for(ctx.guild.me).send_messages:
+        await display_error(ctx, Error.CANT_SEND_TO_CHANNEL)
+        return
 
+    await set_guild_reminder_channel(ctx.guild.id, channel.id if channel else None)
+    if channel is None:
+        await display_notification(ctx, Info.REMINDER_CHANNEL_RESET)
+    else:
+        await display_notification(ctx, Info.REMINDER_CHANNEL_SET.format(channel.id))
+
+
+async def process_due_reminders(
+    channel: discord.channel.TextChannel | None, delivery: ReminderDelivery, now: float
+) -> bool:
+    """
+    Sends due reminders, archives them and removes them from FUTURE_REMINDERS.
+    Recurring reminders are logged and moved to their next occurrences instead.
+    Due reminders are claimed before they're sent and marked as delivered after, so
+    several bot processes can run the reminder loop on the same database and
+    a reminder is never sent again once it was delivered (see reminders/claims.py).
+    Errors are displayed on the channel, or only logged if it's None.
+    Returns True if there may be more due reminders waiting in the database.
+    """
+    # Reminders are claimed first, so each of them is sent by one bot process only.
+    now_utc = dt.datetime.fromtimestamp(now, dt.timezone.utc)
+    with profiling.stage("scan"):
+        claimed_reminders = await claim_due_reminders(
+            now_utc, const.DUE_REMINDERS_BATCH_SIZE
+        )
+        stale_reminders = await recover_stale_reminders(
+            now_utc, const.DUE_REMINDERS_BATCH_SIZE
+        )
+
+    due_reminders = [
+        reminder
+        for reminder in claimed_reminders
+        if reminder["attempts"] <= const.REMINDER_MAX_ATTEMPTS
+    ]
+    given_up_reminders = [
+        reminder
+        for reminder in claimed_reminders
+        if reminder["attempts"] > const.REMINDER_MAX_ATTEMPTS
+    ]
+    REMINDERS_GIVEN_UP.inc(len(given_up_reminders))
+    with profiling.stage("send"):
+        errors = await delivery.deliver(due_reminders, ":exclamation: {}")
+    unsent_reminders = [
+        reminder for reminder in due_reminders if reminder["_id"] in errors
+    ]
+    with profiling.stage("set_states"):
+        await set_reminders_states(
+            {
+                PENDING: unsent_reminders,
+                DELIVERED: [
+                    reminder
+                    for reminder in due_reminders
+                    if reminder["_id"] not in errors
+                ],
+                FAILED: given_up_reminders,
+            }
+        )
+    for reminder in unsent_reminders:
+        schedule_reminder(reminder["_id"], now + const.TIME_BETWEEN_REMINDER_CHECKS)
+
+    # Delivered and failed reminders are never sent again. If archiving them fails,
+    # it's retried by the recovery sweep once their lease expires.
+    finished_reminders = [
+        reminder
+        for reminder in claimed_reminders + stale_reminders
+        if reminder["state"] in (DELIVERED, FAILED)
+    ]
+    with profiling.stage("archive"):
+        errors |= await archive_reminders(
+            [
+                reminder
+                for reminder in finished_reminders
+                if not reminder.get("recurrence")
+            ]
+        )
+        errors |= await log_reminders_occurrences(
+            [
+                reminder
+                for reminder in finished_reminders
+                if reminder.get("recurrence") and reminder["state"] == DELIVERED
+            ]
+        )
+    with profiling.stage("profile_update"):
+        errors |= await update_users_after_reminding(
+            [
+                reminder
+                for reminder in finished_reminders
+                if reminder["_id"] not in errors and not reminder.get("recurrence")
+            ]
+        )
+    await report_failed_reminders(
+        channel,
+        claimed_reminders + stale_reminders,
+        errors
+        | {reminder["_id"]: Error.GAVE_UP_SENDING for reminder in given_up_reminders},
+    )
+
+    archived_reminders = [
+        reminder for reminder in finished_reminders if reminder["_id"] not in errors
+    ]
+    # Reminders left delivered or failed are recovered once their lease expires.
+    unfinished_reminders = [
+        reminder for reminder in finished_reminders if reminder["_id"] in errors
+    ]
+    one_time_reminders = [
+        reminder for reminder in archived_reminders if not reminder.get("recurrence")
+    ]
+    recurring_reminders = [
+        reminder for reminder in archived_reminders if reminder.get("recurrence")
+    ]
+    record_reminded_reminders(one_time_reminders)
+    remove_from_listings(archived_reminders)
+
+    reminders_to_delete = [reminder["_id"] for reminder in one_time_reminders]
+    with profiling.stage("delete"):
         if err := await delete_done_reminders(reminders_to_delete):
             print("\nCRITICAL: delete_done_reminders()\n")
-            await display_error_on_channel(channel, err)
-            continue
-        await asyncio.sleep(const.TIME_BETWEEN_REMINDER_CHECKS)
+            if channel is not None:
+                await display_error_on_channel(channel, err)
+            unfinished_reminders += one_time_reminders
+        rescheduled_reminders, err = await reschedule_recurring_reminders(
+            recurring_reminders, now
+        )
+        if err:
+            print("\nCRITICAL: reschedule_recurring_reminders()\n")
+            if channel is not None:
+                await display_error_on_channel(channel, err)
+            unfinished_reminders += recurring_reminders
+    # Reminders deleted since they were rescheduled aren't scheduled and listed again.
+    for reminder in rescheduled_reminders:
+        schedule_reminder(reminder["_id"], reminder["reminder_date"])
+        add_to_listings(reminder)
+    lease_expiry = now + const.CLAIM_LEASE.total_seconds()
+    for reminder in unfinished_reminders:
+        schedule_reminder(reminder["_id"], lease_expiry)
+
+    # A full batch means there may be more due reminders waiting in the database.
+    # Unsent reminders are retried later (they've been rescheduled).
+    batch_full = const.DUE_REMINDERS_BATCH_SIZE in (
+        len(claimed_reminders),
+        len(stale_reminders),
+    )
+    if batch_full and not errors:
+        return True
+    due_reminders_ids = pop_due_reminders(now)
+    if batch_full:
+        # The due reminders which didn't fit in the batch are checked again later.
+        for reminder_id in due_reminders_ids:
+            schedule_reminder(reminder_id, now + const.TIME_BETWEEN_REMINDER_CHECKS)
+    return False
 
 
 async def setup(bot):
+    await ensure_indexes()
+    if migrated_profiles := await run_db(migrate_user_profiles):
+        print(f"Migrated {migrated_profiles} user profiles.")
     bot.add_command(help_reminders)
     bot.add_command(create_reminder)
     bot.add_command(list_reminders)
     bot.add_command(my_reminders)
     bot.add_command(show_reminder)
     bot.add_command(delete_reminder)
+    bot.add_command(set_reminder_channel)
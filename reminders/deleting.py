@@ -0,0 +1,40 @@
+from pymongo.client_session import ClientSession
+from pymongo.errors import PyMongoError
+
+import reminders.const as const
+from reminders.claims import PENDING
+from reminders.texts import Error
+from reminders.user_profile import update_user_after_canceling
+from utils.db import run_db, run_in_transaction
+
+
+async def delete_reminder_from_database(
+    author_id: int, reminder_friendly_id: str
+) -> tuple[dict | None, str]:
+    """
+    Deletes user's reminder from the FUTURE_REMINDERS collection and updates user
+    profile, both in one transaction. Only pending reminders are deleted: a reminder
+    claimed by the reminder loop is being sent (see reminders/claims.py), it can be
+    deleted once it's back to pending (e.g. a recurring reminder at its next
+    occurrence).
+    Returns the deleted reminder and empty string if the deletion succeeded. Returns
+    None and error message otherwise.
+    """
+
+    def delete_reminder(session: ClientSession | None) -> tuple[dict | None, str]:
+        reminder_query = {"friendly_id": reminder_friendly_id, "author_id": author_id}
+        reminder = const.FUTURE_REMINDERS.find_one_and_delete(
+            reminder_query | {"state": {"$in": [None, PENDING]}}, session=session
+        )
+        if reminder:
+            update_user_after_canceling(author_id, reminder["_id"], session)
+            return reminder, ""
+        if const.FUTURE_REMINDERS.find_one(reminder_query, {"_id": 1}, session=session):
+            return None, Error.REMINDER_BEING_SENT
+        return None, Error.NO_REMINDER_ID_DELETE
+
+    try:
+        return await run_db(run_in_transaction, delete_reminder)
+    except PyMongoError as e:
+        print(f"\nERROR: delete_reminder_from_database(): {e!r}\n")
+        return None, Error.TRY_AGAIN
@@ -0,0 +1,171 @@
+"""
+Delivery pipeline for due reminders. Reminders are routed to their channels (see
+reminders/routing.py), a bounded pool of workers sends them concurrently, limits the
+number of in-flight requests per channel (Discord rate limits are per channel) and
+retries failed sends with exponential backoff.
+"""
+
+import asyncio
+from collections import deque
+import statistics
+import time
+
+import aiohttp
+import bson
+import discord
+from discord.ext.commands import bot
+
+import reminders.const as const
+from reminders.reminding import create_reminder_messages
+from reminders.routing import route_reminders
+from reminders.texts import Error
+from utils.metrics import Counter, Histogram
+
+
+REMINDERS_SENT = Counter("reminderbot_reminders_sent", "Number of sent reminders.")
+REMINDERS_UNSENT = Counter(
+    "reminderbot_reminders_unsent",
+    "Number of reminders which couldn't be sent (they're retried later).",
+)
+FIRING_LATENESS = Histogram(
+    "reminderbot_firing_lateness_seconds",
+    "Time between reminders' dates and sending them.",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600),
+)
+
+
+def is_retryable(e: Exception) -> bool:
+    """Checks whether sending a message may succeed if it's tried again."""
+    if isinstance(e, discord.HTTPException):
+        return e.status == 429 or e.status >= 500
+    return isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError, OSError))
+
+
+class ReminderDelivery:
+    def __init__(self, bot: bot.Bot) -> None:
+        self.bot = bot
+        self.lateness = deque(maxlen=const.DELIVERY_LATENESS_SAMPLES)
+        self._queue = asyncio.Queue()
+        self._channels = {}
+        self._channels_semaphores = {}
+        self._workers = []
+
+    def start(self) -> None:
+        for _ in range(const.DELIVERY_WORKERS):
+            self._workers.append(asyncio.create_task(self._work()))
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    def pending(self) -> int:
+        """Returns the number of messages waiting to be sent."""
+        return self._queue.qsize()
+
+    async def deliver(
+        self, reminders: list[dict], msg: str
+    ) -> dict[bson.objectid.ObjectId, str]:
+        """
+        Sends the reminders to their channels and waits until all of them are sent
+        or given up on. Only reminders going to the same channel are combined.
+        Returns error messages of the reminders that couldn't be sent, keyed by
+        reminder's ID. Returns empty dict if all of them were sent.
+        """
+        loop = asyncio.get_running_loop()
+        messages_results = []
+        for channel_id, channel_reminders in (await route_reminders(reminders)).items():
+            for message in create_reminder_messages(channel_reminders, msg):
+                result = loop.create_future()
+                self._queue.put_nowait(((channel_id, *message), result))
+                messages_results.append((message[0], result))
+
+        errors = {}
+        for messages_reminders, result in messages_results:
+            if err := await result:
+                errors |= {reminder["_id"]: err for reminder in messages_reminders}
+        if reminders:
+            oldest_reminder_date = min(
+                reminder["reminder_date"] for reminder in reminders
+            )
+            max_lateness = time.time() - oldest_reminder_date.timestamp()
+            if max_lateness > const.LATENESS_WARNING_THRESHOLD:
+                print(
+                    f"\nWARNING: {len(reminders)} reminders delivered up to "
+                    f"{max_lateness:.0f}s late. Recent lateness: "
+                    f"{self.lateness_summary()}\n"
+                )
+        return errors
+
+    def lateness_summary(self) -> dict[str, float]:
+        """Returns median, 99th percentile and max lateness of recent reminders."""
+        if len(self.lateness) < 2:
+            return {}
+        percentiles = statistics.quantiles(self.lateness, n=100)
+        return {
+            "p50": percentiles[49],
+            "p99": percentiles[98],
+            "max": max(self.lateness),
+        }
+
+    async def _work(self) -> None:
+        while True:
+            message, result = await self._queue.get()
+            try:
+                err = await self._send(*message)
+            except Exception as e:
+                friendly_ids = ", ".join(
+                    reminder["friendly_id"] for reminder in message[1]
+                )
+                print(f"\nERROR: sending reminders {friendly_ids}: {e!r}\n")
+                REMINDERS_UNSENT.inc(len(message[1]))
+                err = Error.CANT_SEND
+            finally:
+                self._queue.task_done()
+            result.set_result(err)
+
+    async def _send(
+        self, channel_id: int, reminders: list[dict], content: str, embed: discord.Embed
+    ) -> str:
+        """
+        Sends one message reminding of the reminders, retrying with exponential
+        backoff. Returns empty string if the message was sent. Returns error message
+        otherwise.
+        """
+        channel = await self._get_channel(channel_id)
+
+        async with self._get_channel_semaphore(channel_id):
+            attempt = 1
+            while True:
+                try:
+                    await channel.send(content, embed=embed)
+                    break
+                except Exception as e:
+                    if not is_retryable(e) or attempt >= const.DELIVERY_MAX_ATTEMPTS:
+                        raise
+                await asyncio.sleep(const.DELIVERY_BACKOFF * 2 ** (attempt - 1))
+                attempt += 1
+
+        sent_at = time.time()
+        REMINDERS_SENT.inc(len(reminders))
+        for reminder in reminders:
+            lateness = sent_at - reminder["reminder_date"].timestamp()
+            self.lateness.append(lateness)
+            FIRING_LATENESS.observe(lateness)
+        return ""
+
+    async def _get_channel(self, channel_id: int) -> discord.abc.Messageable:
+        if channel_id not in self._channels:
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:  # E.g. a DM channel the bot hasn't seen since start.
+                channel = await self.bot.fetch_channel(channel_id)
+            self._channels[channel_id] = channel
+        return self._channels[channel_id]
+
+    def _get_channel_semaphore(self, channel_id: int) -> asyncio.Semaphore:
+        if channel_id not in self._channels_semaphores:
+            self._channels_semaphores[channel_id] = asyncio.Semaphore(
+                const.DELIVERY_CONCURRENCY_PER_CHANNEL
+            )
+        return self._channels_semaphores[channel_id]
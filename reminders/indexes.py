@@ -0,0 +1,44 @@
+"""
+Index bootstrap. Makes sure the indexes that the reminder commands and the reminder
+loop rely on exist, so their queries are index scans instead of collection scans.
+"""
+
+import pymongo
+from pymongo.errors import OperationFailure
+
+import reminders.const as const
+from utils.db import run_db
+
+
+FUTURE_REMINDERS_INDEXES = (
+    # check_reminders: due reminders query, list_reminders: upcoming reminders.
+    pymongo.IndexModel([("reminder_date", pymongo.ASCENDING)]),
+    # check_reminders: stale delivered and failed reminders query.
+    pymongo.IndexModel(
+        [("state", pymongo.ASCENDING), ("claim_expires", pymongo.ASCENDING)]
+    ),
+    # show_reminder.
+    pymongo.IndexModel([("friendly_id", pymongo.ASCENDING)], unique=True),
+    # delete_reminder.
+    pymongo.IndexModel(
+        [("author_id", pymongo.ASCENDING), ("friendly_id", pymongo.ASCENDING)]
+    ),
+    # my_reminders.
+    pymongo.IndexModel(
+        [("author_id", pymongo.ASCENDING), ("reminder_date", pymongo.ASCENDING)]
+    ),
+)
+
+
+async def ensure_indexes() -> None:
+    """
+    Creates missing indexes. Existing indexes are left untouched. The indexes are
+    created one by one, so an index which can't be created, e.g. the unique
+    friendly_id index of a collection with duplicate friendly_ids, doesn't keep the
+    others from being created.
+    """
+    for index in FUTURE_REMINDERS_INDEXES:
+        try:
+            await run_db(const.FUTURE_REMINDERS.create_indexes, [index])
+        except OperationFailure as e:
+            print(f"\nCRITICAL: ensure_indexes(): {index.document['name']}: {e}\n")
@@ -0,0 +1,159 @@
+"""
+Read-through cache of the upcoming reminders listings: LISTED_REMINDERS_LIMIT
+nearest reminders of everyone (list_reminders) and of each author (my_reminders).
+Creating, deleting and reminding patch the cached listings in place, a listing is
+read from the database again only if it can't be patched or it's older than
+LISTING_CACHE_TTL seconds.
+Every patch bumps the listings' generation. A listing read from the database while
+the listings were patched may miss the patch, so it's returned but not cached.
+"""
+
+from collections import OrderedDict
+import datetime as dt
+import time
+
+import pymongo
+
+import reminders.const as const
+from utils.db import run_db
+
+
+class Listing:
+    def __init__(self, reminders: list[dict], profile_exists: bool = True) -> None:
+        self.reminders = reminders
+        self.profile_exists = profile_exists
+        self.loaded_at = time.monotonic()
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.loaded_at < const.LISTING_CACHE_TTL
+
+    def is_complete(self) -> bool:
+        """Checks whether the listing contains all reminders it could list."""
+        return len(self.reminders) < const.LISTED_REMINDERS_LIMIT
+
+
+_upcoming_reminders: Listing | None = None
+_authors_upcoming_reminders: OrderedDict[int, Listing] = OrderedDict()
+_generation = 0
+
+
+async def get_upcoming_reminders() -> list[dict]:
+    global _upcoming_reminders
+    if _upcoming_reminders is not None and _upcoming_reminders.is_fresh():
+        return _upcoming_reminders.reminders
+
+    generation = _generation
+    listing = Listing(
+        await run_db(
+            lambda: list(
+                const.FUTURE_REMINDERS.find()
+                .sort("reminder_date", pymongo.ASCENDING)
+                .limit(const.LISTED_REMINDERS_LIMIT)
+            )
+        )
+    )
+    if generation == _generation:
+        _upcoming_reminders = listing
+    return listing.reminders
+
+
+async def get_author_upcoming_reminders(author_id: int) -> tuple[bool, list[dict]]:
+    """
+    Returns whether the author has a profile (has ever made a reminder) and their
+    upcoming reminders.
+    """
+    listing = _authors_upcoming_reminders.get(author_id)
+    if listing is not None and listing.is_fresh():
+        _authors_upcoming_reminders.move_to_end(author_id)
+        return listing.profile_exists, listing.reminders
+
+    generation = _generation
+    listing = await run_db(load_author_upcoming_reminders, author_id)
+    if generation == _generation:
+        _authors_upcoming_reminders[author_id] = listing
+        _authors_upcoming_reminders.move_to_end(author_id)
+        if len(_authors_upcoming_reminders) > const.LISTING_CACHE_SIZE:
+            _authors_upcoming_reminders.popitem(last=False)
+    return listing.profile_exists, listing.reminders
+
+
+def load_author_upcoming_reminders(author_id: int) -> Listing:
+    profile = const.REMINDERBOT_USERS_PROFILES.find_one({"_id": author_id}, {"_id": 1})
+    if not profile:
+        return Listing([], profile_exists=False)
+    return Listing(
+        list(
+            const.FUTURE_REMINDERS.find({"author_id": author_id})
+            .sort("reminder_date", pymongo.ASCENDING)
+            .limit(const.LISTED_REMINDERS_LIMIT)
+        )
+    )
+
+
+def add_to_listings(reminder: dict) -> None:
+    """
+    Adds a freshly created (or rescheduled recurring) reminder to the cached listings
+    it belongs to.
+    """
+    global _generation
+    _generation += 1
+    # Cached reminders are shaped like the ones read from the database, which
+    # returns UTC datetimes.
+    reminder = reminder | {
+        "reminder_date": reminder["reminder_date"].astimezone(dt.timezone.utc),
+        "date_created": reminder["date_created"].astimezone(dt.timezone.utc),
+    }
+    if _upcoming_reminders is not None:
+        add_to_listing(_upcoming_reminders, reminder)
+    if listing := _authors_upcoming_reminders.get(reminder["author_id"]):
+        listing.profile_exists = True
+        add_to_listing(listing, reminder)
+
+
+def remove_from_listings(reminders: list[dict]) -> None:
+    """Removes deleted or reminded reminders from the cached listings."""
+    global _generation, _upcoming_reminders
+    if not reminders:
+        return
+    _generation += 1
+    for reminder in reminders:
+        if _upcoming_reminders is not None and not remove_from_listing(
+            _upcoming_reminders, reminder
+        ):
+            _upcoming_reminders = None
+
+        listing = _authors_upcoming_reminders.get(reminder["author_id"])
+        if listing is not None and not remove_from_listing(listing, reminder):
+            del _authors_upcoming_reminders[reminder["author_id"]]
+
+
+def add_to_listing(listing: Listing, reminder: dict) -> None:
+    reminder_timestamp = reminder["reminder_date"].timestamp()
+    for idx, listed_reminder in enumerate(listing.reminders):
+        if listed_reminder["reminder_date"].timestamp() > reminder_timestamp:
+            break
+    else:
+        if not listing.is_complete():
+            return  # Later than all listed reminders, so it doesn't get listed.
+        idx = len(listing.reminders)
+    listing.reminders = listing.reminders[:idx] + [reminder] + listing.reminders[idx:]
+    del listing.reminders[const.LISTED_REMINDERS_LIMIT :]
+
+
+def remove_from_listing(listing: Listing, reminder: dict) -> bool:
+    """
+    Removes the reminder from the listing. Returns False if the listing can't be
+    patched, because the reminder that should take the removed one's place is unknown.
+    """
+    listed_reminders = [
+        listed_reminder
+        for listed_reminder in listing.reminders
+        if listed_reminder["_id"] != reminder["_id"]
+    ]
+    if len(listed_reminders) == len(listing.reminders):
+        return True
+    if not listing.is_complete():
+        return False
+    listing.reminders = listed_reminders
+    return True
+
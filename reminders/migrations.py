@@ -0,0 +1,47 @@
+"""
+One-off data migrations. They are idempotent and run on every start of the bot (see
+reminders.core.setup), touching only the documents that still need migrating.
+Run "python -m reminders.migrations" to apply them without starting the bot.
+"""
+
+import reminders.const as const
+
+
+def migrate_user_profiles() -> int:
+    """
+    Replaces the unbounded user_all_reminders ID list of user profiles with
+    user_recent_reminders: the USER_RECENT_REMINDERS_LIMIT most recently created
+    reminders' IDs and creation dates. Returns the number of migrated profiles.
+    """
+    migrated_profiles = 0
+    profiles = const.REMINDERBOT_USERS_PROFILES.find(
+        {"user_all_reminders": {"$exists": True}},
+        {"user_all_reminders": {"$slice": -const.USER_RECENT_REMINDERS_LIMIT}},
+    )
+    for profile in profiles:
+        recent_reminders_ids = profile["user_all_reminders"]
+        dates_created = {}
+        for collection in (const.PAST_REMINDERS, const.FUTURE_REMINDERS):
+            for reminder in collection.find(
+                {"_id": {"$in": recent_reminders_ids}}, {"date_created": 1}
+            ):
+                dates_created[reminder["_id"]] = reminder["date_created"]
+
+        user_recent_reminders = [
+            {"_id": reminder_id, "date_created": dates_created[reminder_id]}
+            for reminder_id in recent_reminders_ids
+            if reminder_id in dates_created
+        ]
+        const.REMINDERBOT_USERS_PROFILES.update_one(
+            {"_id": profile["_id"]},
+            {
+                "$set": {"user_recent_reminders": user_recent_reminders},
+                "$unset": {"user_all_reminders": ""},
+            },
+        )
+        migrated_profiles += 1
+    return migrated_profiles
+
+
+if __name__ == "__main__":
+    print(f"Migrated {migrate_user_profiles()} user profiles.")
@@ -0,0 +1,341 @@
+"""
+Single-pass parser of the "!remind me of X on/in/at Y" command's message. Validates the
+message and produces the reminder's name and its timezone aware datetime at once.
+
+The date is always the end of the message and starts at (or up to two words before)
+the last date keyword of the message:
+    in 3 days and 4 hours / in 1h30m
+    on 31.12.30 23:59 / on 5.3 18:00 / on 5.3.2030 at 6pm
+    at 17:00 / tomorrow 9:00 / today at 9:30 pm / monday 9:00 / on fri 8am
+Recurring reminders start at the last "every" of the message:
+    every day / every 2 weeks / every day at 9:00 / every monday 9:00
+    every month on 5.3 12:00
+"""
+
+import datetime as dt
+from enum import Enum
+import re
+
+from dateutil.relativedelta import relativedelta
+
+import reminders.const as const
+from reminders.texts import Error
+
+
+class ParseError(Enum):
+    """Reasons for rejecting a message. Values are the texts displayed to the user."""
+
+    INVALID_FORMAT = Error.INVALID_FORMAT
+    TOO_LONG_NAME = Error.TOO_LONG_NAME
+    NO_ON_IN_IN_MSG = Error.NO_ON_IN_IN_MSG
+    WRONG_DATETIME_FORMAT = Error.WRONG_DATETIME_FORMAT
+    WRONG_DATETIME_INFO = Error.WRONG_DATETIME_INFO
+    CANT_BE_ONLY_ZEROS = Error.CANT_BE_ONLY_ZEROS
+    CANT_REMIND_IN_PAST = Error.CANT_REMIND_IN_PAST
+    TOO_BIG_NUMBER = Error.TOO_BIG_NUMBER
+    TOO_FREQUENT_RECURRENCE = Error.TOO_FREQUENT_RECURRENCE
+
+
+# Reminder's name, date, recurrence interval (relativedelta arguments) and error.
+ParseResult = tuple[str | None, dt.datetime | None, dict | None, ParseError | None]
+
+MSG_MAX_LENGTH = 1000
+TIME_UNIT_MAX_VALUE = 500000000
+TIME_OFFSET_MAX_YEARS = 20
+MISSING_YEAR_MAX_YEARS_AHEAD = 8  # The next 29th of February can be 8 years ahead.
+
+# Maps every accepted spelling of a time unit to the relativedelta argument.
+TIME_UNITS = {
+    spelling: unit
+    for unit, spellings in {
+        "years": ("y", "year", "years"),
+        "months": ("mth", "month", "months"),
+        "weeks": ("w", "week", "weeks"),
+        "days": ("d", "day", "days"),
+        "hours": ("h", "hour", "hours"),
+        "minutes": ("m", "min", "mins", "minute", "minutes"),
+        "seconds": ("s", "sec", "secs", "second", "seconds"),
+    }.items()
+    for spelling in spellings
+}
+DATE_SEPARATORS = frozenset(("on", "in", "at"))
+RECURRENCE_SEPARATOR = "every"
+DAY_OFFSETS = {"today": 0, "tomorrow": 1}
+WEEKDAYS = {
+    spelling: weekday
+    for weekday, spellings in enumerate(
+        (
+            ("monday", "mon"),
+            ("tuesday", "tue", "tues"),
+            ("wednesday", "wed"),
+            ("thursday", "thu", "thur", "thurs"),
+            ("friday", "fri"),
+            ("saturday", "sat"),
+            ("sunday", "sun"),
+        )
+    )
+    for spelling in spellings
+}
+# Words which start a date without "on". Weekdays' abbreviations are ordinary words
+# too (e.g. "in the sun at 17:00"), so they start a date only after "on" or "every".
+DAY_WORDS = frozenset(DAY_OFFSETS) | frozenset(
+    spelling for spelling in WEEKDAYS if spelling.endswith("day")
+)
+MERIDIEMS = frozenset(("am", "pm"))
+ONE_DAY = dt.timedelta(days=1)
+ONE_WEEK = dt.timedelta(weeks=1)
+
+_units_alternation = "|".join(
+    re.escape(spelling) for spelling in sorted(TIME_UNITS, key=len, reverse=True)
+)
+# "1h30m", "2d", "1y6mth".
+COMPACT_TIMEDELTA_PATTERN = re.compile(rf"(?:\d+(?:{_units_alternation}))+")
+COMPACT_TIMEDELTA_PART_PATTERN = re.compile(rf"(\d+)({_units_alternation})")
+# "5.3", "5.3.30", "05.03.2030".
+DATE_PATTERN = re.compile(r"(\d{1,2})\.(\d{1,2})(?:\.(\d\d|\d{4}))?")
+# "9:00", "21:30", "9:30pm", "9pm".
+TIME_PATTERN = re.compile(r"(\d{1,2})(?::(\d{1,2}))?(am|pm)?", re.IGNORECASE)
+
+
+def parse_reminder_msg(msg: str | None, now: dt.datetime | None = None) -> ParseResult:
+    """
+    Extracts reminder name, reminder date and recurrence interval (None for one-time
+    reminders) from the command's message. A recurrence is searched for from the last
+    "every" of the message, the date from the last date keyword of the message.
+    """
+    if msg is None:
+        return None, None, None, ParseError.INVALID_FORMAT
+    if len(msg) > MSG_MAX_LENGTH:
+        return None, None, None, ParseError.TOO_LONG_NAME
+
+    msg_parts = msg.split()
+    if now is None:
+        now = dt.datetime.now(const.LOCAL_TIMEZONE)
+    # Time offsets are added in the current UTC offset, so e.g. "in 3 hours" is three
+    # hours from now even across a DST change.
+    now = now.astimezone(dt.timezone(now.utcoffset()))
+
+    recurrence_err = None
+    for recurrence_idx in range(len(msg_parts) - 1, -1, -1):
+        if msg_parts[recurrence_idx] == RECURRENCE_SEPARATOR:
+            reminder_date, recurrence, recurrence_err = parse_recurrence(
+                msg_parts[recurrence_idx + 1 :], now
+            )
+            if not recurrence_err:
+                reminder_name = " ".join(msg_parts[:recurrence_idx])
+                return reminder_name, reminder_date, recurrence, None
+            break  # "every" may be a part of the name, e.g. "every box in 5 min".
+
+    for keyword_idx in range(len(msg_parts) - 1, -1, -1):
+        keyword = msg_parts[keyword_idx]
+        if keyword in DATE_SEPARATORS or keyword.lower() in DAY_WORDS:
+            break
+    else:
+        if recurrence_err:
+            return None, None, None, recurrence_err
+        if any(part.lower() in DATE_SEPARATORS for part in msg_parts):
+            return None, None, None, ParseError.NO_ON_IN_IN_MSG
+        return None, None, None, ParseError.INVALID_FORMAT
+
+    if keyword == "in":
+        date_idx = keyword_idx
+        reminder_date, err = parse_timedelta(msg_parts[keyword_idx + 1 :], now)
+    else:
+        date_idx, reminder_date, err = find_moment(msg_parts, keyword_idx, now)
+    if err:
+        return None, None, None, recurrence_err or err
+    return " ".join(msg_parts[:date_idx]), reminder_date, None, None
+
+
+def parse_recurrence(
+    recurrence_parts: list[str], now: dt.datetime
+) -> tuple[dt.datetime | None, dict | None, ParseError | None]:
+    """
+    Parses "[<number>] <unit> [<date>]" or "<weekday> [at] HH:MM" into the first
+    reminder date and the recurrence interval. Without a date the reminder is first
+    due one interval from now.
+    """
+    if recurrence_parts and recurrence_parts[0].lower() in WEEKDAYS:
+        reminder_date, err = parse_moment(recurrence_parts, now)
+        return (None, None, err) if err else (reminder_date, {"weeks": 1}, None)
+
+    number, idx = "1", 0
+    if recurrence_parts and recurrence_parts[0].isdecimal():
+        number, idx = recurrence_parts[0], 1
+    if idx >= len(recurrence_parts) or recurrence_parts[idx] not in TIME_UNITS:
+        return None, None, ParseError.WRONG_DATETIME_INFO
+    if int(number) == 0:
+        return None, None, ParseError.CANT_BE_ONLY_ZEROS
+    if int(number) > TIME_UNIT_MAX_VALUE:
+        return None, None, ParseError.TOO_BIG_NUMBER
+    recurrence = {TIME_UNITS[recurrence_parts[idx]]: int(number)}
+
+    try:
+        next_reminder_date = now + relativedelta(**recurrence)
+    except (OverflowError, ValueError):
+        return None, None, ParseError.TOO_BIG_NUMBER
+    if next_reminder_date - now < const.RECURRENCE_MIN_INTERVAL:
+        return None, None, ParseError.TOO_FREQUENT_RECURRENCE
+    if next_reminder_date > now + relativedelta(years=TIME_OFFSET_MAX_YEARS):
+        return None, None, ParseError.TOO_BIG_NUMBER
+
+    if idx + 1 == len(recurrence_parts):
+        return next_reminder_date, recurrence, None
+    reminder_date, err = parse_moment(recurrence_parts[idx + 1 :], now)
+    return (None, None, err) if err else (reminder_date, recurrence, None)
+
+
+def find_moment(
+    msg_parts: list[str], keyword_idx: int, now: dt.datetime
+) -> tuple[int, dt.datetime | None, ParseError | None]:
+    """
+    Parses the point in time at the end of the message. It may start up to two words
+    before the keyword, e.g. "on monday at 9:00" when the keyword is "at".
+    Returns the index of the first word of the date and the date.
+    """
+    for date_idx in range(max(keyword_idx - 2, 0), keyword_idx):
+        word = msg_parts[date_idx]
+        if word == "on" or word.lower() in DAY_WORDS:
+            reminder_date, err = parse_moment(msg_parts[date_idx:], now)
+            if not err:
+                return date_idx, reminder_date, None
+    reminder_date, err = parse_moment(msg_parts[keyword_idx:], now)
+    return keyword_idx, reminder_date, err
+
+
+def parse_moment(
+    date_parts: list[str], now: dt.datetime
+) -> tuple[dt.datetime | None, ParseError | None]:
+    """
+    Parses "[on] [today|tomorrow|<weekday>|on DD.MM[.YY]] [at] HH:MM [am|pm]" into
+    a localized (timezone aware) future datetime. Without a year, weekday or day the
+    next occurrence of the date or time is used.
+    """
+    today = now.date()
+    candidate_dates = None
+    idx = 1 if date_parts[0] == "on" else 0
+    if idx < len(date_parts):
+        day_word = date_parts[idx].lower()
+        if day_word in DAY_OFFSETS:
+            candidate_dates = [today + DAY_OFFSETS[day_word] * ONE_DAY]
+        elif day_word in WEEKDAYS:
+            days_ahead = (WEEKDAYS[day_word] - today.weekday()) % 7
+            candidate_dates = [today + days_ahead * ONE_DAY]
+            candidate_dates.append(candidate_dates[0] + ONE_WEEK)
+        elif idx == 1 and (date_match := DATE_PATTERN.fullmatch(day_word)):
+            candidate_dates = get_candidate_dates(*date_match.groups(), today)
+            if not candidate_dates:  # E.g. 30th of February.
+                return None, ParseError.WRONG_DATETIME_FORMAT
+        if candidate_dates is not None:
+            idx += 1
+
+    if candidate_dates is None:
+        if idx == 1:  # "on" without a day.
+            return None, ParseError.WRONG_DATETIME_FORMAT
+        candidate_dates = [today, today + ONE_DAY]
+
+    if idx < len(date_parts) and date_parts[idx] == "at":
+        idx += 1
+    reminder_time = parse_time(date_parts[idx:])
+    if reminder_time is None:
+        return None, ParseError.WRONG_DATETIME_FORMAT
+
+    for candidate_date in candidate_dates:
+        reminder_date = dt.datetime.combine(
+            candidate_date, reminder_time, tzinfo=const.LOCAL_TIMEZONE
+        )
+        if reminder_date >= now:
+            return reminder_date, None
+    return None, ParseError.CANT_REMIND_IN_PAST
+
+
+def get_candidate_dates(
+    day: str, month: str, year: str | None, today: dt.date
+) -> list[dt.date]:
+    """
+    Returns the date, or its occurrences in the next few years if the year is missing.
+    Two-digit years are completed the same way as strptime's "%y" does.
+    """
+    if year is None:
+        years = range(today.year, today.year + MISSING_YEAR_MAX_YEARS_AHEAD + 1)
+    elif len(year) == 2:
+        years = (int(year) + (2000 if int(year) < 69 else 1900),)
+    else:
+        years = (int(year),)
+
+    candidate_dates = []
+    for candidate_year in years:
+        try:
+            candidate_dates.append(dt.date(candidate_year, int(month), int(day)))
+        except ValueError:
+            continue
+    return candidate_dates
+
+
+def parse_time(time_parts: list[str]) -> dt.time | None:
+    """Parses "HH:MM", "HH:MM am|pm" or "HH am|pm" (with or without a space)."""
+    if len(time_parts) == 1:
+        time_str = time_parts[0]
+    elif len(time_parts) == 2 and time_parts[1].lower() in MERIDIEMS:
+        time_str = time_parts[0] + time_parts[1]
+    else:
+        return None
+    time_match = TIME_PATTERN.fullmatch(time_str)
+    if not time_match:
+        return None
+
+    hour, minute, meridiem = time_match.groups()
+    if minute is None and meridiem is None:
+        return None
+    hour, minute = int(hour), int(minute or 0)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.lower() == "pm" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return dt.time(hour, minute)
+
+
+def parse_timedelta(
+    date_parts: list[str], now: dt.datetime
+) -> tuple[dt.datetime | None, ParseError | None]:
+    """
+    Parses "<number> <unit> [and] <number><unit> ..." and adds it to the current
+    datetime.
+    """
+    time_offset_units = {}
+    number = None
+    for part in date_parts:
+        if part == "and":
+            continue
+        if number is None and part.isdecimal():
+            number = part
+            continue
+        if number is not None:
+            timedelta_parts = [(number, part)]
+            number = None
+        elif COMPACT_TIMEDELTA_PATTERN.fullmatch(part):
+            timedelta_parts = COMPACT_TIMEDELTA_PART_PATTERN.findall(part)
+        else:
+            return None, ParseError.WRONG_DATETIME_INFO
+
+        for value, spelling in timedelta_parts:
+            unit = TIME_UNITS.get(spelling)
+            if unit is None:
+                return None, ParseError.WRONG_DATETIME_INFO
+            if int(value) > TIME_UNIT_MAX_VALUE:
+                return None, ParseError.TOO_BIG_NUMBER
+            time_offset_units[unit] = time_offset_units.get(unit, 0) + int(value)
+
+    if number is not None or not time_offset_units:
+        return None, ParseError.WRONG_DATETIME_INFO
+    if not any(time_offset_units.values()):
+        return None, ParseError.CANT_BE_ONLY_ZEROS
+
+    try:
+        time_offset = relativedelta(**time_offset_units)
+        time_offset.years = min(time_offset.years, TIME_OFFSET_MAX_YEARS)
+        return now + time_offset, None
+    except (OverflowError, ValueError):
+        return None, ParseError.TOO_BIG_NUMBER
@@ -0,0 +1,108 @@
+"""
+Recurring reminders. A recurring reminder is a single FUTURE_REMINDERS document with
+a "recurrence" field:
+    {"interval": <relativedelta arguments>, "first_date": <date>, "occurrence": <n>}
+where reminder_date is its n-th occurrence (the first one is 0th). When it's reminded,
+the document is moved to its next occurrence instead of being deleted.
+"""
+
+import datetime as dt
+
+from dateutil.relativedelta import relativedelta
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+import reminders.const as const
+from reminders.claims import CLAIM_FIELDS, PENDING
+from reminders.texts import Error
+from utils.db import run_db
+
+
+def create_recurrence(interval: dict, first_date: dt.datetime) -> dict:
+    return {"interval": interval, "first_date": first_date, "occurrence": 0}
+
+
+def get_next_occurrence(recurrence: dict, now: dt.datetime) -> tuple[dt.datetime, int]:
+    """
+    Returns the first occurrence later than now and its number. Occurrences are counted
+    from the first date in local time, so e.g. "every day at 9:00" stays at 9:00 across
+    DST changes and "every month" set on the 31st falls on the last day of shorter
+    months. Occurrences missed while the bot was down are skipped.
+    """
+    interval = relativedelta(**recurrence["interval"])
+    first_date = (
+        recurrence["first_date"].astimezone(const.LOCAL_TIMEZONE).replace(tzinfo=None)
+    )
+    occurrence = recurrence["occurrence"] + 1
+    if not interval.years and not interval.months:  # Fixed length, skip at once.
+        interval_length = first_date + interval - first_date
+        local_now = now.astimezone(const.LOCAL_TIMEZONE).replace(tzinfo=None)
+        occurrence = max(occurrence, (local_now - first_date) // interval_length + 1)
+
+    # Dates in the same timezone are compared by their local times, so the occurrences
+    # are compared as timestamps, e.g. in the hour repeated at the end of DST.
+    now_timestamp = now.timestamp()
+    while True:
+        next_date = (first_date + interval * occurrence).replace(
+            tzinfo=const.LOCAL_TIMEZONE
+        )
+        if next_date.timestamp() > now_timestamp:
+            return next_date, occurrence
+        occurrence += 1
+
+
+def describe_recurrence(recurrence: dict) -> str:
+    """Returns e.g. "day" or "2 weeks", to be put after "every"."""
+    (unit, number), *_ = recurrence["interval"].items()
+    return unit[:-1] if number == 1 else f"{number} {unit}"
+
+
+async def reschedule_recurring_reminders(
+    reminders: list[dict], now: float
+) -> tuple[list[dict], str]:
+    """
+    Moves reminded recurring reminders to their next occurrences in FUTURE_REMINDERS
+    collection and moves them back to pending, in a single round trip. The reminders'
+    dicts are updated in place.
+    Returns the moved reminders which are still in FUTURE_REMINDERS (their author may
+    delete them as soon as they're pending) and empty string if all of them were
+    moved. Returns empty list and error message otherwise.
+    """
+    if not reminders:
+        return [], ""
+
+    local_now = dt.datetime.fromtimestamp(now, const.LOCAL_TIMEZONE)
+    updates = []
+    for reminder in reminders:
+        next_date, occurrence = get_next_occurrence(reminder["recurrence"], local_now)
+        updates.append(
+            UpdateOne(
+                # Matches nothing if a previous attempt has already moved it.
+                {"_id": reminder["_id"], "reminder_date": reminder["reminder_date"]},
+                {
+                    "$set": {
+                        "reminder_date": next_date,
+                        "recurrence.occurrence": occurrence,
+                        "state": PENDING,
+                        "attempts": 0,
+                    },
+                    "$unset": CLAIM_FIELDS,
+                },
+            )
+        )
+        reminder["reminder_date"] = next_date
+        reminder["recurrence"] = reminder["recurrence"] | {"occurrence": occurrence}
+        reminder["state"], reminder["attempts"] = PENDING, 0
+
+    try:
+        await run_db(const.FUTURE_REMINDERS.bulk_write, updates, ordered=False)
+        remaining_ids = await run_db(
+            const.FUTURE_REMINDERS.distinct,
+            "_id",
+            {"_id": {"$in": [reminder["_id"] for reminder in reminders]}},
+        )
+    except PyMongoError as e:
+        print(f"\nERROR: reschedule_recurring_reminders(): {e!r}\n")
+        return [], Error.CANT_RESCHEDULE
+    remaining_ids = set(remaining_ids)
+    return [reminder for reminder in reminders if reminder["_id"] in remaining_ids], ""
@@ -1,48 +1,243 @@
 import bson
 
 import discord
-from discord.ext.commands import bot
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 
 import reminders.const as const
+from reminders.claims import ARCHIVED, CLAIM_FIELDS, DELIVERED
+from reminders.rendering import format_date
 from reminders.texts import Error
-from utils.utils import utc_to_local
+from utils.db import run_db
+from utils.utils import display_error_on_channel
 
 
-async def remind_user(bot: bot.Bot, reminder: dict, msg: str) -> None:
-    """Sends a reminder on CHANNEL_ID channel."""
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+def create_reminder_messages(
+    reminders: list[dict], msg: str
+) -> list[tuple[list[dict], str, discord.Embed]]:
+    """
+    Creates messages reminding of the reminders. Each message is a tuple of the
+    reminders it covers, its text and its embed. If there are at least
+    COALESCE_REMINDERS_THRESHOLD reminders, they are packed into as few combined
+    messages as Discord's embed limits allow, otherwise each reminder gets its own
+    message.
+    """
+    if len(reminders) < const.COALESCE_REMINDERS_THRESHOLD:
+        return [
+            ([reminder], *create_reminder_message(reminder, msg))
+            for reminder in reminders
+        ]
+    return create_coalesced_reminder_messages(reminders, msg)
+
+
+def create_reminder_message(reminder: dict, msg: str) -> tuple[str, discord.Embed]:
+    """Creates a message reminding of one reminder."""
     reminder_description = "```{}```\n`{}`  created on  `{}`".format(
         reminder["reminder_name_full"] or "- ",
         reminder["friendly_id"],
-        utc_to_local(reminder["date_created"]).strftime("%d.%m.%Y %H:%M:%S"),
+        format_date(reminder["date_created"]),
     )
     embed = discord.Embed(
-        title=msg.format(
-            utc_to_local(reminder["reminder_date"]).strftime("%d.%m.%Y %H:%M:%S"),
-        ),
+        title=msg.format(format_date(reminder["reminder_date"])),
         description=reminder_description,
         color=0xFFA500,
     )
-    channel = bot.get_channel(int(const.CHANNEL_ID))
     author_tagging_msg = f"<@{reminder['author_id']}>"
-    await channel.send(author_tagging_msg, embed=embed)
+    return author_tagging_msg, embed
 
 
-async def archive_reminder(reminder: dict) -> str:
-    """Adds reminded reminders to PAST_REMINDERS collection."""
-    reminder = reminder.copy()
-    reminder["done"] = True
-    result = const.PAST_REMINDERS.insert_one(reminder)
-    if not result.inserted_id:
-        return Error.CANT_REMOVE
-    return ""
+def create_coalesced_reminder_messages(
+    reminders: list[dict], msg: str
+) -> list[tuple[list[dict], str, discord.Embed]]:
+    """
+    Packs the reminders into combined messages. Each reminder is an embed field,
+    the message's text mentions every author of the message's reminders once.
+    """
+    messages = []
+    # The embed's length is counted as its fields are added, len(embed) and
+    # embed.fields go through all of the embed's fields.
+    packed_reminders, embed, embed_length = [], discord.Embed(color=0xFFA500), 0
+    authors_mentions, mentions_length = set(), 0
+    for reminder in reminders:
+        field_name, field_value = create_reminder_field(reminder, msg)
+        author_mention = f"<@{reminder['author_id']}>"
+        new_mention_length = (
+            len(author_mention) + 1 if author_mention not in authors_mentions else 0
+        )
+        field_length = len(field_name) + len(field_value)
+        if packed_reminders and (
+            len(packed_reminders) == const.EMBED_MAX_FIELDS
+            or embed_length + field_length > const.EMBED_MAX_LENGTH
+            or mentions_length + new_mention_length > const.MESSAGE_MAX_LENGTH
+        ):
+            messages.append(
+                (packed_reminders, create_mentions(packed_reminders), embed)
+            )
+            packed_reminders, embed, embed_length = [], discord.Embed(color=0xFFA500), 0
+            authors_mentions, mentions_length = set(), 0
+            new_mention_length = len(author_mention) + 1
+
+        packed_reminders.append(reminder)
+        embed.add_field(name=field_name, value=field_value, inline=False)
+        embed_length += field_length
+        authors_mentions.add(author_mention)
+        mentions_length += new_mention_length
+
+    if packed_reminders:
+        messages.append((packed_reminders, create_mentions(packed_reminders), embed))
+    return messages
+
+
+def create_mentions(reminders: list[dict]) -> str:
+    """Mentions every author of the reminders once, one author per line."""
+    authors_ids = dict.fromkeys(reminder["author_id"] for reminder in reminders)
+    return "\n".join(f"<@{author_id}>" for author_id in authors_ids)
+
+
+def create_reminder_field(reminder: dict, msg: str) -> tuple[str, str]:
+    """
+    Creates an embed field (name and value) describing a reminder in a combined
+    message. Long reminder names are cut to fit in the field.
+    """
+    field_name = msg.format(format_date(reminder["reminder_date"]))
+    field_value = "<@{}> ```{{}}```\n`{}`  created on  `{}`".format(
+        reminder["author_id"],
+        reminder["friendly_id"],
+        format_date(reminder["date_created"]),
+    )
+    reminder_name = reminder["reminder_name_full"] or "- "
+    max_name_length = const.EMBED_FIELD_VALUE_MAX_LENGTH - len(field_value) + 2
+    if len(reminder_name) > max_name_length:
+        reminder_name = f"{reminder_name[:max_name_length - 6]} [...]"
+    return field_name, field_value.format(reminder_name)
+
+
+async def archive_reminders(
+    reminders: list[dict],
+) -> dict[bson.objectid.ObjectId, str]:
+    """
+    Adds delivered and failed reminders to PAST_REMINDERS collection in a single round
+    trip. Returns error messages of the reminders that couldn't be archived, keyed by
+    reminder's ID. Returns empty dict if all of them were archived.
+    """
+    if not reminders:
+        return {}
+
+    archived_reminders = [
+        create_archived_reminder(reminder) | {"done": reminder["state"] == DELIVERED}
+        for reminder in reminders
+    ]
+    try:
+        await run_db(
+            const.PAST_REMINDERS.insert_many, archived_reminders, ordered=False
+        )
+    except BulkWriteError as e:
+        return {
+            archived_reminders[write_error["index"]]["_id"]: Error.CANT_REMOVE
+            for write_error in e.details["writeErrors"]
+            # Reminder archived by a previous attempt.
+            if write_error["code"] != DUPLICATE_KEY_ERROR_CODE
+        }
+    return {}
+
+
+async def log_reminders_occurrences(
+    reminders: list[dict],
+) -> dict[bson.objectid.ObjectId, str]:
+    """
+    Logs occurrences of reminded recurring reminders in PAST_REMINDERS collection in
+    a single round trip. A recurring reminder has a single document there, with the
+    dates of its RECURRENCE_LOG_LIMIT most recent occurrences.
+    Returns error messages of the reminders that couldn't be logged, keyed by
+    reminder's ID. Returns empty dict if all of them were logged.
+    """
+    if not reminders:
+        return {}
+
+    updates = [
+        UpdateOne(
+            # An occurrence logged by a previous attempt doesn't match, so the upsert
+            # fails with a duplicate key error instead of logging it twice.
+            {"_id": reminder["_id"], "occurrences": {"$ne": reminder["reminder_date"]}},
+            {
+                "$set": {
+                    key: value
+                    for key, value in create_archived_reminder(reminder).items()
+                    if key != "_id"
+                },
+                "$push": {
+                    "occurrences": {
+                        "$each": [reminder["reminder_date"]],
+                        "$slice": -const.RECURRENCE_LOG_LIMIT,
+                    }
+                },
+                "$inc": {"occurrences_count": 1},
+            },
+            upsert=True,
+        )
+        for reminder in reminders
+    ]
+    try:
+        await run_db(const.PAST_REMINDERS.bulk_write, updates, ordered=False)
+    except BulkWriteError as e:
+        return {
+            reminders[write_error["index"]]["_id"]: Error.CANT_REMOVE
+            for write_error in e.details["writeErrors"]
+            if write_error["code"] != DUPLICATE_KEY_ERROR_CODE
+        }
+    return {}
+
+
+def create_archived_reminder(reminder: dict) -> dict:
+    """Returns the reminder's document in PAST_REMINDERS, without its claim."""
+    return {
+        key: value for key, value in reminder.items() if key not in CLAIM_FIELDS
+    } | {"state": ARCHIVED}
 
 
 async def delete_done_reminders(
     reminders_to_delete: list[bson.objectid.ObjectId],
 ) -> str:
-    """Deletes reminded reminders from FUTURE_REMINDERS collection."""
-    for reminder_id in reminders_to_delete:
-        result = const.FUTURE_REMINDERS.delete_one({"_id": reminder_id})
-        if not result.deleted_count:
-            return Error.CANT_REMOVE
+    """
+    Deletes reminded reminders from FUTURE_REMINDERS collection in a single round trip.
+    Reminders which are already gone, e.g. deleted by a previous attempt, are fine.
+    Returns empty string if the deletion succeeded. Returns error message otherwise.
+    """
+    if not reminders_to_delete:
+        return ""
+
+    try:
+        await run_db(
+            const.FUTURE_REMINDERS.delete_many, {"_id": {"$in": reminders_to_delete}}
+        )
+    except PyMongoError as e:
+        print(f"\nERROR: delete_done_reminders(): {e!r}\n")
+        return Error.CANT_REMOVE
     return ""
+
+
+async def report_failed_reminders(
+    channel: discord.channel.TextChannel | None,
+    reminders: list[dict],
+    errors: dict[bson.objectid.ObjectId, str],
+) -> None:
+    """
+    Logs and displays one error message per error kind, listing IDs of the failed
+    reminders. The messages are only logged if there's no channel.
+    """
+    failed_reminders_ids = {}
+    for reminder in reminders:
+        if err := errors.get(reminder["_id"]):
+            failed_reminders_ids.setdefault(err, []).append(reminder["friendly_id"])
+
+    for err, friendly_ids in failed_reminders_ids.items():
+        print(f"\nERROR: {err} Reminders: {', '.join(friendly_ids)}\n")
+        if channel is None:
+            continue
+        listed_ids = ", ".join(f"`{friendly_id}`" for friendly_id in friendly_ids[:50])
+        if len(friendly_ids) > 50:
+            listed_ids += f" and {len(friendly_ids) - 50} more"
+        await display_error_on_channel(channel, f"{err}\nReminders: {listed_ids}")
@@ -0,0 +1,61 @@
+"""
+Rendering of the reminders' dates in the bot's messages. Formatted dates are cached
+per second, as the listings render the same reminders over and over and reminders
+fired in a burst share their seconds.
+"now" is stamped once per rendered message, with stamp_now(), and passed to the
+functions which need it, so all the reminders of a message are rendered at the same
+moment and the message's current date matches their time left.
+"""
+
+import datetime as dt
+import functools
+
+import reminders.const as const
+from utils.utils import utc_to_local
+
+
+DATE_FORMAT = "%d.%m.%Y %H:%M:%S"
+TIME_LEFT_FIELD_NAME = ":hourglass: Left: {}  |  {}:"
+NO_TIME_LEFT = "0:00:00"
+
+
+def stamp_now() -> dt.datetime:
+    return dt.datetime.now(const.LOCAL_TIMEZONE)
+
+
+def format_date(date: dt.datetime) -> str:
+    """Formats a reminder's (timezone aware) date in LOCAL_TIMEZONE."""
+    # Aware dates are hashed by their UTC time, so the cache is shared by the dates
+    # read from the database (UTC) and the ones being created (local time).
+    return _format_date(date.replace(microsecond=0))
+
+
+@functools.lru_cache(maxsize=const.DATES_FORMATTING_CACHE_SIZE)
+def _format_date(date: dt.datetime) -> str:
+    local_date = utc_to_local(date)
+    # Formats like strftime(DATE_FORMAT) does, only faster.
+    return (
+        f"{local_date.day:02}.{local_date.month:02}.{local_date.year:04} "
+        f"{local_date.hour:02}:{local_date.minute:02}:{local_date.second:02}"
+    )
+
+
+def format_now(now: dt.datetime) -> str:
+    """Formats the stamped "now". It changes every call, so it isn't cached."""
+    return now.astimezone(const.LOCAL_TIMEZONE).strftime(DATE_FORMAT)
+
+
+def format_time_left(date: dt.datetime, now: dt.datetime) -> str:
+    """Formats the time left until the date as H:MM:SS, "0:00:00" if it has passed."""
+    time_left = date - now
+    if time_left < dt.timedelta(0):
+        return NO_TIME_LEFT
+    return str(dt.timedelta(days=time_left.days, seconds=time_left.seconds))
+
+
+def create_time_left_field_name(reminder: dict, now: dt.datetime) -> str:
+    """Creates the "Left: ... | date:" embed field name of a listed reminder."""
+    return TIME_LEFT_FIELD_NAME.format(
+        format_time_left(reminder["reminder_date"], now),
+        format_date(reminder["reminder_date"]),
+    )
@@ -0,0 +1,92 @@
+"""
+Routing of reminders to the channels they're sent to. A reminder goes back to the
+channel it was created in (a DM reminder to the DM), unless its guild has a reminder
+channel set with !set_reminder_channel. Reminders created before the channels were
+stored go to CHANNEL_ID.
+Guilds' reminder channels are cached in memory and read again at most every
+ROUTING_CACHE_TTL seconds, all missing ones of a batch in a single round trip.
+"""
+
+from collections import OrderedDict
+from collections.abc import Iterable
+import time
+
+import reminders.const as const
+from utils.db import run_db
+
+
+class GuildRoute:
+    def __init__(self, reminder_channel_id: int | None) -> None:
+        self.reminder_channel_id = reminder_channel_id
+        self.loaded_at = time.monotonic()
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.loaded_at < const.ROUTING_CACHE_TTL
+
+
+_guilds_routes: OrderedDict[int, GuildRoute] = OrderedDict()
+
+
+async def route_reminders(reminders: list[dict]) -> dict[int, list[dict]]:
+    """Groups the reminders by the ID of the channel they should be sent to."""
+    await load_guilds_routes(
+        reminder["guild_id"] for reminder in reminders if reminder.get("guild_id")
+    )
+    routed_reminders = {}
+    for reminder in reminders:
+        routed_reminders.setdefault(get_reminder_channel_id(reminder), []).append(
+            reminder
+        )
+    return routed_reminders
+
+
+def get_reminder_channel_id(reminder: dict) -> int:
+    if guild_route := _guilds_routes.get(reminder.get("guild_id")):
+        if guild_route.reminder_channel_id:
+            return guild_route.reminder_channel_id
+    return reminder.get("channel_id") or int(const.CHANNEL_ID)
+
+
+async def load_guilds_routes(guilds_ids: Iterable[int]) -> None:
+    """Reads reminder channels of the guilds which aren't cached or are stale."""
+    guilds_ids_to_load = [
+        guild_id
+        for guild_id in set(guilds_ids)
+        if guild_id not in _guilds_routes or not _guilds_routes[guild_id].is_fresh()
+    ]
+    if not guilds_ids_to_load:
+        return
+
+    guilds_settings = await run_db(
+        lambda: list(
+            const.GUILDS_SETTINGS.find(
+                {"_id": {"$in": guilds_ids_to_load}}, {"reminder_channel_id": 1}
+            )
+        )
+    )
+    reminder_channels_ids = {
+        guild_settings["_id"]: guild_settings.get("reminder_channel_id")
+        for guild_settings in guilds_settings
+    }
+    for guild_id in guilds_ids_to_load:
+        cache_guild_route(guild_id, reminder_channels_ids.get(guild_id))
+
+
+async def set_guild_reminder_channel(
+    guild_id: int, reminder_channel_id: int | None
+) -> None:
+    """Sets (or with None resets) the channel all reminders of the guild are sent to."""
+    await run_db(
+        const.GUILDS_SETTINGS.update_one,
+        {"_id": guild_id},
+        {"$set": {"reminder_channel_id": reminder_channel_id}},
+        upsert=True,
+    )
+    cache_guild_route(guild_id, reminder_channel_id)
+
+
+def cache_guild_route(guild_id: int, reminder_channel_id: int | None) -> None:
+    _guilds_routes[guild_id] = GuildRoute(reminder_channel_id)
+    _guilds_routes.move_to_end(guild_id)
+    if len(_guilds_routes) > const.ROUTING_CACHE_SIZE:
+        _guilds_routes.popitem(last=False)
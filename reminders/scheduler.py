@@ -0,0 +1,173 @@
+"""
+The reminder loop's lifecycle. The bot starts its scheduler once, from setup_hook (so
+reconnects don't start more loops), and stops it when it's closed. Stopping lets the
+tick in progress finish, i.e. its reminders are sent and its database writes are done,
+before the delivery workers are stopped. A tick which fails, e.g. because the database
+is unreachable, is logged and retried with an exponential backoff, so the loop keeps
+running.
+"""
+
+import asyncio
+import math
+import time
+import traceback
+
+import discord
+from discord.ext.commands import bot
+
+import global_const
+import reminders.const as const
+from reminders.core import process_due_reminders
+from reminders.delivery import ReminderDelivery
+from reminders.scheduling import (
+    load_future_reminders,
+    next_due_timestamp,
+    scheduled_reminders_count,
+    wait_for_next_reminder,
+)
+from utils import profiling
+from utils.metrics import Counter, Gauge, Histogram
+
+
+TICK_SECONDS = Histogram(
+    "reminderbot_tick_seconds",
+    "Time of reminder loop's ticks (claiming, sending and archiving a batch).",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+TICK_ERRORS = Counter(
+    "reminderbot_tick_errors",
+    "Number of reminder loop's ticks which failed and were retried.",
+)
+DUE_QUEUE_SIZE = Gauge(
+    "reminderbot_due_queue_size",
+    "Number of reminders in the in-memory due-time queue.",
+    function=scheduled_reminders_count,
+)
+
+
+class ReminderScheduler:
+    def __init__(self, bot: bot.Bot) -> None:
+        self.bot = bot
+        self.delivery = ReminderDelivery(bot)
+        self._task = None
+        self._stopping = asyncio.Event()
+        self._ticking = False
+        # Reminders created or given up on by other bot processes (shards) aren't in
+        # this process' queue, so a shared database is checked periodically.
+        self._shared_database = int(global_const.SHARD_COUNT or 1) > 1
+
+    def start(self) -> None:
+        """Starts the reminder loop. Does nothing if it has been started already."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the reminder loop, waiting at most SCHEDULER_STOP_TIMEOUT seconds for the
+        tick in progress. A loop which is just waiting for reminders is stopped at once.
+        """
+        if self._task is None or self._task.done():
+            return
+
+        self._stopping.set()
+        if not self._ticking:
+            self._task.cancel()
+        try:
+            await asyncio.wait_for(self._task, const.SCHEDULER_STOP_TIMEOUT)
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            print("\nERROR: the reminder loop didn't stop in time, it was cancelled.\n")
+
+    def lag(self) -> float | None:
+        """
+        Returns how many seconds the earliest scheduled reminder is overdue (0 if none
+        is), or None if the reminder loop isn't running.
+        """
+        if self._task is None or self._task.done():
+            return None
+        next_due = next_due_timestamp()
+        return 0.0 if next_due is None else max(time.time() - next_due, 0.0)
+
+    async def _run(self) -> None:
+        """Reminds users of their reminders as soon as the reminders are due."""
+        await self.bot.wait_until_ready()
+        channel = await self._get_errors_channel()
+        self.delivery.start()
+        try:
+            await self._loop(channel)
+        finally:
+            await self.delivery.stop()
+
+    async def _get_errors_channel(self) -> discord.channel.TextChannel | None:
+        """
+        Returns the channel the reminder loop's errors are displayed on. A shard which
+        doesn't serve the channel's server fetches it. Returns None if that fails, then
+        the errors are only logged.
+        """
+        channel_id = int(const.CHANNEL_ID)
+        if channel := self.bot.get_channel(channel_id):
+            return channel
+        try:
+            return await self.bot.fetch_channel(channel_id)
+        except (discord.HTTPException, discord.InvalidData) as e:
+            print(f"\nERROR: fetching the errors channel {channel_id}: {e!r}\n")
+            return None
+
+    async def _loop(self, channel: discord.channel.TextChannel | None) -> None:
+        # With a shared database, it's checked every TIME_BETWEEN_REMINDER_CHECKS
+        # seconds even when nothing is due. A single process waits for its queue only.
+        next_check = 0.0
+        queue_loaded = False
+        failures = 0
+        while not self._stopping.is_set() and not self.bot.is_closed():
+            now = time.time()
+            try:
+                if not queue_loaded:
+                    await load_future_reminders()
+                    queue_loaded = True
+                next_due = next_due_timestamp()
+                if (next_due is None or next_due > now) and next_check > now:
+                    await wait_for_next_reminder(
+                        now, next_check - now if next_check != math.inf else None
+                    )
+                    continue
+                more_due = await self._tick(channel, now)
+            except Exception as e:
+                # The failed tick's reminders are still due, so they're retried.
+                failures += 1
+                backoff = min(
+                    const.SCHEDULER_ERROR_BACKOFF * 2 ** (failures - 1),
+                    const.SCHEDULER_MAX_ERROR_BACKOFF,
+                )
+                print(
+                    f"\nERROR: the reminder loop failed ({failures} in a row), "
+                    f"retrying in {backoff:g}s: {e!r}\n"
+                )
+                traceback.print_exc()
+                TICK_ERRORS.inc()
+                # Stopping doesn't wait for the backoff.
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), backoff)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            failures = 0
+            if more_due:
+                next_check = 0.0
+            elif self._shared_database:
+                next_check = now + const.TIME_BETWEEN_REMINDER_CHECKS
+            else:
+                next_check = math.inf
+
+    async def _tick(
+        self, channel: discord.channel.TextChannel | None, now: float
+    ) -> bool:
+        """Processes the due reminders. Returns True if more of them may be due."""
+        self._ticking = True
+        try:
+            with profiling.stage("tick"):
+                return await process_due_reminders(channel, self.delivery, now)
+        finally:
+            self._ticking = False
+            TICK_SECONDS.observe(time.time() - now)
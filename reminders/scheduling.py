@@ -0,0 +1,104 @@
+"""
+In-memory due-time priority queue of future reminders. Lets the reminder loop sleep
+until the next reminder is due instead of polling the FUTURE_REMINDERS collection.
+Reminders created by other bot processes aren't in the queue, so with several bot
+processes (SHARD_COUNT > 1) the loop still checks the collection every
+TIME_BETWEEN_REMINDER_CHECKS seconds. Reminders claimed when they were due are
+scheduled again at their lease's expiry whenever they may need recovering.
+"""
+
+import asyncio
+import datetime as dt
+import heapq
+
+import bson
+
+import reminders.const as const
+from utils.db import run_db
+
+
+_due_queue: list[tuple[float, bson.objectid.ObjectId]] = []
+_scheduled: dict[bson.objectid.ObjectId, float] = {}
+_queue_changed = asyncio.Event()
+
+
+async def load_future_reminders() -> None:
+    """
+    Fills the queue with all reminders from FUTURE_REMINDERS collection. Claimed
+    reminders, e.g. left by the bot process before a restart, are due when their lease
+    expires.
+    """
+    future_reminders = await run_db(
+        lambda: list(
+            const.FUTURE_REMINDERS.find({}, {"reminder_date": 1, "claim_expires": 1})
+        )
+    )
+    _due_queue.clear()
+    _scheduled.clear()
+    for reminder in future_reminders:
+        due = reminder["reminder_date"]
+        if claim_expires := reminder.get("claim_expires"):
+            due = max(due, claim_expires)
+        _scheduled[reminder["_id"]] = due.timestamp()
+    _due_queue.extend((due, reminder_id) for reminder_id, due in _scheduled.items())
+    heapq.heapify(_due_queue)
+    _queue_changed.set()
+
+
+def schedule_reminder(
+    reminder_id: bson.objectid.ObjectId, reminder_date: dt.datetime | float
+) -> None:
+    """Adds a reminder to the queue (or moves it if it's already scheduled)."""
+    if isinstance(reminder_date, dt.datetime):
+        reminder_date = reminder_date.timestamp()
+    _scheduled[reminder_id] = reminder_date
+    heapq.heappush(_due_queue, (reminder_date, reminder_id))
+    if _due_queue[0][1] == reminder_id:
+        _queue_changed.set()
+
+
+def unschedule_reminder(reminder_id: bson.objectid.ObjectId) -> None:
+    """
+    Removes a reminder from the queue. The heap entry is discarded lazily when it
+    reaches the top of the queue.
+    """
+    _scheduled.pop(reminder_id, None)
+
+
+def pop_due_reminders(now: float) -> list[bson.objectid.ObjectId]:
+    """Removes and returns IDs of all reminders that are due at the given timestamp."""
+    due_reminders = []
+    while _due_queue and _due_queue[0][0] <= now:
+        due, reminder_id = heapq.heappop(_due_queue)
+        if _scheduled.get(reminder_id) != due:
+            continue  # Unscheduled or rescheduled in the meantime.
+        del _scheduled[reminder_id]
+        due_reminders.append(reminder_id)
+    return due_reminders
+
+
+def next_due_timestamp() -> float | None:
+    """Returns timestamp of the earliest scheduled reminder or None if there are none."""
+    while _due_queue and _scheduled.get(_due_queue[0][1]) != _due_queue[0][0]:
+        heapq.heappop(_due_queue)
+    return _due_queue[0][0] if _due_queue else None
+
+
+def scheduled_reminders_count() -> int:
+    return len(_scheduled)
+
+
+async def wait_for_next_reminder(now: float, max_wait: float | None = None) -> None:
+    """
+    Sleeps until the earliest scheduled reminder is due, but at most max_wait seconds.
+    Wakes up earlier if a reminder that is due sooner gets scheduled in the meantime.
+    """
+    _queue_changed.clear()
+    next_due = next_due_timestamp()
+    timeout = None if next_due is None else max(next_due - now, 0)
+    if max_wait is not None:
+        timeout = max_wait if timeout is None else min(timeout, max_wait)
+    try:
+        await asyncio.wait_for(_queue_changed.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
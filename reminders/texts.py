@@ -1,20 +1,22 @@
 # TODO: Put these in alphabetical order.
 class Help:
-    CREATE_REMINDER = "A) Adds a reminder on <date>.\nExample: !remind me of the end of the world on 31.12.99 23:59/\nB) Adds a reminder in X time units.\nYou can use years, months, days, hours, minutes and seconds.\nExample: !remind me of cake in the oven in 3 days"
+    CREATE_REMINDER = "A) Adds a reminder on <date>. The year can be omitted.\nExample: !remind me of the end of the world on 31.12.99 23:59/\nB) Adds a reminder in X time units.\nYou can use years, months, days, hours, minutes and seconds.\nExample: !remind me of cake in the oven in 3 days/in 1h30m\nC) Adds a reminder at <time> of today, tomorrow or a weekday.\nExample: !remind me of the meeting tomorrow 9:00/on friday at 5pm/at 17:00\nD) Adds a recurring reminder.\nExample: !remind me of the standup every day at 9:00/every monday 9:00/every 2 weeks"
     DELETE_REMINDER = (
         "Use when you want to delete a reminder.\nExample: !delete_reminder 15"
     )
     LIST_REMINDERS = "Use when you want to see everyone's reminders."
     MY_REMINDERS = "Use when you want to see your reminders."
     SHOW_REMINDER = "Use when you want to see the details of a certain reminder.\nExample: !show_reminder 32"
+    SET_REMINDER_CHANNEL = "Use when you want reminders created on this server to be sent to one channel. Without a channel, reminders are sent to the channels they were created in.\nExample: !set_reminder_channel #reminders"
 
     HELP = "I can remind you of stuff! You can mention me or use '!' prefix.\nCommands list:"
 
-    CREATE_REMINDER_EXAMPLE = "A) !remind me of <reminder_name> on <DD.MM.YY> <HH:MM>\nB) !remind me of <reminder_name> in <number> <unit>"
+    CREATE_REMINDER_EXAMPLE = "A) !remind me of <reminder_name> on <DD.MM[.YY]> <HH:MM>\nB) !remind me of <reminder_name> in <number> <unit>\nC) !remind me of <reminder_name> [today/tomorrow/<weekday>] at <HH:MM>\nD) !remind me of <reminder_name> every [<number>] <unit> [at <HH:MM>]"
     LIST_REMINDERS_EXAMPLE = "!list_reminders"
     MY_REMINDERS_EXAMPLE = "!my_reminders"
     SHOW_REMINDER_EXAMPLE = "!show_reminder <id>"
     DELETE_REMINDER_EXAMPLE = "!delete_reminder <id>"
+    SET_REMINDER_CHANNEL_EXAMPLE = "!set_reminder_channel [#channel]"
 
 
 class Error:
@@ -26,6 +28,9 @@ class Error:
         "You didn't use the correct command!\nCorrect format: !delete_reminder <ID>"
     )
     NO_REMINDER_WITH_THIS_ID = "I can't find a reminder with this ID!"
+    REMINDER_BEING_SENT = (
+        "That reminder is being sent right now, try again in a minute!"
+    )
     TRY_AGAIN = "Something went wrong, try again!"
 
     CANT_GET_USER = "Can't get info about this user from the database."
@@ -33,17 +38,26 @@ class Error:
         "You've exceeded the limit! You can have maximum of 1000 active reminders."
     )
     THROTTLE = "You've exceeded the limit! Maximum {} reminders created per {}!"
-    INVALID_FORMAT = "You didn't use the correct command format!\nCorrect format: !remind me of X on/in Y"
+    INVALID_FORMAT = "You didn't use the correct command format!\nCorrect format: !remind me of X on/in/at Y"
     TOO_LONG_NAME = "That reminder name is too long!"
-    NO_ON_IN_IN_MSG = 'You have to use "on" or "in" in the message!'
+    NO_ON_IN_IN_MSG = 'You have to use "on", "in" or "at" in the message!'
     WRONG_DATETIME_FORMAT = "Give me a correct datetime format!"
     WRONG_DATETIME_INFO = "Give me a correct datetime info!"
     CANT_BE_ONLY_ZEROS = "You can't give me zeros only!"
     CANT_REMIND_IN_PAST = "You can't create a reminder in the past!"
     TOO_BIG_NUMBER = "Wow, one of those numbers is way too big!"
+    TOO_FREQUENT_RECURRENCE = "A reminder can't repeat more often than once an hour!"
     CANT_REMOVE = "Something went wrong when removing the reminder!"
+    CANT_SEND = "Something went wrong when sending the reminder!"
+    GAVE_UP_SENDING = "I gave up sending the reminder after too many attempts!"
+    CANT_RESCHEDULE = (
+        "Something went wrong when scheduling the next occurrence of the reminder!"
+    )
     MUST_BE_SINGLE_ID = "Give me a single ID!"
     TOO_LONG_ID = "Wow, that's a long ID! Too long for sure!"
+    ONLY_ON_SERVER = "This command works only on servers!"
+    MANAGE_SERVER_REQUIRED = "You need the Manage Server permission to do that!"
+    CANT_SEND_TO_CHANNEL = "I can't send messages in that channel!"
 
 
 class Info:
@@ -52,3 +66,7 @@ class Info:
     )
     EMPTY_MY_PROFILE_NOTIFICATION = "You haven't made any reminders ever. Try making one!\nCommand format: !remind me of X in/on Y"
     NO_REMINDERS_NOTIFICATION = "You haven't made any reminders."
+    REMINDER_CHANNEL_SET = "Reminders created on this server will be sent to <#{}>."
+    REMINDER_CHANNEL_RESET = (
+        "Reminders will be sent to the channels they were created in."
+    )
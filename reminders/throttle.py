@@ -0,0 +1,78 @@
+"""
+In-process state of users' reminder limits: a sliding window of each user's most
+recently created reminders and their number of active reminders. A user's state is
+read from their profile (the durable backstop) on first use and at most every
+USER_LIMITS_CACHE_TTL seconds; in between, the create, delete and reminding paths
+keep it up to date, so checking the limits needs no database reads.
+"""
+
+from collections import deque, OrderedDict
+import time
+
+import bson
+
+import reminders.const as const
+from utils.db import run_db
+
+
+class UserLimitsState:
+    def __init__(self, profile: dict | None) -> None:
+        profile = profile or {}
+        self.loaded_at = time.monotonic()
+        self.future_reminders_count = profile.get("future_reminders_count", 0)
+        # (reminder ID, creation timestamp) pairs, oldest first.
+        self.recent_reminders = deque(
+            (
+                (reminder["_id"], reminder["date_created"].timestamp())
+                for reminder in profile.get("user_recent_reminders", [])
+            ),
+            maxlen=const.USER_RECENT_REMINDERS_LIMIT,
+        )
+
+
+_users_states: OrderedDict[int, UserLimitsState] = OrderedDict()
+
+
+async def get_user_limits_state(author_id: int) -> UserLimitsState:
+    """Returns user's limits state, reading it from their profile if needed."""
+    state = _users_states.get(author_id)
+    if (
+        state is None
+        or time.monotonic() - state.loaded_at > const.USER_LIMITS_CACHE_TTL
+    ):
+        profile = await run_db(
+            const.REMINDERBOT_USERS_PROFILES.find_one,
+            {"_id": author_id},
+            {"future_reminders_count": 1, "user_recent_reminders": 1},
+        )
+        state = UserLimitsState(profile)
+        _users_states[author_id] = state
+        if len(_users_states) > const.USER_LIMITS_CACHE_SIZE:
+            _users_states.popitem(last=False)
+    _users_states.move_to_end(author_id)
+    return state
+
+
+def record_created_reminder(author_id: int, reminder: dict) -> None:
+    if state := _users_states.get(author_id):
+        state.future_reminders_count += 1
+        state.recent_reminders.append(
+            (reminder["_id"], reminder["date_created"].timestamp())
+        )
+
+
+def record_deleted_reminder(
+    author_id: int, reminder_id: bson.objectid.ObjectId
+) -> None:
+    if state := _users_states.get(author_id):
+        state.future_reminders_count -= 1
+        state.recent_reminders = deque(
+            (recent for recent in state.recent_reminders if recent[0] != reminder_id),
+            maxlen=const.USER_RECENT_REMINDERS_LIMIT,
+        )
+
+
+def record_reminded_reminders(reminders: list[dict]) -> None:
+    for reminder in reminders:
+        if state := _users_states.get(reminder["author_id"]):
+            state.future_reminders_count -= 1
@@ -1,85 +1,100 @@
 import bson
+from pymongo import UpdateOne
+from pymongo.client_session import ClientSession
+from pymongo.errors import BulkWriteError
 
 import reminders.const as const
 from reminders.texts import Error
+from utils.db import run_db
 
 
 def upsert_user_profile(
-    author_id: int, inserted_reminder_id: bson.objectid.ObjectId
-) -> str:
+    author_id: int, inserted_reminder: dict, session: ClientSession | None = None
+) -> None:
     """
     If user's profile exists in REMINDERBOT_USERS_PROFILES collection, updates it
-    with the freshly made reminder's ID. If the profile doesn't exist yet, creates one
-    with the reminder's ID in it.
-    Returns empty string if the update/insert operation succeeded. Returns error message
-    otherwise.
+    with the freshly made reminder. If the profile doesn't exist yet, creates one
+    with the reminder in it, in the same single upsert. Only
+    USER_RECENT_REMINDERS_LIMIT most recently created reminders are kept in the
+    profile, so its size is bounded.
+    Blocking, meant to be called inside a transaction (see run_in_transaction).
     """
-    updating_result = const.REMINDERBOT_USERS_PROFILES.update_one(
+    recent_reminder = {
+        "_id": inserted_reminder["_id"],
+        "date_created": inserted_reminder["date_created"],
+    }
+    const.REMINDERBOT_USERS_PROFILES.update_one(
         {"_id": author_id},
         {
+            "$setOnInsert": {"past_reminders_count": 0},
             "$inc": {"future_reminders_count": 1},
             "$push": {
-                "user_future_reminders": inserted_reminder_id,
-                "user_all_reminders": inserted_reminder_id,
+                "user_future_reminders": inserted_reminder["_id"],
+                "user_recent_reminders": {
+                    "$each": [recent_reminder],
+                    "$slice": -const.USER_RECENT_REMINDERS_LIMIT,
+                },
             },
         },
+        upsert=True,
+        session=session,
     )
-    if updating_result.modified_count == 0:
-        insertion_result = const.REMINDERBOT_USERS_PROFILES.insert_one(
-            {
-                "_id": author_id,
-                "future_reminders_count": 1,
-                "past_reminders_count": 0,
-                "user_future_reminders": [inserted_reminder_id],
-                "user_all_reminders": [inserted_reminder_id],
-            }
-        )
-        if not insertion_result.inserted_id:
-            return Error.TRY_AGAIN
-    return ""
 
 
-def update_user_after_reminding(
-    author_id: bson.int64.Int64, reminder_id: bson.objectid.ObjectId
-) -> str:
+async def update_users_after_reminding(
+    reminders: list[dict],
+) -> dict[bson.objectid.ObjectId, str]:
     """
-    Updates user's profile when a reminder is reminded. Updates reminder counts
-    and pulls the reminder's ID from the user_future_reminders ID list.
-    Returns empty string if the update operation succeeded. Returns error message
-    otherwise.
+    Updates users' profiles when reminders are reminded, in a single round trip.
+    Updates reminder counts and pulls the reminders' IDs from the user_future_reminders
+    ID lists. Each update matches only while the reminder's ID is still in the list,
+    so retrying it after a partial failure doesn't count the reminder twice.
+    Returns error messages of the reminders whose profile update failed, keyed by
+    reminder's ID. Returns empty dict if all of the updates succeeded.
     """
-    result = const.REMINDERBOT_USERS_PROFILES.update_one(
-        {"_id": author_id},
-        {
-            "$inc": {
-                "past_reminders_count": 1,
-                "future_reminders_count": -1,
-            },
-            "$pull": {
-                "user_future_reminders": reminder_id,
+    if not reminders:
+        return {}
+
+    updates = [
+        UpdateOne(
+            {"_id": reminder["author_id"], "user_future_reminders": reminder["_id"]},
+            {
+                "$inc": {"past_reminders_count": 1, "future_reminders_count": -1},
+                "$pull": {"user_future_reminders": reminder["_id"]},
             },
-        },
-    )
-    return "" if result.modified_count else Error.CANT_REMOVE
+        )
+        for reminder in reminders
+    ]
+    try:
+        await run_db(
+            const.REMINDERBOT_USERS_PROFILES.bulk_write, updates, ordered=False
+        )
+    except BulkWriteError as e:
+        return {
+            reminders[write_error["index"]]["_id"]: Error.CANT_REMOVE
+            for write_error in e.details["writeErrors"]
+        }
+    return {}
 
 
 def update_user_after_canceling(
-    author_id: int, reminder_to_delete_id: bson.objectid.ObjectId
-) -> str:
+    author_id: int,
+    reminder_to_delete_id: bson.objectid.ObjectId,
+    session: ClientSession | None = None,
+) -> None:
     """
     Updates user's profile when a reminder is deleted. Decrements future reminders
     count and pulls the reminder's ID from the ID lists.
-    Returns empty string if the update operation succeeded. Returns error message
-    otherwise.
+    Blocking, meant to be called inside a transaction (see run_in_transaction).
     """
-    result = const.REMINDERBOT_USERS_PROFILES.update_one(
+    const.REMINDERBOT_USERS_PROFILES.update_one(
         {"_id": author_id},
         {
             "$inc": {"future_reminders_count": -1},
             "$pull": {
                 "user_future_reminders": reminder_to_delete_id,
-                "user_all_reminders": reminder_to_delete_id,
+                "user_recent_reminders": {"_id": reminder_to_delete_id},
             },
         },
+        session=session,
     )
-    return "" if result.modified_count else Error.CANT_REMOVE
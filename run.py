@@ -0,0 +1,12 @@
+"""
+The bot's entry point: python run.py. It starts timing the imports before running
+main.py, so the startup report (see utils/startup.py) covers all of the bot's modules.
+"""
+
+import runpy
+
+from utils import startup
+
+
+startup.install()
+runpy.run_module("main", run_name="__main__")
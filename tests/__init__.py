@@ -0,0 +1,19 @@
+"""
+Tests of the bot's commands and reminder loop. The ones using the database run
+against mongomock (a dev dependency) by default, or against the mongod of REMINDERBOT_TEST_MONGO_URI, e.g.
+a single node replica set to run the transactional tests too:
+REMINDERBOT_TEST_MONGO_URI=mongodb://localhost:27017/?replicaSet=rs0.
+
+Usage: python -m unittest
+"""
+
+from benchmarks._harness import set_default_environment
+
+
+# The tests drop the collections of this database, whatever DATABASE_NAME was set to.
+TESTS_DATABASE_NAME = "reminderbot_tests"
+
+
+set_default_environment(
+    DATABASE_NAME=TESTS_DATABASE_NAME, LOCAL_TIMEZONE="Europe/Warsaw"
+)
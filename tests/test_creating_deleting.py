@@ -0,0 +1,251 @@
+"""
+Creating and deleting reminders: the reminder and its author's profile are written
+together, in one transaction where the deployment supports transactions.
+"""
+
+import datetime as dt
+import os
+import unittest
+from unittest import mock
+
+from pymongo.errors import PyMongoError
+
+from benchmarks._harness import FakeChannel, FakeContext, connect
+from reminders.claims import CLAIMED, DELIVERED
+import reminders.const as const
+from reminders.creating import create_reminder_to_insert, insert_reminder_to_database
+from reminders.deleting import delete_reminder_from_database
+from reminders.indexes import ensure_indexes
+from reminders.texts import Error
+from tests import TESTS_DATABASE_NAME
+import utils.db
+
+
+AUTHOR_ID = 1
+OTHER_AUTHOR_ID = 2
+
+
+def setUpModule() -> None:
+    connect(os.environ.get("REMINDERBOT_TEST_MONGO_URI"))
+
+
+def create_reminder_data(author_id: int = AUTHOR_ID) -> dict:
+    return create_reminder_to_insert(
+        FakeContext(author_id, FakeChannel()),
+        "test reminder",
+        dt.datetime.now(const.LOCAL_TIMEZONE) + dt.timedelta(hours=1),
+        "me of test reminder in 1h",
+    )
+
+
+class RemindersTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.assertEqual(const.FUTURE_REMINDERS.database.name, TESTS_DATABASE_NAME)
+        const.FUTURE_REMINDERS.drop()
+        const.REMINDERBOT_USERS_PROFILES.drop()
+        await ensure_indexes()
+
+    async def create_reminder(self, author_id: int = AUTHOR_ID) -> dict:
+        data = create_reminder_data(author_id)
+        self.assertEqual(await insert_reminder_to_database(author_id, data), "")
+        return data
+
+    def get_profile(self, author_id: int = AUTHOR_ID) -> dict | None:
+        return const.REMINDERBOT_USERS_PROFILES.find_one({"_id": author_id})
+
+
+class CreatingTest(RemindersTestCase):
+    async def test_creates_profile_of_new_user(self) -> None:
+        data = await self.create_reminder()
+
+        self.assertIsNotNone(const.FUTURE_REMINDERS.find_one({"_id": data["_id"]}))
+        profile = self.get_profile()
+        self.assertEqual(profile["future_reminders_count"], 1)
+        self.assertEqual(profile["past_reminders_count"], 0)
+        self.assertEqual(profile["user_future_reminders"], [data["_id"]])
+        self.assertEqual(
+            [reminder["_id"] for reminder in profile["user_recent_reminders"]],
+            [data["_id"]],
+        )
+
+    async def test_updates_profile_of_existing_user(self) -> None:
+        first = await self.create_reminder()
+        const.REMINDERBOT_USERS_PROFILES.update_one(
+            {"_id": AUTHOR_ID}, {"$set": {"past_reminders_count": 5}}
+        )
+        second = await self.create_reminder()
+
+        profile = self.get_profile()
+        self.assertEqual(profile["future_reminders_count"], 2)
+        self.assertEqual(profile["past_reminders_count"], 5)
+        self.assertEqual(
+            profile["user_future_reminders"], [first["_id"], second["_id"]]
+        )
+        self.assertEqual(
+            [reminder["_id"] for reminder in profile["user_recent_reminders"]],
+            [first["_id"], second["_id"]],
+        )
+
+    async def test_keeps_limited_recent_reminders(self) -> None:
+        with mock.patch.object(const, "USER_RECENT_REMINDERS_LIMIT", 2):
+            created = [await self.create_reminder() for _ in range(3)]
+
+        profile = self.get_profile()
+        self.assertEqual(profile["future_reminders_count"], 3)
+        self.assertEqual(
+            [reminder["_id"] for reminder in profile["user_recent_reminders"]],
+            [data["_id"] for data in created[1:]],
+        )
+
+    async def test_failed_insertion_leaves_profile_untouched(self) -> None:
+        existing = await self.create_reminder()
+        data = create_reminder_data()
+        data["_id"] = existing["_id"]
+
+        self.assertEqual(
+            await insert_reminder_to_database(AUTHOR_ID, data), Error.TRY_AGAIN
+        )
+        profile = self.get_profile()
+        self.assertEqual(profile["future_reminders_count"], 1)
+        self.assertEqual(profile["user_future_reminders"], [existing["_id"]])
+
+
+class DeletingTest(RemindersTestCase):
+    async def test_deletes_reminder_and_updates_profile(self) -> None:
+        kept = await self.create_reminder()
+        deleted = await self.create_reminder()
+
+        reminder, error = await delete_reminder_from_database(
+            AUTHOR_ID, deleted["friendly_id"]
+        )
+
+        self.assertEqual(error, "")
+        self.assertEqual(reminder["_id"], deleted["_id"])
+        self.assertIsNone(const.FUTURE_REMINDERS.find_one({"_id": deleted["_id"]}))
+        profile = self.get_profile()
+        self.assertEqual(profile["future_reminders_count"], 1)
+        self.assertEqual(profile["user_future_reminders"], [kept["_id"]])
+        self.assertEqual(
+            [reminder["_id"] for reminder in profile["user_recent_reminders"]],
+            [kept["_id"]],
+        )
+
+    async def test_unknown_friendly_id_is_not_found(self) -> None:
+        await self.create_reminder()
+
+        self.assertEqual(
+            await delete_reminder_from_database(AUTHOR_ID, "unknown"),
+            (None, Error.NO_REMINDER_ID_DELETE),
+        )
+        self.assertEqual(self.get_profile()["future_reminders_count"], 1)
+
+    async def test_other_authors_reminder_is_not_found(self) -> None:
+        data = await self.create_reminder(OTHER_AUTHOR_ID)
+
+        self.assertEqual(
+            await delete_reminder_from_database(AUTHOR_ID, data["friendly_id"]),
+            (None, Error.NO_REMINDER_ID_DELETE),
+        )
+        self.assertIsNotNone(const.FUTURE_REMINDERS.find_one({"_id": data["_id"]}))
+        self.assertEqual(self.get_profile(OTHER_AUTHOR_ID)["future_reminders_count"], 1)
+        self.assertIsNone(self.get_profile())
+
+    async def test_deleting_twice_is_not_found(self) -> None:
+        data = await self.create_reminder()
+        await delete_reminder_from_database(AUTHOR_ID, data["friendly_id"])
+
+        self.assertEqual(
+            await delete_reminder_from_database(AUTHOR_ID, data["friendly_id"]),
+            (None, Error.NO_REMINDER_ID_DELETE),
+        )
+        self.assertEqual(self.get_profile()["future_reminders_count"], 0)
+
+    async def test_reminder_being_sent_is_kept(self) -> None:
+        data = await self.create_reminder()
+        for state in (CLAIMED, DELIVERED):
+            const.FUTURE_REMINDERS.update_one(
+                {"_id": data["_id"]}, {"$set": {"state": state}}
+            )
+
+            self.assertEqual(
+                await delete_reminder_from_database(AUTHOR_ID, data["friendly_id"]),
+                (None, Error.REMINDER_BEING_SENT),
+            )
+            self.assertIsNotNone(const.FUTURE_REMINDERS.find_one({"_id": data["_id"]}))
+            self.assertEqual(self.get_profile()["future_reminders_count"], 1)
+
+
+class NonTransactionalTest(RemindersTestCase):
+    """Standalone mongod: the writes are applied one by one, without a session."""
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        patches = (
+            mock.patch.object(utils.db, "_transactions_supported", False),
+            mock.patch.object(
+                utils.db.get_client(),
+                "start_session",
+                side_effect=AssertionError("no sessions without transactions"),
+            ),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_creates_and_deletes_without_session(self) -> None:
+        data = await self.create_reminder()
+        self.assertEqual(self.get_profile()["future_reminders_count"], 1)
+
+        reminder, error = await delete_reminder_from_database(
+            AUTHOR_ID, data["friendly_id"]
+        )
+
+        self.assertEqual(error, "")
+        self.assertEqual(reminder["_id"], data["_id"])
+        self.assertEqual(self.get_profile()["future_reminders_count"], 0)
+
+    async def test_failed_profile_update_keeps_inserted_reminder(self) -> None:
+        data = create_reminder_data()
+        with mock.patch(
+            "reminders.creating.upsert_user_profile", side_effect=PyMongoError
+        ):
+            self.assertEqual(
+                await insert_reminder_to_database(AUTHOR_ID, data), Error.TRY_AGAIN
+            )
+
+        self.assertIsNotNone(const.FUTURE_REMINDERS.find_one({"_id": data["_id"]}))
+        self.assertIsNone(self.get_profile())
+
+
+class TransactionalTest(RemindersTestCase):
+    """Replica set or sharded cluster: a failed write aborts the whole transaction."""
+
+    async def asyncSetUp(self) -> None:
+        if not utils.db.transactions_supported():
+            self.skipTest("the database doesn't support transactions")
+        await super().asyncSetUp()
+
+    async def test_failed_profile_update_aborts_creating(self) -> None:
+        data = create_reminder_data()
+        with mock.patch(
+            "reminders.creating.upsert_user_profile", side_effect=PyMongoError
+        ):
+            self.assertEqual(
+                await insert_reminder_to_database(AUTHOR_ID, data), Error.TRY_AGAIN
+            )
+
+        self.assertIsNone(const.FUTURE_REMINDERS.find_one({"_id": data["_id"]}))
+        self.assertIsNone(self.get_profile())
+
+    async def test_failed_profile_update_aborts_deleting(self) -> None:
+        data = await self.create_reminder()
+        with mock.patch(
+            "reminders.deleting.update_user_after_canceling", side_effect=PyMongoError
+        ):
+            self.assertEqual(
+                await delete_reminder_from_database(AUTHOR_ID, data["friendly_id"]),
+                (None, Error.TRY_AGAIN),
+            )
+
+        self.assertIsNotNone(const.FUTURE_REMINDERS.find_one({"_id": data["_id"]}))
+        self.assertEqual(self.get_profile()["future_reminders_count"], 1)
@@ -0,0 +1,44 @@
+"""
+Database calls run in the database threads, so a slow one doesn't block the event
+loop: the other coroutines keep running while it's in progress.
+"""
+
+import asyncio
+import time
+import unittest
+
+from utils.db import run_db
+
+
+SLOW_CALL_SECONDS = 0.5
+TICK_SECONDS = 0.01
+# How late a tick of a concurrent coroutine may be.
+MAX_TICK_LAG = 0.1
+
+
+def slow_db_call() -> str:
+    time.sleep(SLOW_CALL_SECONDS)
+    return "result"
+
+
+class RunDbTest(unittest.IsolatedAsyncioTestCase):
+    async def test_slow_call_doesnt_block_event_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        lags = []
+
+        async def tick() -> None:
+            while True:
+                before = loop.time()
+                await asyncio.sleep(TICK_SECONDS)
+                lags.append(loop.time() - before - TICK_SECONDS)
+
+        ticker = asyncio.create_task(tick())
+        started = loop.time()
+        result = await run_db(slow_db_call)
+        elapsed = loop.time() - started
+        ticker.cancel()
+
+        self.assertEqual(result, "result")
+        self.assertGreaterEqual(elapsed, SLOW_CALL_SECONDS)
+        self.assertGreater(len(lags), SLOW_CALL_SECONDS / TICK_SECONDS / 2)
+        self.assertLess(max(lags), MAX_TICK_LAG)
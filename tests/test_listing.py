@@ -0,0 +1,105 @@
+"""
+Cached upcoming reminders listings: a listing read from the database while the
+listings were patched isn't cached, so the patch isn't lost.
+"""
+
+import datetime as dt
+import os
+import unittest
+from unittest import mock
+
+from benchmarks._harness import FakeChannel, FakeContext, connect
+import reminders.const as const
+from reminders.creating import create_reminder_to_insert
+from reminders import listing
+from tests import TESTS_DATABASE_NAME
+import utils.db
+
+
+AUTHOR_ID = 1
+
+
+def setUpModule() -> None:
+    connect(os.environ.get("REMINDERBOT_TEST_MONGO_URI"))
+
+
+def insert_reminder(hours: int) -> dict:
+    reminder = create_reminder_to_insert(
+        FakeContext(AUTHOR_ID, FakeChannel()),
+        f"test reminder in {hours}h",
+        dt.datetime.now(const.LOCAL_TIMEZONE) + dt.timedelta(hours=hours),
+        f"me of test reminder in {hours}h",
+    )
+    const.FUTURE_REMINDERS.insert_one(reminder)
+    const.REMINDERBOT_USERS_PROFILES.update_one(
+        {"_id": AUTHOR_ID}, {"$set": {"future_reminders_count": 1}}, upsert=True
+    )
+    return reminder
+
+
+class ListingTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.assertEqual(const.FUTURE_REMINDERS.database.name, TESTS_DATABASE_NAME)
+        const.FUTURE_REMINDERS.drop()
+        const.REMINDERBOT_USERS_PROFILES.drop()
+        listing._upcoming_reminders = None
+        listing._authors_upcoming_reminders.clear()
+
+    def patch_run_db(self, write) -> None:
+        """Makes the listings' database reads call write() before they return."""
+
+        async def run_db(func, /, *args, **kwargs):
+            result = await utils.db.run_db(func, *args, **kwargs)
+            write()
+            return result
+
+        patch = mock.patch.object(listing, "run_db", run_db)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    async def get_listings(self) -> tuple[list, list]:
+        _, author_reminders = await listing.get_author_upcoming_reminders(AUTHOR_ID)
+        return await listing.get_upcoming_reminders(), author_reminders
+
+    async def test_listings_are_cached(self) -> None:
+        reminder = insert_reminder(1)
+        await self.get_listings()
+        const.FUTURE_REMINDERS.delete_one({"_id": reminder["_id"]})
+
+        for reminders in await self.get_listings():
+            self.assertEqual([listed["_id"] for listed in reminders], [reminder["_id"]])
+
+    async def test_created_during_loading_is_listed(self) -> None:
+        first = insert_reminder(1)
+        created = []
+
+        def create() -> None:
+            if not created:
+                created.append(insert_reminder(2))
+                listing.add_to_listings(created[0])
+
+        self.patch_run_db(create)
+        await self.get_listings()
+
+        for reminders in await self.get_listings():
+            self.assertEqual(
+                [listed["_id"] for listed in reminders],
+                [first["_id"], created[0]["_id"]],
+            )
+
+    async def test_deleted_during_loading_is_not_listed(self) -> None:
+        kept = insert_reminder(1)
+        deleted = insert_reminder(2)
+        loaded = []
+
+        def delete() -> None:
+            loaded.append(True)
+            if len(loaded) == 2:
+                const.FUTURE_REMINDERS.delete_one({"_id": deleted["_id"]})
+                listing.remove_from_listings([deleted])
+
+        self.patch_run_db(delete)
+        await self.get_listings()
+
+        for reminders in await self.get_listings():
+            self.assertEqual([listed["_id"] for listed in reminders], [kept["_id"]])
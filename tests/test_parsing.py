@@ -0,0 +1,68 @@
+"""
+Parsing the "!remind me of X on/in/at Y" command's message into the reminder's name
+and date.
+"""
+
+import datetime as dt
+import unittest
+
+import reminders.const as const
+from reminders.parsing import ParseError, parse_reminder_msg
+
+
+def local_datetime(*args: int) -> dt.datetime:
+    return dt.datetime(*args, tzinfo=const.LOCAL_TIMEZONE)
+
+
+# A Wednesday.
+NOW = local_datetime(2030, 1, 2, 12, 0)
+
+
+class WeekdaysTest(unittest.TestCase):
+    def assertParsed(self, msg: str, name: str, date: dt.datetime) -> None:
+        self.assertEqual(parse_reminder_msg(msg, NOW), (name, date, None, None))
+
+    def test_weekday_abbreviations_in_name_arent_dates(self) -> None:
+        for msg, name in (
+            ("me to go out in the sun at 17:00", "me to go out in the sun"),
+            ("me that I sat at 17:00", "me that I sat"),
+            ("me to check mon at 9:00", "me to check mon"),
+            ("me to buy a wed cake at 18:00", "me to buy a wed cake"),
+        ):
+            with self.subTest(msg=msg):
+                date = local_datetime(2030, 1, 2, *map(int, msg[-5:].split(":")))
+                if date < NOW:
+                    date += dt.timedelta(days=1)
+                self.assertParsed(msg, name, date)
+
+    def test_weekday_abbreviation_after_on(self) -> None:
+        self.assertParsed(
+            "me to go out on sun at 17:00",
+            "me to go out",
+            local_datetime(2030, 1, 6, 17),
+        )
+        self.assertParsed(
+            "me of tea on fri 8am", "me of tea", local_datetime(2030, 1, 4, 8)
+        )
+
+    def test_weekday_abbreviation_without_on_isnt_a_date(self) -> None:
+        self.assertEqual(
+            parse_reminder_msg("me of tea fri 8am", NOW),
+            (None, None, None, ParseError.INVALID_FORMAT),
+        )
+
+    def test_weekday_name(self) -> None:
+        self.assertParsed(
+            "me to go out sunday at 17:00",
+            "me to go out",
+            local_datetime(2030, 1, 6, 17),
+        )
+        self.assertParsed(
+            "me of tea Friday 8am", "me of tea", local_datetime(2030, 1, 4, 8)
+        )
+
+    def test_recurring_weekday_abbreviation(self) -> None:
+        self.assertEqual(
+            parse_reminder_msg("me of the standup every mon 9:00", NOW),
+            ("me of the standup", local_datetime(2030, 1, 7, 9), {"weeks": 1}, None),
+        )
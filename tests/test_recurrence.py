@@ -0,0 +1,140 @@
+"""
+Recurring reminders: parsing "every ...", counting their occurrences in local time and
+moving a reminded one to its next occurrence.
+"""
+
+import datetime as dt
+import os
+import unittest
+
+from benchmarks._harness import FakeChannel, FakeContext, connect
+from reminders.claims import CLAIMED, PENDING
+import reminders.const as const
+from reminders.creating import create_reminder_to_insert
+from reminders.parsing import ParseError, parse_reminder_msg
+from reminders.recurrence import (
+    create_recurrence,
+    describe_recurrence,
+    get_next_occurrence,
+    reschedule_recurring_reminders,
+)
+from tests import TESTS_DATABASE_NAME
+
+
+AUTHOR_ID = 1
+
+
+def setUpModule() -> None:
+    connect(os.environ.get("REMINDERBOT_TEST_MONGO_URI"))
+
+
+def local_datetime(*args: int) -> dt.datetime:
+    return dt.datetime(*args, tzinfo=const.LOCAL_TIMEZONE)
+
+
+class ParsingTest(unittest.TestCase):
+    now = local_datetime(2030, 1, 2, 12, 0)
+
+    def test_every_interval(self) -> None:
+        self.assertEqual(
+            parse_reminder_msg("me of tea every 2 weeks", self.now),
+            ("me of tea", self.now + dt.timedelta(weeks=2), {"weeks": 2}, None),
+        )
+
+    def test_every_interval_from_date(self) -> None:
+        self.assertEqual(
+            parse_reminder_msg("me of tea every day at 9:00", self.now),
+            ("me of tea", local_datetime(2030, 1, 3, 9), {"days": 1}, None),
+        )
+
+    def test_too_frequent(self) -> None:
+        self.assertEqual(
+            parse_reminder_msg("me of tea every 30 minutes", self.now),
+            (None, None, None, ParseError.TOO_FREQUENT_RECURRENCE),
+        )
+
+    def test_zero_interval(self) -> None:
+        self.assertEqual(
+            parse_reminder_msg("me of tea every 0 days", self.now),
+            (None, None, None, ParseError.CANT_BE_ONLY_ZEROS),
+        )
+
+
+class NextOccurrenceTest(unittest.TestCase):
+    def test_same_local_time_across_dst_change(self) -> None:
+        recurrence = create_recurrence({"days": 1}, local_datetime(2030, 3, 30, 9))
+
+        next_date, occurrence = get_next_occurrence(
+            recurrence, local_datetime(2030, 3, 30, 9)
+        )
+
+        self.assertEqual((next_date, occurrence), (local_datetime(2030, 3, 31, 9), 1))
+        self.assertEqual(next_date.utcoffset(), dt.timedelta(hours=2))
+
+    def test_month_end_is_clamped(self) -> None:
+        recurrence = create_recurrence({"months": 1}, local_datetime(2030, 1, 31, 9))
+
+        next_date, occurrence = get_next_occurrence(
+            recurrence, local_datetime(2030, 1, 31, 9)
+        )
+        self.assertEqual((next_date, occurrence), (local_datetime(2030, 2, 28, 9), 1))
+
+        recurrence["occurrence"] = occurrence
+        self.assertEqual(
+            get_next_occurrence(recurrence, next_date),
+            (local_datetime(2030, 3, 31, 9), 2),
+        )
+
+    def test_missed_occurrences_are_skipped(self) -> None:
+        recurrence = create_recurrence({"days": 1}, local_datetime(2030, 1, 1, 9))
+
+        self.assertEqual(
+            get_next_occurrence(recurrence, local_datetime(2030, 1, 11, 12)),
+            (local_datetime(2030, 1, 12, 9), 11),
+        )
+
+    def test_description(self) -> None:
+        self.assertEqual(describe_recurrence({"interval": {"days": 1}}), "day")
+        self.assertEqual(describe_recurrence({"interval": {"weeks": 2}}), "2 weeks")
+
+
+class ReschedulingTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.assertEqual(const.FUTURE_REMINDERS.database.name, TESTS_DATABASE_NAME)
+        const.FUTURE_REMINDERS.drop()
+
+    def insert_reminded_reminder(self) -> dict:
+        reminder_date = local_datetime(2030, 1, 2, 9)
+        reminder = create_reminder_to_insert(
+            FakeContext(AUTHOR_ID, FakeChannel()),
+            "tea",
+            reminder_date,
+            "me of tea every day at 9:00",
+            {"days": 1},
+        )
+        reminder["state"] = CLAIMED
+        const.FUTURE_REMINDERS.insert_one(reminder)
+        return reminder
+
+    async def test_moves_to_next_occurrence(self) -> None:
+        reminder = self.insert_reminded_reminder()
+        now = local_datetime(2030, 1, 2, 9, 0, 1).timestamp()
+
+        rescheduled, error = await reschedule_recurring_reminders([reminder], now)
+
+        self.assertEqual(error, "")
+        self.assertEqual([moved["_id"] for moved in rescheduled], [reminder["_id"]])
+        document = const.FUTURE_REMINDERS.find_one({"_id": reminder["_id"]})
+        self.assertEqual(document["reminder_date"], local_datetime(2030, 1, 3, 9))
+        self.assertEqual(document["recurrence"]["occurrence"], 1)
+        self.assertEqual(document["state"], PENDING)
+
+    async def test_deleted_reminder_isnt_returned(self) -> None:
+        reminder = self.insert_reminded_reminder()
+        const.FUTURE_REMINDERS.delete_one({"_id": reminder["_id"]})
+        now = local_datetime(2030, 1, 2, 9, 0, 1).timestamp()
+
+        self.assertEqual(
+            await reschedule_recurring_reminders([reminder], now), ([], "")
+        )
+        self.assertIsNone(const.FUTURE_REMINDERS.find_one({"_id": reminder["_id"]}))
@@ -0,0 +1,68 @@
+"""
+Reminder messages: at least COALESCE_REMINDERS_THRESHOLD reminders due at the same
+time are packed into combined messages, fewer get a message each.
+"""
+
+import datetime as dt
+import unittest
+
+import reminders.const as const
+from reminders.reminding import create_reminder_messages
+
+
+MSG = ":exclamation: {}"
+
+
+def create_reminders(count: int, authors: int = 2, name: str = "tea") -> list[dict]:
+    now = dt.datetime.now(const.LOCAL_TIMEZONE)
+    return [
+        {
+            "_id": i,
+            "friendly_id": f"id{i}",
+            "author_id": i % authors + 1,
+            "reminder_name_full": name,
+            "date_created": now,
+            "reminder_date": now,
+        }
+        for i in range(count)
+    ]
+
+
+class CoalescingTest(unittest.TestCase):
+    def test_fewer_than_threshold_get_a_message_each(self) -> None:
+        reminders = create_reminders(const.COALESCE_REMINDERS_THRESHOLD - 1)
+
+        messages = create_reminder_messages(reminders, MSG)
+
+        self.assertEqual(
+            [covered for covered, _, _ in messages],
+            [[reminder] for reminder in reminders],
+        )
+        for (reminder,), text, embed in messages:
+            self.assertEqual(text, f"<@{reminder['author_id']}>")
+            self.assertEqual(embed.fields, [])
+
+    def test_threshold_is_coalesced(self) -> None:
+        reminders = create_reminders(const.COALESCE_REMINDERS_THRESHOLD)
+
+        [(covered, text, embed)] = create_reminder_messages(reminders, MSG)
+
+        self.assertEqual(covered, reminders)
+        self.assertEqual(text, "<@1>\n<@2>")
+        self.assertEqual(len(embed.fields), len(reminders))
+
+    def test_combined_messages_keep_embed_limits(self) -> None:
+        reminders = create_reminders(const.EMBED_MAX_FIELDS + 5, name="x" * 2000)
+
+        messages = create_reminder_messages(reminders, MSG)
+
+        self.assertEqual(
+            [reminder for covered, _, _ in messages for reminder in covered], reminders
+        )
+        for _, _, embed in messages:
+            self.assertLessEqual(len(embed.fields), const.EMBED_MAX_FIELDS)
+            self.assertLessEqual(len(embed), const.EMBED_MAX_LENGTH)
+            for field in embed.fields:
+                self.assertLessEqual(
+                    len(field.value), const.EMBED_FIELD_VALUE_MAX_LENGTH
+                )
@@ -0,0 +1,115 @@
+"""
+The reminder loop on a shard which doesn't serve the errors channel's server: failed
+reminders are only logged, and the sent ones are still archived and deleted.
+Stopping the loop doesn't wait for the backoff after a failed tick.
+"""
+
+import asyncio
+import datetime as dt
+import os
+import time
+import unittest
+from unittest import mock
+
+import discord
+
+from benchmarks._harness import FakeChannel, FakeContext, connect
+import reminders.const as const
+from reminders.core import process_due_reminders
+from reminders.creating import create_reminder_to_insert
+from reminders.scheduler import ReminderScheduler
+from tests import TESTS_DATABASE_NAME
+
+
+AUTHOR_ID = 1
+SENT_CHANNEL_ID = 2
+UNKNOWN_CHANNEL_ID = 3
+
+
+def setUpModule() -> None:
+    connect(os.environ.get("REMINDERBOT_TEST_MONGO_URI"))
+
+
+class ShardBot:
+    """A bot without cached channels, which can fetch SENT_CHANNEL_ID only."""
+
+    def __init__(self) -> None:
+        self.sent_channel = FakeChannel()
+        self.sent_channel.id = SENT_CHANNEL_ID
+
+    async def wait_until_ready(self) -> None:
+        pass
+
+    def is_closed(self) -> bool:
+        return False
+
+    def get_channel(self, channel_id: int) -> None:
+        return None
+
+    async def fetch_channel(self, channel_id: int) -> FakeChannel:
+        if channel_id == SENT_CHANNEL_ID:
+            return self.sent_channel
+        raise discord.NotFound(mock.Mock(status=404, reason="Not Found"), "")
+
+
+def insert_due_reminder(channel_id: int) -> dict:
+    channel = FakeChannel()
+    channel.id = channel_id
+    reminder = create_reminder_to_insert(
+        FakeContext(AUTHOR_ID, channel),
+        f"test reminder to {channel_id}",
+        dt.datetime.now(const.LOCAL_TIMEZONE) - dt.timedelta(seconds=1),
+        f"me of test reminder to {channel_id} in 1s",
+    )
+    const.FUTURE_REMINDERS.insert_one(reminder)
+    return reminder
+
+
+class ErrorsChannelTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.assertEqual(const.FUTURE_REMINDERS.database.name, TESTS_DATABASE_NAME)
+        const.FUTURE_REMINDERS.drop()
+        const.PAST_REMINDERS.drop()
+        const.REMINDERBOT_USERS_PROFILES.drop()
+        self.scheduler = ReminderScheduler(ShardBot())
+
+    async def test_unknown_errors_channel_is_none(self) -> None:
+        self.assertIsNone(await self.scheduler._get_errors_channel())
+
+    async def test_failed_reminders_without_errors_channel(self) -> None:
+        sent = insert_due_reminder(SENT_CHANNEL_ID)
+        unsent = insert_due_reminder(UNKNOWN_CHANNEL_ID)
+        self.scheduler.delivery.start()
+        self.addAsyncCleanup(self.scheduler.delivery.stop)
+
+        await process_due_reminders(None, self.scheduler.delivery, time.time())
+
+        self.assertIsNone(const.FUTURE_REMINDERS.find_one({"_id": sent["_id"]}))
+        self.assertIsNotNone(const.PAST_REMINDERS.find_one({"_id": sent["_id"]}))
+        self.assertIsNotNone(const.FUTURE_REMINDERS.find_one({"_id": unsent["_id"]}))
+
+
+class StoppingTest(unittest.IsolatedAsyncioTestCase):
+    async def test_stopping_during_error_backoff(self) -> None:
+        scheduler = ReminderScheduler(ShardBot())
+        tick_started = asyncio.Event()
+        stop_started = asyncio.Event()
+
+        async def fail_tick(*args) -> bool:
+            tick_started.set()
+            await stop_started.wait()
+            raise RuntimeError("tick failed")
+
+        with (
+            mock.patch("reminders.scheduler.process_due_reminders", fail_tick),
+            mock.patch.object(const, "SCHEDULER_ERROR_BACKOFF", 30),
+        ):
+            scheduler.start()
+            await tick_started.wait()
+            stopping = asyncio.create_task(scheduler.stop())
+            await asyncio.sleep(0)
+            stop_started.set()
+            await asyncio.wait({stopping}, timeout=1)
+
+        self.assertTrue(stopping.done())
+        self.assertTrue(scheduler._task.done())
@@ -0,0 +1,154 @@
+"""
+Runs blocking PyMongo calls in a thread pool, so a slow database round trip doesn't
+block the discord.py event loop (heartbeats and other users' commands).
+The MongoDB client is created on its first use (the bot connects in setup_hook), so
+importing the modules doesn't need the database.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable
+
+from pymongo import MongoClient
+from pymongo.client_session import ClientSession
+from pymongo.database import Database
+
+from utils.metrics import Gauge, Histogram
+
+DB_THREADS = 16
+# PyMongo's client options: (environment variable overriding it, default value).
+# Database calls are made by the database threads only, so more connections than
+# DB_THREADS would never be used.
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": ("MONGO_MAX_POOL_SIZE", DB_THREADS),
+    "minPoolSize": ("MONGO_MIN_POOL_SIZE", 2),
+    "maxIdleTimeMS": ("MONGO_MAX_IDLE_TIME_MS", 300000),
+    "connectTimeoutMS": ("MONGO_CONNECT_TIMEOUT_MS", 5000),
+    "serverSelectionTimeoutMS": ("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000),
+    "socketTimeoutMS": ("MONGO_SOCKET_TIMEOUT_MS", 60000),
+    "waitQueueTimeoutMS": ("MONGO_WAIT_QUEUE_TIMEOUT_MS", 10000),
+}
+DB_CALL_SECONDS = Histogram(
+    "reminderbot_db_call_seconds",
+    "Time of database calls, including waiting for a database thread.",
+    label="operation",
+)
+# More calls in progress than DB_THREADS wait for a database thread.
+DB_CALLS_IN_PROGRESS = Gauge(
+    "reminderbot_db_calls_in_progress",
+    "Number of database calls running or waiting for a database thread.",
+)
+DB_THREAD_WAIT_SECONDS = Histogram(
+    "reminderbot_db_thread_wait_seconds",
+    "Time database calls waited for a database thread.",
+)
+
+_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="mongo")
+_client = None
+_client_lock = threading.Lock()
+
+
+def mongo_client_options() -> dict[str, int]:
+    return {
+        option: int(os.environ.get(variable, default))
+        for option, (variable, default) in MONGO_CLIENT_OPTIONS.items()
+    }
+
+
+def get_client() -> MongoClient:
+    """
+    Returns the MongoDB client, creating it on the first call. Creating it may block
+    (e.g. resolving a mongodb+srv link), the bot creates it in connect_db().
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Dates are read as timezone aware UTC datetimes.
+                _client = MongoClient(
+                    os.environ["MONGODB_LINK"].format(os.environ["PW"]),
+                    tz_aware=True,
+                    **mongo_client_options(),
+                )
+    return _client
+
+
+def get_db() -> Database:
+    return get_client()[os.environ["DATABASE_NAME"]]
+
+
+def ping() -> None:
+    """Blocking, use it through run_db()."""
+    get_client().admin.command("ping")
+
+
+async def run_db(func: Callable, /, *args, **kwargs) -> Any:
+    """
+    Calls func(*args, **kwargs) in the database thread pool and returns its result.
+    Cursors have to be consumed inside func, e.g.
+    await run_db(lambda: list(collection.find().limit(8))).
+    """
+    # Calls are timed per data-access function, i.e. per the coroutine calling run_db.
+    operation = DB_CALL_SECONDS.labels(sys._getframe(1).f_code.co_name)
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    started_in_thread = None
+
+    def call() -> Any:
+        nonlocal started_in_thread
+        started_in_thread = time.perf_counter()
+        return func(*args, **kwargs)
+
+    DB_CALLS_IN_PROGRESS.inc()
+    try:
+        return await loop.run_in_executor(_executor, call)
+    finally:
+        DB_CALLS_IN_PROGRESS.dec()
+        # The metrics are updated in the event loop's thread only.
+        if started_in_thread is not None:
+            DB_THREAD_WAIT_SECONDS.observe(started_in_thread - started)
+        operation.observe(time.perf_counter() - started)
+
+
+async def connect_db() -> None:
+    """Creates the MongoDB client and waits until the database answers."""
+    await run_db(ping)
+
+
+async def close_db() -> None:
+    """Waits for the database calls in progress to finish and closes the connections."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, functools.partial(_executor.shutdown, wait=True))
+    if _client is not None:
+        _client.close()
+
+
+_transactions_supported = None
+
+
+def transactions_supported() -> bool:
+    """Checks (once) whether the deployment is a replica set or a sharded cluster."""
+    global _transactions_supported
+    if _transactions_supported is None:
+        hello = get_client().admin.command("hello")
+        _transactions_supported = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return _transactions_supported
+
+
+def run_in_transaction(callback: Callable[[ClientSession | None], Any]) -> Any:
+    """
+    Calls callback(session) inside a multi-document transaction and returns its
+    result. The transaction is aborted if callback raises. On deployments without
+    transactions (standalone mongod) callback(None) is called instead, so its writes
+    are applied one by one.
+    Blocking, use it through run_db().
+    """
+    if not transactions_supported():
+        return callback(None)
+    with get_client().start_session() as session:
+        return session.with_transaction(callback)
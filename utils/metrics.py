@@ -0,0 +1,165 @@
+"""
+Minimal Prometheus style metrics: counters, gauges and histograms, rendered in the
+text exposition format by render() (served on /metrics, see keep_alive.py).
+Updating a metric is a few arithmetic operations and doesn't allocate, so it's cheap
+enough for the hot paths. A metric can have one label, its children (one per label
+value) are created on the first use of the value.
+"""
+
+import bisect
+from typing import Callable
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+_metrics = []
+
+
+class Metric:
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label: str | None = None,
+        registered: bool = True,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._children = {}
+        if registered:
+            _metrics.append(self)
+
+    def labels(self, value: str) -> "Metric":
+        """Returns the child of the metric for the label value."""
+        child = self._children.get(value)
+        if child is None:
+            child = self._children[value] = self._create_child()
+        return child
+
+    def _create_child(self) -> "Metric":
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        if self.label is None:
+            lines.extend(self._render_samples(""))
+        for value, child in list(self._children.items()):
+            lines.extend(child._render_samples(f'{self.label}="{value}"'))
+        return lines
+
+    def _render_samples(self, labels: str) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label: str | None = None,
+        registered: bool = True,
+    ) -> None:
+        super().__init__(name, documentation, label, registered)
+        self.value = 0
+
+    def _create_child(self) -> "Counter":
+        return Counter(self.name, self.documentation, registered=False)
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def _render_samples(self, labels: str) -> list[str]:
+        return [f"{self.name}_total{braced(labels)} {self.value}"]
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label: str | None = None,
+        registered: bool = True,
+        function: Callable[[], float] | None = None,
+    ) -> None:
+        """The value of a gauge with a function is read from it when rendered."""
+        super().__init__(name, documentation, label, registered)
+        self.function = function
+        self.value = 0
+
+    def _create_child(self) -> "Gauge":
+        return Gauge(self.name, self.documentation, registered=False)
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def _render_samples(self, labels: str) -> list[str]:
+        value = self.function() if self.function else self.value
+        return [f"{self.name}{braced(labels)} {value}"]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label: str | None = None,
+        registered: bool = True,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label, registered)
+        self.buckets = buckets
+        # The last count is of the observations above the largest bucket.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def _create_child(self) -> "Histogram":
+        return Histogram(
+            self.name, self.documentation, registered=False, buckets=self.buckets
+        )
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def _render_samples(self, labels: str) -> list[str]:
+        separator = "," if labels else ""
+        lines = []
+        cumulative_count = 0
+        for bucket, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative_count += count
+            lines.append(
+                f'{self.name}_bucket{{{labels}{separator}le="{bucket}"}} '
+                f"{cumulative_count}"
+            )
+        lines.append(f"{self.name}_sum{braced(labels)} {self.sum}")
+        lines.append(f"{self.name}_count{braced(labels)} {self.count}")
+        return lines
+
+
+def braced(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+
+def render() -> str:
+    """Returns all metrics in Prometheus text exposition format."""
+    return "\n".join(line for metric in _metrics for line in metric.render()) + "\n"
@@ -0,0 +1,122 @@
+"""
+Toggleable profiling of the hot paths: wall and CPU time of their stages, e.g.
+
+    with profiling.stage("insert"):
+        await insert_reminder_to_database(...)
+
+Stages nest, a stage is recorded under the stack of the stages it runs in (per
+asyncio task), e.g. create_reminder;insert. The command being invoked is the
+outermost stage of the command's stages (see Bot.invoke in main.py).
+
+Profiling is enabled with the PROFILING=1 environment variable or the owner-only
+!profiling command. When it's disabled, stage() returns a shared no-op context
+manager, so the stages cost a function call each. The profile is exported as a
+summary table (printed every PROFILING_SUMMARY_INTERVAL seconds if it's set) or in
+the folded stacks format of flamegraph.pl and speedscope.
+
+CPU time is the event loop thread's CPU time during the stage. It's exact for stages
+which don't await, for the others it includes the tasks which ran in the meantime.
+Database calls' CPU time (in the database threads) isn't included.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import time
+from typing import Iterator
+
+
+FOLDED_STACKS_UNIT = 1e-6  # The folded stacks' values are microseconds.
+SUMMARY_INTERVAL = float(os.environ.get("PROFILING_SUMMARY_INTERVAL", 0))
+
+_enabled = os.environ.get("PROFILING") == "1"
+_stack = contextvars.ContextVar("profiling_stack", default=())
+# Stack of stage names: [calls, wall time, CPU time].
+_stages = {}
+_noop = contextlib.nullcontext()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def reset() -> None:
+    _stages.clear()
+
+
+def stage(name: str) -> contextlib.AbstractContextManager:
+    """Returns a context manager timing the stage, if profiling is enabled."""
+    if not _enabled:
+        return _noop
+    return _timed_stage(name)
+
+
+@contextlib.contextmanager
+def _timed_stage(name: str) -> Iterator[None]:
+    stack = (*_stack.get(), name)
+    token = _stack.set(stack)
+    wall_started = time.perf_counter()
+    cpu_started = time.thread_time()
+    try:
+        yield
+    finally:
+        wall_time = time.perf_counter() - wall_started
+        cpu_time = time.thread_time() - cpu_started
+        _stack.reset(token)
+        totals = _stages.get(stack)
+        if totals is None:
+            totals = _stages[stack] = [0, 0.0, 0.0]
+        totals[0] += 1
+        totals[1] += wall_time
+        totals[2] += cpu_time
+
+
+def summary() -> str:
+    """Returns calls, mean and total wall and CPU times of the stages."""
+    lines = [
+        f"{'stage':<48} {'calls':>8} {'wall ms':>9} {'cpu ms':>9} "
+        f"{'wall s':>8} {'cpu s':>8}"
+    ]
+    for stack, (calls, wall_time, cpu_time) in sorted(_stages.items()):
+        name = "  " * (len(stack) - 1) + stack[-1]
+        lines.append(
+            f"{name:<48} {calls:>8} {wall_time / calls * 1000:>9.2f} "
+            f"{cpu_time / calls * 1000:>9.2f} {wall_time:>8.2f} {cpu_time:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def folded_stacks(cpu: bool = False) -> str:
+    """
+    Returns the profile in the folded stacks format, one "stage;substage time" line
+    per stack, time being the stack's own wall (or CPU) time in microseconds, i.e.
+    excluding its substages.
+    """
+    totals = {stack: times[2 if cpu else 1] for stack, times in _stages.items()}
+    own_times = dict(totals)
+    for stack, total in totals.items():
+        if len(stack) > 1 and stack[:-1] in own_times:
+            own_times[stack[:-1]] -= total
+    return "".join(
+        f"{';'.join(stack)} {max(round(own_time / FOLDED_STACKS_UNIT), 0)}\n"
+        for stack, own_time in sorted(own_times.items())
+    )
+
+
+async def print_summary_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        if _enabled and _stages:
+            print(f"\nProfile of the last {interval:g}s:\n{summary()}\n")
+            reset()
@@ -0,0 +1,107 @@
+"""
+Startup timing report. install() times the imports of the modules imported after it,
+timed() times the other startup steps, e.g. connecting to MongoDB, and report()
+returns how long the bot took to start, broken down by module and step. A module's
+time includes importing the modules which it imports in turn, so the modules
+imported by the startup code itself are listed only.
+For a detailed per module breakdown run: python -X importtime main.py
+"""
+
+import contextlib
+import importlib.abc
+import importlib.machinery
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Iterator
+
+
+# Steps shorter than this are left out of the report.
+REPORT_MIN_SECONDS = 0.005
+TIMED_LOADERS = (
+    importlib.machinery.SourceFileLoader,
+    importlib.machinery.SourcelessFileLoader,
+    importlib.machinery.ExtensionFileLoader,
+)
+
+_started = time.perf_counter()
+_steps = []
+# Depth of nested imports, per thread.
+_imports = threading.local()
+
+
+class _TimedLoader:
+    """Wraps the loader of a module to time executing the module."""
+
+    def __init__(self, loader: importlib.abc.Loader) -> None:
+        self._loader = loader
+
+    def __getattr__(self, name: str):
+        return getattr(self._loader, name)
+
+    def exec_module(self, module: ModuleType) -> None:
+        depth = getattr(_imports, "depth", 0)
+        _imports.depth = depth + 1
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            _imports.depth = depth
+            if depth == 0:
+                _steps.append(
+                    (f"import {module.__name__}", time.perf_counter() - started)
+                )
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Finds modules with the other finders and wraps their loaders."""
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if isinstance(spec.loader, TIMED_LOADERS):
+            spec.loader = _TimedLoader(spec.loader)
+        return spec
+
+
+_import_timer = _ImportTimer()
+
+
+def install() -> None:
+    """Starts timing the imports."""
+    if _import_timer not in sys.meta_path:
+        sys.meta_path.insert(0, _import_timer)
+
+
+def uninstall() -> None:
+    """Stops timing the imports."""
+    if _import_timer in sys.meta_path:
+        sys.meta_path.remove(_import_timer)
+
+
+@contextlib.contextmanager
+def timed(step: str) -> Iterator[None]:
+    """Times the startup step inside the with block."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _steps.append((step, time.perf_counter() - started))
+
+
+def report() -> str:
+    """Returns the startup time and its longest steps, in the order they were made."""
+    lines = [f"Started in {time.perf_counter() - _started:.2f}s:"]
+    lines.extend(
+        f"  {step}: {seconds:.3f}s"
+        for step, seconds in _steps
+        if seconds >= REPORT_MIN_SECONDS
+    )
+    return "\n".join(lines)
@@ -1,9 +1,8 @@
 import datetime as dt
-from datetime import timezone
 import discord
 from discord.ext.commands import bot, Context
 
-from global_const import LOCAL_TIMEZONE
+import global_const
 
 
 async def display_error(ctx: Context, embed_description: str, text: str = None) -> None:
@@ -30,8 +29,8 @@ async def display_notification(
 def utc_to_local(utc_date: dt.datetime) -> dt.datetime:
     """
     Converts datetime object with UTC timezone set to LOCAL_TIMEZONE
-    timezone (MongoDB converts to UTC time automatically).
+    timezone (MongoDB returns timezone aware UTC datetimes).
     Example:
     20:00 UTC datetime -> 22:00 Europe/Warsaw datetime.
     """
-    return utc_date.replace(tzinfo=timezone.utc).astimezone(tz=LOCAL_TIMEZONE)
+    return utc_date.astimezone(tz=global_const.LOCAL_TIMEZONE)